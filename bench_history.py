@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+历史快照库基准：在临时 SQLite 中写入多年的合成运行记录
+（每天4次 × 18个平台 × 每平台若干条），测量每次运行的写入耗时和常见查询耗时。
+
+用法:
+    python bench_history.py                 # 默认3年
+    python bench_history.py --years 5 --items 20
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from history import HistoryStore
+from report import build_report
+
+PLATFORMS = ["Weibo", "Douyin", "Xiaohongshu", "Twitter", "Baidu", "Zhihu", "Bilibili", "Kuaishou", "Xigua",
+             "Linux.do", "52pojie", "YouTube", "财经", "Reddit", "StackOverflow", "Xianyu", "Xmfish", "Netease"]
+RUN_HOURS = [7, 12, 17, 22]
+
+def synthesize_run(day, items, topic_pool):
+    # 热点话题会连续几天出现在榜单上，便于测试按标题查询
+    recent = [title for titles in topic_pool[max(0, day - 3):day + 1] for title in titles]
+    data = {}
+    for platform in PLATFORMS:
+        topics = random.sample(recent, items)
+        data[platform] = [{"title": title, "url": f"https://example.com/{hash(title) & 0xffff}", "hot": f"{random.randint(1, 500)}万"}
+                          for title in topics]
+    return build_report(data, "noon_12pm", "bench")
+
+def timed(func, repeat=20):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--years", type=float, default=3)
+    parser.add_argument("--items", type=int, default=15)
+    args = parser.parse_args()
+
+    days = int(args.years * 365)
+    topic_pool = [[f"第{day}天话题{i}" for i in range(args.items * 2)] for day in range(days)]
+    start_ts = int(time.time()) - days * 86400
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = HistoryStore(os.path.join(tmp, "history.db"))
+
+        insert_times = []
+        for day in range(days):
+            for hour in RUN_HOURS:
+                report = synthesize_run(day, args.items, topic_pool)
+                ts = start_ts + day * 86400 + hour * 3600
+                begin = time.perf_counter()
+                store.record_run(report, ts=ts)
+                insert_times.append(time.perf_counter() - begin)
+
+        rows = store.conn.execute("SELECT COUNT(*) FROM items").fetchone()[0]
+        size = os.path.getsize(store.path)
+        print(f"{days * len(RUN_HOURS)} runs, {rows} items, {size / 1024 / 1024:.1f}MB")
+        print(f"{'record_run (median)':<40}{statistics.median(insert_times) * 1000:>8.2f}ms")
+
+        mid = start_ts + days // 2 * 86400
+        title = topic_pool[days // 2][0]
+        queries = [
+            ("platform_history, 1 day", lambda: store.platform_history("Weibo", mid, mid + 86400)),
+            ("platform_history, 1 week", lambda: store.platform_history("Weibo", mid, mid + 7 * 86400)),
+            ("platform_history, 1 month", lambda: store.platform_history("Weibo", mid, mid + 30 * 86400)),
+            ("title_history", lambda: store.title_history(title)),
+            ("title_history, one platform", lambda: store.title_history(title, "Zhihu")),
+            ("time_on_list", lambda: store.time_on_list(title, "Weibo")),
+            ("last_snapshot", lambda: store.last_snapshot("Baidu")),
+        ]
+        for name, query in queries:
+            result = query()
+            result_size = len(result) if isinstance(result, list) else 1
+            print(f"{name:<40}{timed(query) * 1000:>8.2f}ms  ({result_size} rows)")
+        store.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+关键词过滤基准：比较逐个关键词 any(keyword in title) 与 keywords.py 中的
+Aho-Corasick 匹配器，分别使用默认关键词和放大后的关键词集合。
+
+用法:
+    python bench_keywords.py
+    python bench_keywords.py --titles 50000 --scale 20
+"""
+import argparse
+import random
+import time
+
+from keywords import DEFAULT_KEYWORDS, KeywordMatcher
+
+def synthesize_titles(count, keywords, seed=1):
+    rng = random.Random(seed)
+    chars = [chr(0x4e00 + i) for i in range(3000)]
+    titles = []
+    for _ in range(count):
+        title = "".join(rng.choices(chars, k=rng.randint(12, 30)))
+        # 约三分之一的标题包含关键词
+        if rng.random() < 0.3:
+            pos = rng.randint(0, len(title))
+            title = title[:pos] + rng.choice(keywords) + title[pos:]
+        titles.append(title)
+    return titles
+
+def naive_categories(title, keywords):
+    return {category for category, words in keywords.items() if any(word in title for word in words)}
+
+def timed(func, titles):
+    start = time.perf_counter()
+    for title in titles:
+        func(title)
+    return (time.perf_counter() - start) / len(titles) * 1e6
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--titles", type=int, default=20000)
+    parser.add_argument("--scale", type=int, default=10, help="每个分类额外生成的关键词倍数")
+    args = parser.parse_args()
+
+    rng = random.Random(2)
+    chars = [chr(0x4e00 + i) for i in range(3000)]
+    scaled = {
+        category: words + ["".join(rng.choices(chars, k=rng.randint(2, 4))) for _ in range(len(words) * args.scale)]
+        for category, words in DEFAULT_KEYWORDS.items()
+    }
+
+    for label, keywords in (("default keywords", DEFAULT_KEYWORDS), (f"keywords x{args.scale + 1}", scaled)):
+        all_words = [word for words in keywords.values() for word in words]
+        titles = synthesize_titles(args.titles, all_words)
+        matcher = KeywordMatcher(keywords)
+        assert all(matcher.categories(title) == naive_categories(title, keywords) for title in titles[:2000])
+        print(f"{label} ({len(all_words)} keywords, {len(keywords)} categories)")
+        print(f"  {'any() per category':<24}{timed(lambda t: naive_categories(t, keywords), titles):>8.2f}us/title")
+        print(f"  {'Aho-Corasick':<24}{timed(matcher.categories, titles):>8.2f}us/title")
+
+if __name__ == "__main__":
+    main()
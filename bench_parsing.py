@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+HTML解析基准：对比 html.parser 全量建树 与 lxml 部分建树 (make_soup)
+每个平台输出 CPU 时间和峰值内存。
+
+用法:
+    python bench_parsing.py                # 使用合成页面
+    python bench_parsing.py --pages DIR    # 使用保存的真实页面 DIR/<platform>.html
+"""
+import argparse
+import os
+import time
+import tracemalloc
+
+from bs4 import BeautifulSoup
+from scraper import make_soup
+
+# (平台, PARSE_ONLY键, 抓取函数使用的选择器, 合成页面中的目标片段)
+CASES = [
+    ("weibo", "weibo", "td.td-02 a",
+     '<tr><td class="td-01">{i}</td><td class="td-02"><a href="/weibo?q=topic{i}">话题{i}</a><span>12345</span></td><td class="td-03"><i>热</i></td></tr>'),
+    ("zhihu_hot", "zhihu_hot", ".HotList-item",
+     '<section class="HotList-item"><div class="HotList-itemContent"><a href="/question/{i}"><h2 class="HotList-itemTitle">问题{i}</h2></a><div class="HotList-itemMetrics">{i}万热度</div></div></section>'),
+    ("baidu", "baidu", ".content_1YWBm",
+     '<div class="category-wrap_iQLoo"><a href="/s?wd={i}"><div class="hot-index_1Bl1a">{i}</div></a><div class="content_1YWBm"><div class="c-single-text-ellipsis">热搜{i}</div></div></div>'),
+    ("twitter", "twitter", ".trend-card li a",
+     '<div class="trend-card"><ol><li><a href="https://twitter.com/search?q=t{i}">趋势{i}</a></li></ol></div>'),
+    ("52pojie", "52pojie", "a.xst",
+     '<table><tbody><tr><th><a class="xst" href="thread-{i}-1-1.html">帖子{i}</a></th><td class="num"><em>{i}</em></td></tr></tbody></table>'),
+    ("xmfish", "xmfish", ".hot-thread",
+     '<li class="hot-thread"><a href="/thread-{i}.html">小鱼热帖{i}</a><span class="replies">{i}</span></li>'),
+    ("netease", "netease", "a",
+     '<a href="https://news.163.com/{i}.html">民生经济新闻标题{i}</a>'),
+]
+
+FILLER = (
+    '<div class="card"><div class="card-body"><p class="text">'
+    + "这是一段用于填充页面体积的正文内容，模拟真实页面中的导航、推荐和广告区域。" * 4
+    + '</p><ul class="links"><li><a href="/x">链接</a></li><li><a href="/y">链接</a></li></ul>'
+    + '<img src="/a.png" alt="图片"><span class="meta">meta</span></div></div>'
+)
+
+def synthesize_page(fragment, items=50, filler_blocks=800):
+    body = []
+    for i in range(filler_blocks):
+        body.append(FILLER)
+        if i % (filler_blocks // items) == 0:
+            body.append(fragment.format(i=i))
+    return "<html><head><title>bench</title></head><body>" + "".join(body) + "</body></html>"
+
+def measure(parse, markup, selector, repeat):
+    start = time.process_time()
+    for _ in range(repeat):
+        soup = parse(markup)
+        soup.select(selector)
+    cpu = (time.process_time() - start) / repeat
+
+    tracemalloc.start()
+    soup = parse(markup)
+    soup.select(selector)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return cpu, peak
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", help="directory with saved pages named <platform>.html")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'platform':<12}{'size':>9}{'html.parser':>14}{'lxml+only':>12}{'cpu saved':>11}{'peak (full)':>13}{'peak (only)':>13}{'mem saved':>11}")
+    for platform, only, selector, fragment in CASES:
+        path = os.path.join(args.pages, f"{platform}.html") if args.pages else None
+        if path and os.path.exists(path):
+            with open(path, "r", encoding="utf-8", errors="replace") as f:
+                markup = f.read()
+        else:
+            markup = synthesize_page(fragment)
+
+        full_cpu, full_peak = measure(lambda m: BeautifulSoup(m, 'html.parser'), markup, selector, args.repeat)
+        only_cpu, only_peak = measure(lambda m: make_soup(m, only=only), markup, selector, args.repeat)
+
+        print(f"{platform:<12}{len(markup) // 1024:>7}KB"
+              f"{full_cpu * 1000:>12.1f}ms{only_cpu * 1000:>10.1f}ms{1 - only_cpu / full_cpu:>10.0%}"
+              f"{full_peak / 1024 / 1024:>11.1f}MB{only_peak / 1024 / 1024:>11.1f}MB{1 - only_peak / full_peak:>10.0%}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+报告渲染基准：对比旧的逐段 `html +=` 拼接 与 render.py 预编译模板
+合成报告包含大量平台和条目，输出渲染耗时、输出大小，
+以及整串拼接与按平台流式写入 (write_report) 的峰值内存。
+
+用法:
+    python bench_render.py                          # 默认几组规模
+    python bench_render.py --platforms 500 --items 200
+"""
+import argparse
+import os
+import time
+import tracemalloc
+
+from report import build_report
+from render import render_html, render_markdown, iter_html, write_report
+
+def legacy_render_html(report, item_limit):
+    """The pre-render.py algorithm: one f-string += per fragment."""
+    html = f"""
+<div style="font-family: -apple-system, BlinkMacSystemFont, 'Helvetica Neue', sans-serif; line-height: 1.6; color: #333; max-width: 680px; margin: 0 auto;">
+    <div style="text-align: center; padding: 20px 0; border-bottom: 2px solid #e6e6e6;">
+        <h1 style="margin: 0; font-size: 24px; color: #2c3e50;">{report.period_text}</h1>
+        <p style="margin: 5px 0 0; font-size: 14px; color: #7f8c8d;">{report.time_str}</p>
+    </div>
+"""
+    for section in report.sections:
+        html += f"""
+    <div style="margin: 25px 0; padding: 15px; background: #f8f9fa; border-radius: 8px; border-left: 4px solid #3498db;">
+        <h2 style="margin: 0 0 12px 0; font-size: 18px; color: #2c3e50;">
+            {section.emoji} {section.name}
+        </h2>
+"""
+        html += """
+        <ul style="margin: 0; padding: 0; list-style: none;">
+"""
+        for item in section.items[:item_limit]:
+            rank_color = "#e74c3c" if item.rank <= 3 else "#3498db" if item.rank <= 6 else "#7f8c8d"
+            hot_html = ""
+            if item.hot:
+                hot_html = f'<span style="font-size: 12px; color: #e74c3c; margin-left: 8px;">{item.hot}</span>'
+            html += f"""
+            <li style="margin: 8px 0; padding: 0;">
+                <span style="display: inline-block; width: 20px; height: 20px; line-height: 20px; text-align: center; background: {rank_color}; color: white; border-radius: 3px; font-size: 12px; margin-right: 8px;">{item.rank}</span>
+                <a href="{item.url}" style="color: #2c3e50; text-decoration: none; font-size: 15px;">{item.short_title()}</a>
+                {hot_html}
+            </li>
+"""
+        html += """
+        </ul>
+"""
+        html += """
+    </div>
+"""
+    return html
+
+def synthesize_report(platforms, items):
+    data = {}
+    for p in range(platforms):
+        data[f"Platform{p}"] = [
+            {"title": f"平台{p}的第{i}条热点新闻标题", "url": f"https://example.com/{p}/{i}", "hot": f"{i * 7 % 500}万"}
+            for i in range(items)
+        ]
+    return build_report(data, "noon_12pm", "🕛 12:00·午间热点速递")
+
+def best_of(func, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+def peak_memory(func):
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--platforms", type=int)
+    parser.add_argument("--items", type=int)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    sizes = [(args.platforms, args.items)] if args.platforms and args.items else [(18, 12), (200, 50), (500, 200)]
+
+    print(f"{'platforms':>10}{'items':>8}{'size':>10}{'legacy +=':>12}{'render':>10}{'speedup':>9}{'stream':>10}{'markdown':>10}"
+          f"{'peak (legacy)':>15}{'peak (stream)':>15}")
+    for platforms, items in sizes:
+        report = synthesize_report(platforms, items)
+        html = render_html(report, item_limit=items)
+
+        legacy = best_of(lambda: legacy_render_html(report, items), args.repeat)
+        compiled = best_of(lambda: render_html(report, item_limit=items), args.repeat)
+        with open(os.devnull, "w", encoding="utf-8") as devnull:
+            stream = best_of(lambda: write_report(iter_html(report, item_limit=items), devnull), args.repeat)
+        markdown = best_of(lambda: render_markdown(report, max_platforms=platforms, limit=items), args.repeat)
+        with open(os.devnull, "w", encoding="utf-8") as devnull:
+            legacy_peak = peak_memory(lambda: legacy_render_html(report, items))
+            stream_peak = peak_memory(lambda: write_report(iter_html(report, item_limit=items), devnull))
+
+        print(f"{platforms:>10}{items:>8}{len(html) // 1024:>8}KB"
+              f"{legacy * 1000:>10.1f}ms{compiled * 1000:>8.1f}ms{legacy / compiled:>8.1f}x"
+              f"{stream * 1000:>8.1f}ms{markdown * 1000:>8.1f}ms"
+              f"{legacy_peak / 1024 / 1024:>13.1f}MB{stream_peak / 1024 / 1024:>13.1f}MB")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+离线回放基准：用 replay.py 录制的 fixtures 和本地替身服务器，在无网络的情况下测量
+整轮抓取的耗时与内存峰值，以及每个平台抓取+解析的吞吐量。
+先在有网络的环境录制: python replay.py record
+
+用法:
+    python bench_replay.py                   # 默认 fixtures 目录，5轮
+    python bench_replay.py --dir fixtures --rounds 10
+"""
+import argparse
+import contextlib
+import io
+import statistics
+import sys
+import time
+import tracemalloc
+
+import replay
+from config import REPLAY_DIR
+
+def quiet():
+    # 抓取函数的 print 输出会干扰计时
+    return contextlib.redirect_stdout(io.StringIO())
+
+def run_round(tasks):
+    from engine import run_fetchers
+    with quiet():
+        start = time.perf_counter()
+        data, status = run_fetchers(tasks)
+        return time.perf_counter() - start, data
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dir", default=REPLAY_DIR)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    store = replay.FixtureStore(args.dir)
+    if not store.index:
+        print(f"No fixtures in {args.dir}. Record them first: python replay.py record")
+        sys.exit(1)
+    replay.start("replay", args.dir)
+
+    import http_client
+    from metrics import track_fetch
+    from platforms import enabled_platforms
+
+    tasks = [platform.task() for platform in enabled_platforms()]
+    run_round(tasks)  # 预热：启动替身服务器、建立会话、导入 bs4
+
+    times = [run_round(tasks)[0] for _ in range(args.rounds)]
+    tracemalloc.start()
+    run_round(tasks)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    total_bytes = sum(entry["bytes"] for entry in store.index.values())
+    print(f"{len(store.index)} recorded responses, {total_bytes / 1024:.0f}KB")
+    print(f"{'end-to-end fetch (median)':<32}{statistics.median(times) * 1000:>9.1f}ms  (min {min(times) * 1000:.1f}ms)")
+    print(f"{'end-to-end peak memory':<32}{peak / 1024 / 1024:>9.1f}MB")
+    print()
+
+    # 单个平台：抓取耗时、解析 CPU 时间、按录制字节数计算的解析吞吐量
+    bytes_by_platform = store.bytes_by_platform()
+    print(f"{'platform':<16}{'fetch':>9}{'parse cpu':>11}{'items':>7}{'MB/s':>9}{'tier':>11}")
+    for platform, fetcher in tasks:
+        samples, parse_cpu, items, tier = [], [], 0, ""
+        for _ in range(args.rounds):
+            records = []
+
+            async def timed_fetch():
+                with track_fetch(platform) as record:
+                    result = await fetcher()
+                    record.items = len(result or [])
+                    records.append(record)
+
+            with quiet():
+                start = time.perf_counter()
+                http_client.run_sync(timed_fetch())
+                samples.append(time.perf_counter() - start)
+            parse_cpu.append(records[0].parse_cpu)
+            items, tier = records[0].items, records[0].tier
+        cpu = statistics.median(parse_cpu)
+        size = bytes_by_platform.get(platform, 0)
+        throughput = f"{size / cpu / 1024 / 1024:.1f}" if cpu and size else "-"
+        print(f"{platform:<16}{statistics.median(samples) * 1000:>7.1f}ms{cpu * 1000:>9.2f}ms{items:>7}{throughput:>9}{tier:>11}")
+
+if __name__ == "__main__":
+    main()
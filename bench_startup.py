@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+启动基准：用 `python -X importtime` 统计各模块的导入耗时，
+并测量非推送时段运行 (import main) 与完整抓取路径的冷启动时间，
+以及第一次生成请求头时 User-Agent 池的加载时间（无缓存 / 有缓存）。
+
+用法:
+    python bench_startup.py              # 默认统计 main / scraper / notifier / engine
+    python bench_startup.py scraper      # 指定模块
+    python bench_startup.py --top 15 --repeat 10
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+def run_python(code, env=None, importtime=False):
+    args = [sys.executable]
+    if importtime:
+        args += ["-X", "importtime"]
+    args += ["-c", code]
+    return subprocess.run(args, cwd=HERE, env=env, capture_output=True, text=True, check=True)
+
+def import_profile(module):
+    """
+    Returns (total_us, children) for `import module`, where children are
+    (cumulative_us, name) of the modules it imports directly.
+    """
+    stderr = run_python(f"import {module}", importtime=True).stderr
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        # import time:   self [us] | cumulative | imported package（缩进表示层级）
+        _, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        depth = (len(name) - len(name.lstrip(" "))) // 2
+        rows.append((depth, int(cumulative_us), name.strip()))
+
+    # 子模块先于父模块输出：从目标模块所在行向上，直到遇到同级或更高层级的行
+    index = max(i for i, row in enumerate(rows) if row[2] == module)
+    base_depth, total, _ = rows[index]
+    children = []
+    for depth, cumulative, name in reversed(rows[:index]):
+        if depth <= base_depth:
+            break
+        if depth == base_depth + 1:
+            children.append((cumulative, name))
+    children.sort(reverse=True)
+    return total, children
+
+def wall_time(code, repeat, env=None):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run_python(code, env=env)
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("modules", nargs="*", default=["main", "scraper", "notifier", "engine"])
+    parser.add_argument("--top", type=int, default=8, help="heaviest direct imports to list per module")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print("== import time (python -X importtime) ==")
+    for module in args.modules:
+        total, children = import_profile(module)
+        print(f"\n{module}: {total / 1000:.1f}ms")
+        for cumulative, name in children[:args.top]:
+            print(f"    {cumulative / 1000:>8.1f}ms  {name}")
+
+    print("\n== cold start (median wall time, includes interpreter startup) ==")
+    baseline = wall_time("pass", args.repeat)
+    off_window = wall_time("import main", args.repeat)
+    full_path = wall_time("import main, scraper, engine, notifier, report, render, aiohttp", args.repeat)
+    print(f"{'python -c pass':<36}{baseline * 1000:>8.1f}ms")
+    print(f"{'off-window run (import main)':<36}{off_window * 1000:>8.1f}ms")
+    print(f"{'reporting run (all modules)':<36}{full_path * 1000:>8.1f}ms")
+
+    print("\n== first get_headers() ==")
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(os.environ, UA_CACHE_PATH=os.path.join(tmp, "user_agents.json"))
+        code = "import time, scraper; t = time.perf_counter(); scraper.get_headers(); print(time.perf_counter() - t)"
+        cold = float(run_python(code, env=env).stdout.strip().splitlines()[-1])
+        warm = statistics.median(float(run_python(code, env=env).stdout.strip().splitlines()[-1]) for _ in range(args.repeat))
+    print(f"{'no cached pool (fake_useragent)':<36}{cold * 1000:>8.1f}ms")
+    print(f"{'cached pool':<36}{warm * 1000:>8.1f}ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,186 @@
+# breaker.py
+import atexit
+import json
+import os
+import sys
+import threading
+import time
+from urllib.parse import urlsplit
+from config import BREAKER_FAILURE_THRESHOLD, BREAKER_FAILURE_WINDOW, BREAKER_COOLDOWN, BREAKER_MAX_COOLDOWN, BREAKER_STATE_PATH
+
+# 每个接口（域名+路径）一个熔断器：
+#   closed     正常放行，记录连续失败次数，达到阈值后熔断；BREAKER_FAILURE_WINDOW 秒内的多次失败只算一次，
+#              所以同一次运行中对同一接口的多个（并发）请求失败不会直接熔断，要连续几次运行都失败才会
+#   open       冷却期内直接拒绝（抛出 CircuitOpenError），调用方立即走回退，不再等待超时
+#   half_open  冷却结束后只放行一个试探请求：成功则恢复 closed，失败则重新熔断且冷却时间翻倍
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# 除网络异常外也算失败的状态码：服务端错误、拒绝访问（如抖音需要签名）、限流
+FAILURE_STATUSES = {403, 429}
+
+class CircuitOpenError(Exception):
+    """Raised instead of sending a request to an endpoint whose breaker is open."""
+    def __init__(self, endpoint, retry_at):
+        super().__init__(f"circuit open for {endpoint}, next probe in {max(0, retry_at - time.time()) / 60:.0f} min")
+        self.endpoint = endpoint
+        self.retry_at = retry_at
+
+def endpoint_for(url):
+    parts = urlsplit(url)
+    return f"{parts.netloc}{parts.path or '/'}"
+
+def is_failure(status, size):
+    """A response that should count against the breaker (200 with an empty body included)."""
+    return status >= 500 or status in FAILURE_STATUSES or (status == 200 and size == 0)
+
+class BreakerRegistry:
+    """
+    Persistent per-endpoint circuit breakers. State survives between runs
+    in a JSON file, so an endpoint that failed in the last few runs is
+    skipped at once instead of burning its full timeout again.
+    """
+    def __init__(self, path=BREAKER_STATE_PATH, threshold=BREAKER_FAILURE_THRESHOLD,
+                 cooldown=BREAKER_COOLDOWN, max_cooldown=BREAKER_MAX_COOLDOWN, window=BREAKER_FAILURE_WINDOW):
+        self.path = path
+        self.threshold = max(1, threshold)
+        self.window = window
+        self.cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.lock = threading.Lock()
+        self.dirty = False
+        self.probing = set()      # 正在试探的接口（只在本进程内有效）
+        self.rejected = {}        # 本进程内被拒绝的请求数
+        self.breakers = self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def save(self):
+        with self.lock:
+            if not self.dirty:
+                return
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self.breakers, f, ensure_ascii=False, indent=1)
+            os.replace(tmp_path, self.path)
+            self.dirty = False
+
+    def before_request(self, url):
+        """
+        Returns the endpoint key if the request may go ahead; raises
+        CircuitOpenError if the endpoint is open, or half-open with a
+        probe already in flight.
+        """
+        endpoint = endpoint_for(url)
+        with self.lock:
+            breaker = self.breakers.get(endpoint)
+            if breaker is None or breaker["state"] == CLOSED:
+                return endpoint
+            now = time.time()
+            if now < breaker["open_until"] or endpoint in self.probing:
+                self.rejected[endpoint] = self.rejected.get(endpoint, 0) + 1
+                raise CircuitOpenError(endpoint, breaker["open_until"])
+            # 冷却结束：本次请求作为试探
+            breaker["state"] = HALF_OPEN
+            self.probing.add(endpoint)
+            self.dirty = True
+        print(f"Circuit half-open, probing {endpoint}")
+        return endpoint
+
+    def record_success(self, endpoint):
+        with self.lock:
+            self.probing.discard(endpoint)
+            breaker = self.breakers.get(endpoint)
+            if breaker is None:
+                return
+            recovered = breaker["state"] != CLOSED
+            # 恢复后不再保留记录
+            del self.breakers[endpoint]
+            self.dirty = True
+        if recovered:
+            print(f"Circuit closed for {endpoint}")
+            self.save()
+
+    def record_failure(self, endpoint):
+        with self.lock:
+            was_probe = endpoint in self.probing
+            self.probing.discard(endpoint)
+            breaker = self.breakers.setdefault(endpoint, {"state": CLOSED, "failures": 0, "trips": 0, "open_until": 0})
+            now = time.time()
+            breaker["last_failure"] = int(now)
+            self.dirty = True
+            if not was_probe and breaker["state"] == CLOSED and now - breaker.get("counted_at", 0) < self.window:
+                # 窗口内已经记过一次失败
+                return
+            breaker["failures"] += 1
+            breaker["counted_at"] = now
+            if not was_probe and (breaker["state"] == OPEN or breaker["failures"] < self.threshold):
+                # 熔断前已发出的并发请求失败时不再重复熔断
+                return
+            # 达到阈值或试探失败：熔断，冷却时间按熔断次数指数增长
+            breaker["trips"] += 1
+            cooldown = min(self.max_cooldown, self.cooldown * 2 ** (breaker["trips"] - 1))
+            breaker["state"] = OPEN
+            breaker["open_until"] = time.time() + cooldown
+        print(f"Circuit open for {endpoint} ({breaker['failures']} failures), next probe in {cooldown / 3600:.1f}h")
+        self.save()
+
+    def release(self, endpoint):
+        """Drops a probe that ended without a result (cancelled), so the next request may probe."""
+        with self.lock:
+            self.probing.discard(endpoint)
+
+    def reset(self, endpoint=None):
+        with self.lock:
+            if endpoint:
+                self.breakers.pop(endpoint, None)
+            else:
+                self.breakers.clear()
+            self.dirty = True
+
+    def snapshot(self):
+        """{endpoint: state dict} for metrics, with this run's rejection counts."""
+        with self.lock:
+            snapshot = {}
+            for endpoint, breaker in self.breakers.items():
+                state = dict(breaker)
+                state["rejected"] = self.rejected.get(endpoint, 0)
+                snapshot[endpoint] = state
+            return snapshot
+
+_registry = None
+_registry_lock = threading.Lock()
+
+def get_registry():
+    """Returns the shared breaker registry, loading its state on first use."""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = BreakerRegistry()
+            atexit.register(_registry.save)
+    return _registry
+
+if __name__ == "__main__":
+    # 用法: python breaker.py            查看熔断状态
+    #       python breaker.py --reset [接口]  清除全部或单个接口的状态
+    registry = get_registry()
+    if len(sys.argv) > 1 and sys.argv[1] == "--reset":
+        registry.reset(sys.argv[2] if len(sys.argv) > 2 else None)
+        registry.save()
+        print("Reset.")
+        sys.exit(0)
+    breakers = registry.snapshot()
+    if not breakers:
+        print("All circuits closed.")
+    for endpoint, state in sorted(breakers.items()):
+        until = time.strftime("%Y-%m-%d %H:%M", time.localtime(state["open_until"])) if state["state"] != CLOSED else "-"
+        print(f"{state['state']:<10} {state['failures']:>3} failures  {state['trips']:>2} trips  until {until}  {endpoint}")
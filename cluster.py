@@ -0,0 +1,176 @@
+# cluster.py
+import random
+import re
+import sys
+import zlib
+from collections import defaultdict
+from config import CLUSTER_THRESHOLD
+
+# 跨平台相似话题聚类：标题切分为中文单字 / 英文单词 / 数字 token，取相邻 token 二元组作为 shingle，
+# 计算 MinHash 签名后按 LSH 分段（band）建立倒排索引，只与落入同一桶的候选比较，
+# 再用精确 Jaccard 相似度确认
+# 30 段 × 每段 2 行：达到默认阈值 0.7 的标题对几乎必然成为候选，阈值调低到 0.4 时仍有 99% 以上
+NUM_BANDS = 30
+ROWS_PER_BAND = 2
+NUM_PERM = NUM_BANDS * ROWS_PER_BAND
+
+_MASK64 = (1 << 64) - 1
+# 固定种子：band key 会写入历史库，必须在每次运行中保持一致
+_rng = random.Random(20240601)
+# multiply-shift 哈希族：h(x) = ((a * x + b) mod 2^64) >> 32，a 为奇数
+_PERMUTATIONS = [(_rng.getrandbits(64) | 1, _rng.getrandbits(64)) for _ in range(NUM_PERM)]
+
+# 抓取函数加在标题前的图标/来源前缀，如 "💰 "、"[r/python] "
+_PREFIX_RE = re.compile(r'^(?:\[[^\]]*\]\s*|[^\w\s#]+\s*)+')
+# 日期对所有当天话题都相同，不参与相似度计算
+_DATE_RE = re.compile(r'\d{4}年|\d{1,2}月\d{1,2}日')
+_TOKEN_RE = re.compile(r'[\u4e00-\u9fff\u3400-\u4dbf]|[a-z]+|\d+')
+
+def tokenize(title):
+    text = _PREFIX_RE.sub('', title).lower()
+    text = _DATE_RE.sub(' ', text)
+    return _TOKEN_RE.findall(text)
+
+def shingles(title):
+    """Adjacent-token bigrams of a title (single tokens for one-token titles)."""
+    tokens = tokenize(title)
+    if len(tokens) < 2:
+        return frozenset(tokens)
+    return frozenset(a + ' ' + b for a, b in zip(tokens, tokens[1:]))
+
+def jaccard(a, b):
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+def minhash(shingle_set):
+    hashes = [zlib.crc32(s.encode('utf-8')) for s in shingle_set]
+    return [min([(a * h + b) & _MASK64 for h in hashes]) >> 32 for a, b in _PERMUTATIONS]
+
+def band_keys(shingle_set):
+    """
+    LSH bucket keys for a shingle set: one 64-bit integer per band,
+    the band number in the high bits. Empty sets have no keys.
+    """
+    if not shingle_set:
+        return []
+    signature = minhash(shingle_set)
+    keys = []
+    for band in range(NUM_BANDS):
+        rows = signature[band * ROWS_PER_BAND:(band + 1) * ROWS_PER_BAND]
+        digest = zlib.crc32(','.join(map(str, rows)).encode())
+        keys.append((band << 32) | digest)
+    return keys
+
+def title_band_keys(title):
+    return band_keys(shingles(title))
+
+class LSHIndex:
+    """
+    In-memory MinHash LSH index. add() returns the ids of earlier
+    entries whose Jaccard similarity reaches the threshold; only entries
+    sharing a bucket are compared, so each insert is sub-linear.
+    """
+    def __init__(self, threshold=CLUSTER_THRESHOLD):
+        self.threshold = threshold
+        self.buckets = defaultdict(list)
+        self.entries = []
+
+    def add(self, shingle_set):
+        entry_id = len(self.entries)
+        keys = band_keys(shingle_set)
+        candidates = set()
+        for key in keys:
+            bucket = self.buckets[key]
+            candidates.update(bucket)
+            bucket.append(entry_id)
+        self.entries.append(shingle_set)
+        matches = [c for c in candidates if jaccard(shingle_set, self.entries[c]) >= self.threshold]
+        return entry_id, matches
+
+def _join(clusters, membership, sets, i, matches, threshold):
+    """
+    Adds title i to the earliest cluster of its matches whose every
+    member is similar to it (complete linkage), or starts a new one.
+    Chains of pairwise matches (A~B, B~C) never merge A and C on their own.
+    """
+    for cluster_id in sorted({membership[j] for j in matches}):
+        if all(jaccard(sets[i], sets[m]) >= threshold for m in clusters[cluster_id]):
+            clusters[cluster_id].append(i)
+            membership[i] = cluster_id
+            return
+    membership[i] = len(clusters)
+    clusters.append([i])
+
+def cluster_titles(titles, threshold=None):
+    """
+    Groups near-duplicate titles. Returns clusters as lists of indices
+    into titles (singletons included), in order of first appearance.
+    """
+    threshold = threshold if threshold is not None else CLUSTER_THRESHOLD
+    index = LSHIndex(threshold)
+    clusters, membership = [], {}
+    for i, title in enumerate(titles):
+        _, matches = index.add(shingles(title))
+        _join(clusters, membership, index.entries, i, matches, threshold)
+    return clusters
+
+def apply_clusters(report, threshold=None):
+    """
+    Renders each cross-platform topic once: the first occurrence in
+    report order keeps its place and lists the other platforms in
+    item.also_on; the duplicates are removed from their sections.
+    Returns the number of clusters found.
+    """
+    entries = [(section, item) for section in report.sections for item in section.items if not item.placeholder]
+    clusters = cluster_titles([item.title for _, item in entries], threshold)
+
+    removed = set()
+    found = 0
+    for members in clusters:
+        platforms = []
+        for i in members:
+            name = entries[i][0].name
+            if name not in platforms:
+                platforms.append(name)
+        if len(platforms) < 2:
+            continue
+        found += 1
+        keeper_section, keeper = entries[members[0]]
+        keeper.also_on = [name for name in platforms if name != keeper_section.name]
+        for i in members[1:]:
+            section, item = entries[i]
+            if section is not keeper_section:
+                removed.add(id(item))
+
+    if removed:
+        for section in report.sections:
+            section.items = [item for item in section.items if id(item) not in removed]
+    return found
+
+def similar_in_history(store, title, threshold=None, limit=20):
+    """
+    Finds recorded titles similar to `title` across the whole history
+    store, looking up its LSH buckets in the title_bands table.
+    Returns [(title, similarity)], most similar first.
+    """
+    threshold = threshold if threshold is not None else CLUSTER_THRESHOLD
+    shingle_set = shingles(title)
+    candidates = store.titles_for_bands(band_keys(shingle_set))
+    scored = [(candidate, jaccard(shingle_set, shingles(candidate))) for candidate in candidates]
+    scored = [pair for pair in scored if pair[1] >= threshold]
+    scored.sort(key=lambda pair: pair[1], reverse=True)
+    return scored[:limit]
+
+if __name__ == "__main__":
+    # 用法: python cluster.py "<标题>"     在历史库中查找相似话题
+    #       python cluster.py --backfill   为旧的历史记录补建 LSH 索引
+    from history import get_store
+    store = get_store()
+    if len(sys.argv) > 1 and sys.argv[1] == "--backfill":
+        print(f"Indexed {store.backfill_bands()} titles.")
+    elif len(sys.argv) > 1:
+        for similar, score in similar_in_history(store, sys.argv[1]):
+            print(f"{score:.2f}  {similar}")
+    else:
+        print('Usage: python cluster.py "<title>" | --backfill')
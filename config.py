@@ -13,26 +13,101 @@ SERVERCHAN_KEY = os.getenv("SERVERCHAN_KEY", "")
 
 # Scraper Configuration
 USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
+# 随机 User-Agent 池：从 fake_useragent 抽取 UA_POOL_SIZE 个缓存到本地，UA_CACHE_TTL 秒后重新抽取
+UA_POOL_SIZE = int(os.getenv("UA_POOL_SIZE", "50"))
+UA_CACHE_PATH = os.getenv("UA_CACHE_PATH", ".cache/user_agents.json")
+UA_CACHE_TTL = float(os.getenv("UA_CACHE_TTL", str(7 * 24 * 3600)))
 
 # Platform Switches
-ENABLE_WEIBO = True
-ENABLE_DOUYIN = True
-ENABLE_XHS = True
-ENABLE_TWITTER = False  # 暂时隐藏，以后完善
-ENABLE_BAIDU = True
-ENABLE_ZHIHU = True
-ENABLE_BILIBILI = True
-ENABLE_KUAISHOU = True
-ENABLE_XIGUA = True
-ENABLE_LINUXDO = False  # 暂时隐藏，以后完善
-ENABLE_52POJIE = False
-ENABLE_YOUTUBE = False
-ENABLE_FINANCE = True
-ENABLE_REDDIT = False
-ENABLE_STACKOVERFLOW = False
-ENABLE_XIANYU = True
-ENABLE_XMFISH = True
-ENABLE_NETEASE = True
+# 各平台的默认开关、显示顺序、刷新间隔、条数和超时见 platforms.py；这里按平台名（逗号分隔）覆盖默认开关，
+# 如 PLATFORMS_ENABLE="YouTube,Reddit" PLATFORMS_DISABLE="Xianyu"
+PLATFORMS_ENABLE = os.getenv("PLATFORMS_ENABLE", "")
+PLATFORMS_DISABLE = os.getenv("PLATFORMS_DISABLE", "")
+# 每个推送时段只包含部分平台，如 "morning_7am=Weibo,Baidu,财经;night_10pm=all"，未列出的时段包含所有启用的平台
+REPORT_PLATFORMS = os.getenv("REPORT_PLATFORMS", "")
+
+# Fetch Engine Configuration
+# 所有平台在共享事件循环上并发抓取：同时抓取的平台数上限（开销大的平台先开始），以及整轮抓取的截止时间（秒）
+# 超过截止时间仍未返回的平台会被标记为超时，已返回的结果照常推送
+FETCH_MAX_WORKERS = int(os.getenv("FETCH_MAX_WORKERS", "8"))
+FETCH_DEADLINE = float(os.getenv("FETCH_DEADLINE", "90"))
+# HTTP连接池：所有抓取和推送共用长连接
+# HTTP_POOL_SIZE 为连接总数上限，HTTP_PER_HOST_LIMIT 为同一域名的连接（并发请求）上限，
+# HTTP_KEEPALIVE 为空闲连接保持时间（秒）
+HTTP_POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", "32"))
+HTTP_PER_HOST_LIMIT = int(os.getenv("HTTP_PER_HOST_LIMIT", "4"))
+HTTP_KEEPALIVE = float(os.getenv("HTTP_KEEPALIVE", "30"))
+
+# HTTP Response Cache
+# 整页HTML（新浪财经、网易新闻、小鱼网、52破解）缓存在本地，下次运行发送条件请求，
+# 返回304时直接使用缓存内容。HTTP_CACHE_TTL 为条目有效期（秒），HTTP_CACHE_MAX_BYTES 为缓存总大小上限
+HTTP_CACHE_ENABLED = os.getenv("HTTP_CACHE_ENABLED", "true").lower() == "true"
+HTTP_CACHE_DIR = os.getenv("HTTP_CACHE_DIR", ".cache/http")
+HTTP_CACHE_TTL = float(os.getenv("HTTP_CACHE_TTL", str(3 * 24 * 3600)))
+HTTP_CACHE_MAX_BYTES = int(os.getenv("HTTP_CACHE_MAX_BYTES", str(50 * 1024 * 1024)))
+
+# Fallback Race Mode
+# 开启后，微博/知乎/西瓜等多来源平台不再逐个尝试：主来源先发出，
+# 备用来源在 RACE_HEDGE_DELAY 秒后（0 表示同时）发出，仍按来源优先级取第一个有效结果
+RACE_MODE = os.getenv("RACE_MODE", "true").lower() == "true"
+RACE_HEDGE_DELAY = float(os.getenv("RACE_HEDGE_DELAY", "1.0"))
+
+# Report Rendering
+# HTML报告中每个平台显示的条数
+REPORT_ITEM_LIMIT = int(os.getenv("REPORT_ITEM_LIMIT", "12"))
+
+# History Store
+# 每次运行的榜单快照保存到本地 SQLite（平台、排名、标题、链接、热度、时间）
+HISTORY_ENABLED = os.getenv("HISTORY_ENABLED", "true").lower() == "true"
+HISTORY_DB_PATH = os.getenv("HISTORY_DB_PATH", "data/history.db")
+# 推送模式：full 推送完整榜单；diff 只推送与上一次运行相比新上榜、排名上升/下降和下榜的条目（需开启历史快照）
+PUSH_MODE = os.getenv("PUSH_MODE", "full").lower()
+
+# Cross-platform Clustering
+# 多个平台上的同一话题只显示一次，并标注出现的其他平台；CLUSTER_THRESHOLD 为标题相似度（Jaccard）阈值，
+# 同一组内的标题两两都要达到阈值。短标题只差一两个字（如"北京今日天气"/"上海今日天气"）相似度也很高，阈值不宜过低
+CLUSTER_ENABLED = os.getenv("CLUSTER_ENABLED", "true").lower() == "true"
+CLUSTER_THRESHOLD = float(os.getenv("CLUSTER_THRESHOLD", "0.7"))
+
+# Daemon Mode (python main.py --daemon)
+# 常驻进程：各平台按自己的间隔（秒）在后台刷新，到推送时间直接用内存中的最新数据生成报告
+DAEMON_REPORT_TIMES = os.getenv("DAEMON_REPORT_TIMES", "07:00,12:00,17:00,22:00")  # 北京时间
+DAEMON_DEFAULT_INTERVAL = int(os.getenv("DAEMON_DEFAULT_INTERVAL", "900"))
+# 覆盖单个平台的刷新间隔，如 "Weibo=180,Xmfish=7200"
+DAEMON_INTERVALS = os.getenv("DAEMON_INTERVALS", "")
+# 推送前多少秒强制刷新一次所有平台，保证报告数据足够新
+DAEMON_PREFETCH_LEAD = int(os.getenv("DAEMON_PREFETCH_LEAD", "120"))
+
+# Circuit Breaker
+# 连续失败 BREAKER_FAILURE_THRESHOLD 次的接口（按域名+路径区分）会被熔断，熔断期间直接跳过，不再等待超时；
+# BREAKER_FAILURE_WINDOW 秒内的多次失败只算一次（同一次运行内对同一接口的多个请求），即默认要连续3次运行都失败才熔断；
+# 冷却 BREAKER_COOLDOWN 秒后放行一次试探请求，试探失败则冷却时间翻倍，最长 BREAKER_MAX_COOLDOWN 秒
+# 状态保存在 BREAKER_STATE_PATH，跨运行保留（每天4次运行，默认冷却6小时即跳过下一次运行）
+BREAKER_ENABLED = os.getenv("BREAKER_ENABLED", "true").lower() == "true"
+BREAKER_FAILURE_THRESHOLD = int(os.getenv("BREAKER_FAILURE_THRESHOLD", "3"))
+BREAKER_FAILURE_WINDOW = float(os.getenv("BREAKER_FAILURE_WINDOW", "1800"))
+BREAKER_COOLDOWN = float(os.getenv("BREAKER_COOLDOWN", str(6 * 3600)))
+BREAKER_MAX_COOLDOWN = float(os.getenv("BREAKER_MAX_COOLDOWN", str(3 * 24 * 3600)))
+BREAKER_STATE_PATH = os.getenv("BREAKER_STATE_PATH", ".cache/breakers.json")
+
+# Fetch Metrics
+# 每个平台的抓取耗时、HTTP 各阶段耗时、字节数、解析 CPU 时间、条数和回退层级（见 metrics.py）
+# 单次运行结束后写入 JSON 汇总；常驻模式下在 METRICS_HOST:METRICS_PORT 提供 Prometheus 文本格式的 /metrics（端口 0 表示关闭）
+# 默认只监听本机；需要从其他机器（或 Docker 容器外）抓取时设 METRICS_HOST=0.0.0.0
+METRICS_SUMMARY_PATH = os.getenv("METRICS_SUMMARY_PATH", "data/metrics.json")
+METRICS_HOST = os.getenv("METRICS_HOST", "127.0.0.1")
+METRICS_PORT = int(os.getenv("METRICS_PORT", "9108"))
+
+# Record / Replay
+# REPLAY_MODE=record 把每个抓取请求的真实响应录制到 REPLAY_DIR；REPLAY_MODE=replay 时所有抓取请求
+# 改由本地替身服务器返回录制的响应，无网络也能完整运行（见 replay.py、bench_replay.py）
+REPLAY_MODE = os.getenv("REPLAY_MODE", "").lower()
+REPLAY_DIR = os.getenv("REPLAY_DIR", "fixtures")
+
+# Keyword Filters
+# 财经/民生/推特中文话题等过滤关键词，默认值见 keywords.py；
+# 可在 JSON 文件中按分类覆盖，如 {"finance": ["央行", "LPR"], "livelihood": ["就业"]}，文件不存在时使用默认值
+KEYWORDS_FILE = os.getenv("KEYWORDS_FILE", "keywords.json")
 
 # Cookies & Tokens (Required for strict platforms)
 # Login to web version -> F12 -> Network -> Copy 'Cookie' string
@@ -47,18 +122,55 @@ WECHAT_APPID = os.getenv("WECHAT_APPID", "")
 WECHAT_APPSECRET = os.getenv("WECHAT_APPSECRET", "")
 WECHAT_TEMPLATE_ID = os.getenv("WECHAT_TEMPLATE_ID", "")
 WECHAT_USER_OPENID = os.getenv("WECHAT_USER_OPENID", "")
+# access_token 缓存（见 wechat_token.py）：过期前多少秒重新获取。token 等同于密码，不放在 .cache/ 下
+# （GitHub Actions 会缓存 .cache/ 和 data/）；在 GitHub Actions 中默认只缓存在内存，设为空也只缓存在内存
+WECHAT_TOKEN_CACHE_PATH = os.getenv("WECHAT_TOKEN_CACHE_PATH",
+                                    "" if os.getenv("GITHUB_ACTIONS") == "true" else ".secrets/wechat_token.json")
+WECHAT_TOKEN_REFRESH_MARGIN = int(os.getenv("WECHAT_TOKEN_REFRESH_MARGIN", "300"))
 
 # WxPusher Configuration (推荐，支持长文本)
 # Get from https://wxpusher.zjiecode.com/
 WXPUSHER_APP_TOKEN = os.getenv("WXPUSHER_APP_TOKEN", "")
 WXPUSHER_USER_UID = os.getenv("WXPUSHER_USER_UID", "")
+# 推送给订阅了这些主题的所有用户，逗号分隔的主题 id
+WXPUSHER_TOPIC_IDS = os.getenv("WXPUSHER_TOPIC_IDS", "")
+# 每个请求最多包含的接收者（uid + topicId）数量
+WXPUSHER_BATCH_SIZE = int(os.getenv("WXPUSHER_BATCH_SIZE", "2000"))
+
+# Push Fan-out
+# PUSH_CHANNELS: all 同时推送到所有已配置的渠道（默认）；first 只用优先级最高的一个（WxPusher > 微信测试号 > PushPlus > Server酱）；
+# 也可以列出渠道名，如 "wxpusher,pushplus"。WXPUSHER_USER_UID、WECHAT_USER_OPENID、PUSHPLUS_TOKEN、SERVERCHAN_KEY 可用逗号分隔多个接收人
+PUSH_CHANNELS = os.getenv("PUSH_CHANNELS", "all")
+# 所有接收人并发发送：总并发数、单个渠道的并发上限、单个请求超时和整轮推送的截止时间（秒）
+PUSH_MAX_WORKERS = int(os.getenv("PUSH_MAX_WORKERS", "8"))
+PUSH_PER_CHANNEL_LIMIT = int(os.getenv("PUSH_PER_CHANNEL_LIMIT", "4"))
+PUSH_TIMEOUT = float(os.getenv("PUSH_TIMEOUT", "10"))
+PUSH_DEADLINE = float(os.getenv("PUSH_DEADLINE", "60"))
+# 截止时间到了以后，已经发出的请求再等多少秒拿到结果（默认与 PUSH_TIMEOUT 相同）；仍没有结果的记为 unknown，不会重发
+PUSH_DEADLINE_GRACE = float(os.getenv("PUSH_DEADLINE_GRACE", "10"))
+
+# 订阅者名单（见 subscribers.py），与上面各渠道配置的接收人合并；包含 token，放在不提交的 data/ 下
+SUBSCRIBERS_FILE = os.getenv("SUBSCRIBERS_FILE", "data/subscribers.json")
+
+# Push Outbox
+# 开启后报告先写入本地发件箱（SQLite），再发送；发送失败的按指数退避重试（OUTBOX_RETRY_BASE 秒起翻倍，
+# 最长 OUTBOX_RETRY_MAX 秒，带随机抖动），OUTBOX_MAX_ATTEMPTS 次后放弃（死信），超过 OUTBOX_MAX_AGE 秒的报告不再发送。
+# 单次运行时在 OUTBOX_RUN_RETRY_WINDOW 秒内按退避时间继续重试，仍未发出的在下次运行时补发（需保留 OUTBOX_DB_PATH，
+# OUTBOX_MAX_AGE 默认12小时，大于两次定时运行的最大间隔9小时）；常驻模式下由后台线程发送，不影响抓取
+OUTBOX_ENABLED = os.getenv("OUTBOX_ENABLED", "true").lower() == "true"
+OUTBOX_DB_PATH = os.getenv("OUTBOX_DB_PATH", "data/outbox.db")
+OUTBOX_MAX_ATTEMPTS = int(os.getenv("OUTBOX_MAX_ATTEMPTS", "6"))
+OUTBOX_RETRY_BASE = float(os.getenv("OUTBOX_RETRY_BASE", "30"))
+OUTBOX_RETRY_MAX = float(os.getenv("OUTBOX_RETRY_MAX", "1800"))
+OUTBOX_MAX_AGE = float(os.getenv("OUTBOX_MAX_AGE", str(12 * 3600)))
+OUTBOX_RUN_RETRY_WINDOW = float(os.getenv("OUTBOX_RUN_RETRY_WINDOW", "180"))
 
 # Scheduling Configuration (for daily morning/evening reports)
 # Use cron to schedule automatic runs:
 # 1. Morning report at 8:30 AM: 30 8 * * * cd /path/to/cadname && python3 main.py
 # 2. Evening report at 8:30 PM: 30 20 * * * cd /path/to/cadname && python3 main.py
 # 
-# Enable/disable platforms by setting ENABLE_* variables above to True/False
+# Enable/disable platforms with PLATFORMS_ENABLE / PLATFORMS_DISABLE (defaults in platforms.py)
 # Configure push services by setting PUSHPLUS_TOKEN or SERVERCHAN_KEY
 # Set cookies for platforms that require login (Xiaohongshu, Zhihu, etc.)
 
@@ -0,0 +1,238 @@
+# daemon.py
+import asyncio
+import datetime
+import signal
+import threading
+import time
+from config import DAEMON_REPORT_TIMES, DAEMON_DEFAULT_INTERVAL, DAEMON_INTERVALS, DAEMON_PREFETCH_LEAD, FETCH_DEADLINE, METRICS_HOST, METRICS_PORT
+from config import OUTBOX_ENABLED, PUSH_DEADLINE
+from metrics import track_fetch
+
+def parse_intervals(spec):
+    """Parses "Weibo=180,Xmfish=7200" into {"Weibo": 180, "Xmfish": 7200}."""
+    intervals = {}
+    for part in spec.split(","):
+        if "=" not in part:
+            continue
+        platform, seconds = part.split("=", 1)
+        try:
+            intervals[platform.strip()] = max(30, int(seconds))
+        except ValueError:
+            print(f"Ignoring invalid interval: {part}")
+    return intervals
+
+def parse_report_times(spec):
+    """Parses "07:00,12:00" into sorted (hour, minute) pairs."""
+    times = []
+    for part in spec.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        hour, _, minute = part.partition(":")
+        times.append((int(hour) % 24, int(minute or 0) % 60))
+    return sorted(set(times))
+
+def next_report_time(now, report_times):
+    """First report time strictly after now (naive Beijing datetimes)."""
+    for day in range(2):
+        date = now.date() + datetime.timedelta(days=day)
+        for hour, minute in report_times:
+            slot = datetime.datetime.combine(date, datetime.time(hour, minute))
+            if slot > now:
+                return slot
+    return None
+
+class PlatformState:
+    """Latest result of one platform and when to refresh it next."""
+    def __init__(self, platform, fetcher, interval):
+        self.platform = platform
+        self.fetcher = fetcher
+        self.interval = interval
+        self.items = None          # 最近一次成功抓取的结果
+        self.status = "error"
+        self.fetched_at = None     # time.monotonic()
+        self.next_due = 0.0
+        self.in_flight = None      # 正在进行的刷新（concurrent.futures.Future）
+        self.failures = 0
+
+class Daemon:
+    """
+    Resident scheduler. Each platform's fetcher runs on the shared
+    http_client loop on its own interval, so sessions, keep-alive
+    connections and the HTTP cache stay warm between reports, and the
+    latest good result of every platform is kept in memory. At each
+    report time the report is built from that state, so the slot costs
+    only report building, diffing and sending.
+    """
+    def __init__(self, tasks, report_times=None, intervals=None, prefetch_lead=None):
+        intervals = intervals or {}
+        self.states = [PlatformState(platform, fetcher, intervals.get(platform, DAEMON_DEFAULT_INTERVAL))
+                       for platform, fetcher in tasks]
+        self.report_times = report_times or [(7, 0), (12, 0), (17, 0), (22, 0)]
+        self.prefetch_lead = prefetch_lead if prefetch_lead is not None else DAEMON_PREFETCH_LEAD
+        self.lock = threading.Lock()
+        self.stop_event = threading.Event()
+
+    async def _fetch(self, state):
+        print(f"Scraping {state.platform}...")
+        with track_fetch(state.platform) as record:
+            items = await asyncio.wait_for(state.fetcher(), FETCH_DEADLINE)
+            record.items = len(items or [])
+        return items
+
+    def refresh(self, state):
+        """Starts a background refresh of one platform unless one is running."""
+        import http_client
+
+        with self.lock:
+            if state.in_flight is not None:
+                return
+            started = time.monotonic()
+            state.next_due = started + state.interval
+            future = http_client.submit(self._fetch(state))
+            state.in_flight = future
+        future.add_done_callback(lambda f: self._on_done(state, f, started))
+
+    def _on_done(self, state, future, started):
+        elapsed = time.monotonic() - started
+        try:
+            items = future.result()
+            error = None
+        except asyncio.TimeoutError:
+            items, error = None, "timeout"
+        except Exception as e:
+            items, error = None, e
+
+        with self.lock:
+            state.in_flight = None
+            if error is None:
+                state.items = items
+                state.status = "ok"
+                state.fetched_at = time.monotonic()
+                state.failures = 0
+                print(f"{state.platform} refreshed in {elapsed:.1f}s ({len(items or [])} items)")
+            else:
+                state.failures += 1
+                if state.items is None:
+                    state.status = "timeout" if error == "timeout" else "error"
+                # 失败后按 1/4 间隔重试，之后逐次加倍，不超过正常间隔
+                retry = min(state.interval, state.interval / 4 * 2 ** (state.failures - 1))
+                state.next_due = time.monotonic() + retry
+                print(f"{state.platform} refresh failed ({error}), retrying in {retry:.0f}s")
+
+    def snapshot(self):
+        """
+        (data, status) from the in-memory state, in report order, in the
+        same shape as engine.run_fetchers(). A platform that failed its
+        latest refresh keeps its last good list.
+        """
+        data, status = {}, {}
+        with self.lock:
+            for state in self.states:
+                if state.items is not None:
+                    data[state.platform] = state.items
+                    status[state.platform] = "ok"
+                elif state.status == "timeout":
+                    data[state.platform] = [{"title": f"{state.platform} Timeout", "url": "", "hot": ""}]
+                    status[state.platform] = "timeout"
+                else:
+                    data[state.platform] = [{"title": f"{state.platform} Error", "url": "", "hot": "暂无数据"}]
+                    status[state.platform] = "error"
+        return data, status
+
+    def wait_for_first_results(self, timeout):
+        """
+        Blocks until every platform has either data or no refresh in
+        flight, or timeout seconds pass. Platforms that already have a
+        list are never waited for.
+        """
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline and not self.stop_event.is_set():
+            with self.lock:
+                if all(state.items is not None or state.in_flight is None for state in self.states):
+                    return
+            self.stop_event.wait(0.2)
+
+    def report(self, slot):
+        from main import get_time_period, publish
+        from platforms import for_report
+
+        start = time.monotonic()
+        data, status = self.snapshot()
+        period = get_time_period(slot) or ("noon_12pm", f"🔥 {slot:%H:%M}·热点速递")
+        # 只保留该时段要推送的平台（REPORT_PLATFORMS）
+        names = {platform.name for platform in for_report(period[0])}
+        data = {platform: items for platform, items in data.items() if platform in names}
+        publish(data, status, period[0], period[1], slot)
+        print(f"Report for {slot:%H:%M} done in {time.monotonic() - start:.2f}s")
+
+    def run(self):
+        from main import beijing_time
+
+        print(f"Daemon started: {len(self.states)} platforms, reports at "
+              f"{', '.join(f'{h:02d}:{m:02d}' for h, m in self.report_times)} (Beijing time)")
+        next_slot = next_report_time(beijing_time(), self.report_times)
+        prefetched = False
+
+        while not self.stop_event.is_set():
+            now = time.monotonic()
+            for state in self.states:
+                if state.in_flight is None and now >= state.next_due:
+                    self.refresh(state)
+
+            to_slot = (next_slot - beijing_time()).total_seconds()
+            if not prefetched and to_slot <= self.prefetch_lead:
+                # 推送前强制刷新所有平台
+                print(f"Prefetching all platforms for the {next_slot:%H:%M} report...")
+                for state in self.states:
+                    self.refresh(state)
+                prefetched = True
+            if to_slot <= 0:
+                self.wait_for_first_results(FETCH_DEADLINE)
+                try:
+                    self.report(next_slot)
+                except Exception as e:
+                    print(f"Report Error: {e}")
+                next_slot = next_report_time(beijing_time(), self.report_times)
+                prefetched = False
+                continue
+
+            # 睡到下一个刷新或推送时间，最长 30 秒（应对系统时间调整）
+            with self.lock:
+                next_due = min((state.next_due for state in self.states if state.in_flight is None), default=now + 30)
+            sleep_for = min(next_due - now, to_slot - self.prefetch_lead if not prefetched else to_slot, 30)
+            self.stop_event.wait(max(0.05, sleep_for))
+
+        print("Daemon stopped.")
+
+    def stop(self, *_):
+        self.stop_event.set()
+
+def run_daemon():
+    from platforms import enabled_platforms
+    # 报告相关模块提前导入，推送时只剩生成和发送
+    import notifier, render, report  # noqa: F401
+
+    platforms = enabled_platforms()
+    # 刷新间隔以 platforms.py 中的为默认值，DAEMON_INTERVALS 覆盖
+    intervals = {platform.name: platform.interval for platform in platforms}
+    intervals.update(parse_intervals(DAEMON_INTERVALS))
+    daemon = Daemon(
+        [platform.task() for platform in platforms],
+        report_times=parse_report_times(DAEMON_REPORT_TIMES),
+        intervals=intervals,
+    )
+    if METRICS_PORT:
+        # Prometheus 抓取地址: http://METRICS_HOST:METRICS_PORT/metrics
+        import metrics
+        metrics.serve(METRICS_PORT, METRICS_HOST)
+    # 推送由后台线程从发件箱发送，慢的推送接口不会耽误抓取
+    worker = None
+    if OUTBOX_ENABLED:
+        import outbox
+        worker = outbox.start_worker()
+    signal.signal(signal.SIGTERM, daemon.stop)
+    signal.signal(signal.SIGINT, daemon.stop)
+    daemon.run()
+    if worker:
+        worker.stop(timeout=PUSH_DEADLINE)
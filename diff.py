@@ -0,0 +1,74 @@
+# diff.py
+from dataclasses import replace
+from config import REPORT_ITEM_LIMIT
+from report import ReportItem
+
+NEW = "new"
+RISING = "rising"
+FALLING = "falling"
+SAME = "same"
+DROPPED = "dropped"
+
+# 增量推送中保留的变化类型
+CHANGED = (NEW, RISING, FALLING)
+
+def diff_section(section, previous, limit=None):
+    """
+    Classifies a section's items against the previous snapshot of the
+    same platform (rows from HistoryStore.last_snapshot()), in place.
+    Items are matched by title; titles that disappeared go to section.dropped.
+    Only the top limit items of both lists (REPORT_ITEM_LIMIT by default)
+    are compared, the part of the list the report shows.
+    """
+    limit = limit or REPORT_ITEM_LIMIT
+    # 只比较报告中显示的前 limit 条：从第 30 名升到第 20 名读者看不到，
+    # 掉出显示范围的条目算作下榜，进入显示范围的算作新上榜
+    previous = previous[:limit]
+    prev_ranks = {}
+    for row in previous:
+        prev_ranks.setdefault(row["title"], row["rank"])
+
+    seen = set()
+    for item in section.items[:limit]:
+        if item.placeholder:
+            continue
+        seen.add(item.title)
+        prev_rank = prev_ranks.get(item.title)
+        item.prev_rank = prev_rank
+        if prev_rank is None:
+            item.change = NEW
+        elif item.rank < prev_rank:
+            item.change = RISING
+        elif item.rank > prev_rank:
+            item.change = FALLING
+        else:
+            item.change = SAME
+
+    section.dropped = [
+        ReportItem(rank=row["rank"], title=row["title"], url=row["url"] or "#", hot=row["hot"] or "", change=DROPPED, prev_rank=row["rank"])
+        for row in previous if row["title"] not in seen
+    ]
+
+def apply_diff(report, store):
+    """
+    Compares every successfully fetched platform with its last recorded
+    run. Must run before the report itself is recorded. A platform with
+    no earlier snapshot has all of its items marked new.
+    """
+    for section in report.sections:
+        if section.status != "ok":
+            continue
+        diff_section(section, store.last_snapshot(section.name))
+    return report
+
+def delta_report(report):
+    """
+    Returns a copy of a diffed report that keeps only new, rising and
+    falling items plus dropped ones; unchanged platforms are left out.
+    """
+    sections = []
+    for section in report.sections:
+        changed = [item for item in section.items if item.change in CHANGED]
+        if changed or section.dropped:
+            sections.append(replace(section, items=changed))
+    return replace(report, sections=sections)
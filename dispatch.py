@@ -0,0 +1,186 @@
+# dispatch.py
+import time
+from collections import deque, namedtuple
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from dataclasses import dataclass, field, asdict
+from config import PUSH_MAX_WORKERS, PUSH_PER_CHANNEL_LIMIT, PUSH_DEADLINE, PUSH_DEADLINE_GRACE
+from http_client import get_sync_session
+from metrics import METRICS
+
+# 多渠道并发推送：同一份报告同时发到所有渠道的所有接收人
+#   prepare(report, session)           每个渠道只执行一次（渲染正文、获取 access_token 等），结果供该渠道所有接收人共用
+#   deliver(prepared, recipient, session)  发给一个接收人（或一个 Batch），失败时抛出异常，
+#                                          批量发送中部分接收人失败时抛出 PartialDelivery
+# 线程池总并发为 PUSH_MAX_WORKERS，每个渠道同时最多 PUSH_PER_CHANNEL_LIMIT 个请求，空闲线程轮流分给各渠道，
+# 所以一个慢渠道（或接收人很多的渠道）不会占满线程池、拖慢其他渠道
+
+Channel = namedtuple("Channel", "name recipients prepare deliver")
+
+# 一次请求发给多个接收人（如 WxPusher 的 uids/topicIds），回执按批记录
+Batch = namedtuple("Batch", "label members")
+
+class PartialDelivery(Exception):
+    """Some members of a batch were not delivered; failed maps member -> error."""
+    def __init__(self, failed):
+        super().__init__(f"{len(failed)} recipients failed")
+        self.failed = failed
+
+@dataclass
+class DeliveryReceipt:
+    channel: str
+    recipient: str          # 已脱敏；批量发送时为批次名
+    result: str             # ok / partial / error / timeout（未发出）/ unknown（已发出但没等到结果，可能已送达）
+    latency: float = 0.0    # 请求本身的耗时，不含排队时间
+    error: str = ""
+    sent_at: float = 0.0
+    count: int = 1          # 接收人数（批量发送时为批次大小）
+    failed: list = field(default_factory=list)  # 批量发送中失败的接收人（已脱敏）
+    failed_members: list = field(default_factory=list, repr=False)  # 同上，未脱敏，供 outbox 补发
+
+    @property
+    def delivered(self):
+        if self.result == "ok":
+            return self.count
+        return self.count - len(self.failed) if self.result == "partial" else 0
+
+    @property
+    def ok(self):
+        return self.result == "ok"
+
+    def as_dict(self):
+        data = asdict(self)
+        del data["failed_members"]
+        data["latency"] = round(self.latency, 3)
+        return data
+
+def mask(recipient):
+    """Shortens a uid / openid / token for logs, e.g. UID_sP…1o."""
+    recipient = str(recipient)
+    return recipient if len(recipient) <= 8 else f"{recipient[:5]}…{recipient[-2:]}"
+
+def _timed(func, *args):
+    start = time.perf_counter()
+    try:
+        return func(*args), time.perf_counter() - start, None
+    except Exception as e:
+        return None, time.perf_counter() - start, e
+
+def dispatch(report, channels, session=None, max_workers=None, per_channel=None, deadline=None, grace=None):
+    """
+    Sends the report to every recipient of every channel in parallel.
+    Returns one DeliveryReceipt per recipient, grouped by channel in
+    the given order. Deliveries still queued at the deadline are not
+    sent and get a "timeout" receipt. Requests already sent get up to
+    grace more seconds to answer; those that still have not get an
+    "unknown" receipt, since the recipient may have received them.
+    """
+    max_workers = max_workers or PUSH_MAX_WORKERS
+    per_channel = max(1, per_channel or PUSH_PER_CHANNEL_LIMIT)
+    deadline = deadline if deadline is not None else PUSH_DEADLINE
+    grace = grace if grace is not None else PUSH_DEADLINE_GRACE
+    channels = [channel for channel in channels if channel.recipients]
+    if not channels:
+        return []
+
+    session = session or get_sync_session()
+    start = time.monotonic()
+    total = sum(len(channel.recipients) for channel in channels)  # 请求数（一个批次算一个）
+    executor = ThreadPoolExecutor(max_workers=min(max_workers, total), thread_name_prefix="push")
+    # 以下按 channels 中的下标记录（outbox 补发时同一渠道可能有多条消息）；并发上限按渠道名计算
+    queues = [deque(channel.recipients) for channel in channels]
+    prepared = {}
+    in_flight = {channel.name: 0 for channel in channels}
+    futures = {}  # future -> (下标, recipient)；recipient 为 None 表示 prepare
+    receipts = [[] for _ in channels]
+    # 回执按接收人的配置顺序输出，而不是完成顺序
+    positions = [{id(recipient): n for n, recipient in enumerate(channel.recipients)} for channel in channels]
+
+    def add_receipt(i, recipient, result, latency=0.0, error="", failed=None):
+        if isinstance(recipient, Batch):
+            label, count = recipient.label, len(recipient.members)
+        else:
+            label, count = mask(recipient), 1
+        failed = list(failed or [])
+        receipt = DeliveryReceipt(channels[i].name, label, result, latency, error, time.time(), count,
+                                  [mask(member) for member in failed], failed)
+        receipts[i].append((positions[i][id(recipient)], receipt))
+
+    def fill():
+        # 轮流给每个渠道分配一个空闲线程，直到线程用完或没有可发的
+        progress = True
+        while progress and len(futures) < max_workers:
+            progress = False
+            for i, channel in enumerate(channels):
+                if len(futures) >= max_workers:
+                    break
+                if in_flight[channel.name] >= per_channel or not queues[i]:
+                    continue
+                if i not in prepared:
+                    if (i, None) not in futures.values():
+                        futures[executor.submit(_timed, channel.prepare, report, session)] = (i, None)
+                        in_flight[channel.name] += 1
+                    continue
+                recipient = queues[i].popleft()
+                futures[executor.submit(_timed, channel.deliver, prepared[i], recipient, session)] = (i, recipient)
+                in_flight[channel.name] += 1
+                progress = True
+
+    def collect(future):
+        i, recipient = futures.pop(future)
+        in_flight[channels[i].name] -= 1
+        result, latency, error = future.result()
+        if recipient is None:
+            if error is None:
+                prepared[i] = result
+            else:
+                # 准备失败，该渠道所有接收人都记为失败
+                print(f"{channels[i].name} prepare failed: {error}")
+                while queues[i]:
+                    add_receipt(i, queues[i].popleft(), "error", 0.0, str(error))
+        elif error is None:
+            add_receipt(i, recipient, "ok", latency)
+        elif isinstance(error, PartialDelivery):
+            sample = next(iter(error.failed.values()), "")
+            add_receipt(i, recipient, "partial", latency, f"{error}: {sample}", error.failed)
+        else:
+            add_receipt(i, recipient, "error", latency, str(error))
+
+    try:
+        fill()
+        while futures:
+            remaining = deadline - (time.monotonic() - start)
+            if remaining <= 0:
+                break
+            done, _ = wait(futures, timeout=remaining, return_when=FIRST_COMPLETED)
+            for future in done:
+                collect(future)
+            fill()
+    finally:
+        # 截止时间到了：已经发出的请求再等 grace 秒拿到结果，不再发出新的请求
+        if futures and grace > 0:
+            done, _ = wait(futures, timeout=grace)
+            for future in done:
+                collect(future)
+        # 仍没有返回的请求可能已经送达，记为 unknown，不能当作失败重发，否则接收人会收到两份
+        for future, (i, recipient) in futures.items():
+            if recipient is not None:
+                add_receipt(i, recipient, "unknown", time.monotonic() - start,
+                            f"no answer within {deadline:g}s + {grace:g}s, may have been delivered")
+        for i in range(len(channels)):
+            while queues[i]:
+                add_receipt(i, queues[i].popleft(), "timeout", 0.0, f"not sent within {deadline:g}s")
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    ordered = [receipt for pairs in receipts for _, receipt in sorted(pairs, key=lambda pair: pair[0])]
+    METRICS.record_deliveries(ordered)
+    print_receipts(ordered, time.monotonic() - start)
+    return ordered
+
+def print_receipts(receipts, elapsed):
+    for receipt in receipts:
+        mark = "✓" if receipt.ok else "✗"
+        count = f" ({receipt.delivered}/{receipt.count})" if receipt.count > 1 else ""
+        detail = f"  {receipt.error}" if receipt.error else ""
+        print(f"  {mark} {receipt.channel:<12} {receipt.recipient + count:<10} {receipt.result:<8} {receipt.latency:>5.2f}s{detail}")
+    sent = sum(receipt.delivered for receipt in receipts)
+    print(f"Delivered {sent}/{sum(receipt.count for receipt in receipts)} in {elapsed:.1f}s")
@@ -0,0 +1,81 @@
+# engine.py
+import asyncio
+import time
+from concurrent.futures import wait, FIRST_COMPLETED
+from config import FETCH_MAX_WORKERS, FETCH_DEADLINE
+import http_client
+from metrics import track_fetch
+
+async def _semaphore(limit):
+    # 在共享事件循环中创建（Python 3.9 的 Semaphore 绑定创建时的事件循环）
+    return asyncio.Semaphore(limit)
+
+async def _run_one(limit, platform, fetcher):
+    # 等待名额的顺序即提交顺序，所以先提交的平台先开始抓取
+    async with limit:
+        print(f"Scraping {platform}...")
+        with track_fetch(platform) as record:
+            items = await fetcher()
+            record.items = len(items or [])
+    return items
+
+def run_fetchers(tasks, max_workers=None, deadline=None, first=()):
+    """
+    Runs all fetchers concurrently on the shared http_client loop, at
+    most max_workers (FETCH_MAX_WORKERS) platforms at a time.
+    tasks: list of (platform, fetcher) pairs in report order, fetcher
+    being a coroutine function (see Platform.task()).
+    first: platforms to start before the others (slow ones).
+    Returns (data, status): data keeps the order of tasks, status maps
+    each platform to "ok", "error" or "timeout".
+    """
+    max_workers = max_workers or FETCH_MAX_WORKERS
+    deadline = deadline if deadline is not None else FETCH_DEADLINE
+
+    results = {}
+    status = {}
+    if not tasks:
+        return {}, {}
+
+    start = time.monotonic()
+    limit = http_client.run_sync(_semaphore(max(1, max_workers)))
+    ordered = sorted(tasks, key=lambda task: task[0] not in first)
+    futures = {http_client.submit(_run_one(limit, platform, fetcher)): platform for platform, fetcher in ordered}
+    pending = set(futures)
+
+    try:
+        while pending:
+            remaining = deadline - (time.monotonic() - start)
+            if remaining <= 0:
+                break
+            done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+            for future in done:
+                platform = futures[future]
+                elapsed = time.monotonic() - start
+                try:
+                    results[platform] = future.result()
+                    status[platform] = "ok"
+                    print(f"{platform} done in {elapsed:.1f}s")
+                except asyncio.TimeoutError:
+                    # 超出平台自己的时间预算（见 platforms.py）
+                    print(f"{platform} timed out after {elapsed:.1f}s")
+                    results[platform] = [{"title": f"{platform} Timeout", "url": "", "hot": ""}]
+                    status[platform] = "timeout"
+                except Exception as e:
+                    print(f"Error fetching {platform}: {e}")
+                    results[platform] = [{"title": f"{platform} Error", "url": "", "hot": str(e)}]
+                    status[platform] = "error"
+    finally:
+        # 超时的抓取不再等待，已返回的结果照常使用
+        for future in pending:
+            platform = futures[future]
+            future.cancel()
+            print(f"{platform} timed out after {deadline:g}s")
+            results[platform] = [{"title": f"{platform} Timeout", "url": "", "hot": ""}]
+            status[platform] = "timeout"
+
+    print(f"Fetched {len(tasks)} platforms in {time.monotonic() - start:.1f}s")
+
+    # 保持报告中的平台顺序
+    data = {platform: results[platform] for platform, _ in tasks}
+    return data, status
@@ -0,0 +1,218 @@
+# history.py
+import os
+import sqlite3
+import sys
+import threading
+import time
+from config import HISTORY_DB_PATH
+from cluster import title_band_keys
+
+# 每次运行的榜单快照：runs 记录运行时间，items 记录每条热点（平台、排名、标题、链接、热度）
+# ts 为 Unix 时间戳（秒），冗余存入 items，使 (platform, ts) 索引可直接覆盖范围查询
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    ts INTEGER NOT NULL,
+    time_period TEXT
+);
+CREATE TABLE IF NOT EXISTS run_platforms (
+    run_id INTEGER NOT NULL REFERENCES runs(id),
+    platform TEXT NOT NULL,
+    status TEXT NOT NULL,
+    PRIMARY KEY (run_id, platform)
+);
+CREATE TABLE IF NOT EXISTS items (
+    run_id INTEGER NOT NULL REFERENCES runs(id),
+    ts INTEGER NOT NULL,
+    platform TEXT NOT NULL,
+    rank INTEGER NOT NULL,
+    title TEXT NOT NULL,
+    url TEXT,
+    hot TEXT,
+    hot_value REAL,
+    hot_unit TEXT
+);
+-- 标题的 MinHash LSH 分段键（见 cluster.py），用于在整个历史库中查找相似话题
+CREATE TABLE IF NOT EXISTS title_bands (
+    band_key INTEGER NOT NULL,
+    title TEXT NOT NULL,
+    PRIMARY KEY (band_key, title)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_runs_ts ON runs(ts);
+CREATE INDEX IF NOT EXISTS idx_title_bands_title ON title_bands(title);
+CREATE INDEX IF NOT EXISTS idx_items_platform_ts ON items(platform, ts);
+CREATE INDEX IF NOT EXISTS idx_items_title ON items(title, platform, ts);
+"""
+
+class HistoryStore:
+    """
+    SQLite store of every run's trending lists.
+    Each run is written in one transaction with executemany(); queries
+    by platform and time range or by title use the indexes above.
+    """
+    def __init__(self, path=HISTORY_DB_PATH):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.lock = threading.Lock()
+        with self.lock:
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute("PRAGMA synchronous=NORMAL")
+            self.conn.executescript(SCHEMA)
+            self._migrate()
+
+    def _migrate(self):
+        # 旧版本数据库没有热度数值列
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(items)")}
+        for column, kind in (("hot_value", "REAL"), ("hot_unit", "TEXT")):
+            if column not in columns:
+                self.conn.execute(f"ALTER TABLE items ADD COLUMN {column} {kind}")
+        self.conn.commit()
+
+    def record_run(self, report, ts=None):
+        """
+        Stores all real items of a report (placeholders are skipped) and
+        each platform's fetch status. Returns the new run id.
+        """
+        ts = int(ts if ts is not None else time.time())
+        rows = []
+        for section in report.sections:
+            for item in section.valid_items:
+                rows.append((ts, section.name, item.rank, item.title, item.url, item.hot, item.hot_value, item.hot_unit))
+        band_rows = self._new_band_rows({row[3] for row in rows})
+
+        with self.lock, self.conn:
+            run_id = self.conn.execute(
+                "INSERT INTO runs (ts, time_period) VALUES (?, ?)", (ts, report.time_period)
+            ).lastrowid
+            self.conn.executemany(
+                "INSERT INTO run_platforms (run_id, platform, status) VALUES (?, ?, ?)",
+                [(run_id, section.name, section.status) for section in report.sections]
+            )
+            self.conn.executemany(
+                "INSERT INTO items (run_id, ts, platform, rank, title, url, hot, hot_value, hot_unit) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [(run_id,) + row for row in rows]
+            )
+            self.conn.executemany("INSERT OR IGNORE INTO title_bands (band_key, title) VALUES (?, ?)", band_rows)
+        return run_id
+
+    def _new_band_rows(self, titles):
+        """(band_key, title) rows for titles not indexed yet."""
+        titles = list(titles)
+        known = set()
+        with self.lock:
+            for start in range(0, len(titles), 500):
+                chunk = titles[start:start + 500]
+                placeholders = ",".join("?" * len(chunk))
+                known.update(row[0] for row in self.conn.execute(
+                    f"SELECT DISTINCT title FROM title_bands WHERE title IN ({placeholders})", chunk
+                ))
+        return [(key, title) for title in titles if title not in known for key in title_band_keys(title)]
+
+    def titles_for_bands(self, keys):
+        """Distinct recorded titles sharing at least one LSH bucket with keys."""
+        keys = list(keys)
+        if not keys:
+            return []
+        placeholders = ",".join("?" * len(keys))
+        with self.lock:
+            return [row[0] for row in self.conn.execute(
+                f"SELECT DISTINCT title FROM title_bands WHERE band_key IN ({placeholders})", keys
+            )]
+
+    def backfill_bands(self, batch_size=5000):
+        """Indexes titles recorded before title_bands existed. Returns how many."""
+        total = 0
+        while True:
+            titles = [row["title"] for row in self._query(
+                "SELECT DISTINCT title FROM items WHERE title NOT IN (SELECT title FROM title_bands) LIMIT ?", (batch_size,)
+            )]
+            if not titles:
+                return total
+            band_rows = [(key, title) for title in titles for key in title_band_keys(title)]
+            with self.lock, self.conn:
+                self.conn.executemany("INSERT OR IGNORE INTO title_bands (band_key, title) VALUES (?, ?)", band_rows)
+            total += len(titles)
+
+    def _query(self, sql, params=()):
+        with self.lock:
+            return [dict(row) for row in self.conn.execute(sql, params)]
+
+    def platform_history(self, platform, since=None, until=None):
+        """All items of a platform between since and until (Unix seconds), by time then rank."""
+        return self._query(
+            "SELECT ts, rank, title, url, hot, hot_value, hot_unit FROM items WHERE platform = ? AND ts >= ? AND ts <= ? ORDER BY ts, rank",
+            (platform, since or 0, until or 2 ** 62)
+        )
+
+    def title_history(self, title, platform=None):
+        """Every appearance of a title (optionally on one platform), oldest first."""
+        if platform:
+            return self._query(
+                "SELECT ts, platform, rank, hot, hot_value, hot_unit FROM items WHERE title = ? AND platform = ? ORDER BY ts",
+                (title, platform)
+            )
+        return self._query("SELECT ts, platform, rank, hot, hot_value, hot_unit FROM items WHERE title = ? ORDER BY ts", (title,))
+
+    def time_on_list(self, title, platform=None):
+        """
+        First/last time a title was seen, how many runs it appeared in and
+        its best rank. Returns None if it was never recorded.
+        """
+        sql = "SELECT MIN(ts) AS first_seen, MAX(ts) AS last_seen, COUNT(DISTINCT run_id) AS runs, MIN(rank) AS best_rank FROM items WHERE title = ?"
+        params = (title,)
+        if platform:
+            sql += " AND platform = ?"
+            params += (platform,)
+        row = self._query(sql, params)[0]
+        return row if row["runs"] else None
+
+    def last_snapshot(self, platform, before=None):
+        """
+        Items from the latest run (before `before`, if given) in which the
+        platform was fetched successfully, in rank order.
+        """
+        rows = self._query(
+            "SELECT runs.id AS run_id, runs.ts AS ts FROM runs JOIN run_platforms ON run_platforms.run_id = runs.id "
+            "WHERE run_platforms.platform = ? AND run_platforms.status = 'ok' AND runs.ts < ? ORDER BY runs.ts DESC LIMIT 1",
+            (platform, before if before is not None else 2 ** 62)
+        )
+        if not rows:
+            return []
+        return self._query(
+            "SELECT ts, rank, title, url, hot FROM items WHERE platform = ? AND ts = ? AND run_id = ? ORDER BY rank",
+            (platform, rows[0]["ts"], rows[0]["run_id"])
+        )
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+_store = None
+
+def get_store():
+    """Returns the shared history store."""
+    global _store
+    if _store is None:
+        _store = HistoryStore()
+    return _store
+
+if __name__ == "__main__":
+    # 用法: python history.py "<标题>" [平台]
+    if len(sys.argv) < 2:
+        print('Usage: python history.py "<title>" [platform]')
+        sys.exit(1)
+    store = get_store()
+    summary = store.time_on_list(sys.argv[1], sys.argv[2] if len(sys.argv) > 2 else None)
+    if not summary:
+        print("Not found in history.")
+        sys.exit(0)
+    fmt = lambda ts: time.strftime("%Y-%m-%d %H:%M", time.localtime(ts))
+    hours = (summary["last_seen"] - summary["first_seen"]) / 3600
+    print(f"First seen: {fmt(summary['first_seen'])}, last seen: {fmt(summary['last_seen'])} ({hours:.1f}h)")
+    print(f"Appeared in {summary['runs']} runs, best rank {summary['best_rank']}")
+    for row in store.title_history(sys.argv[1], sys.argv[2] if len(sys.argv) > 2 else None):
+        print(f"  {fmt(row['ts'])}  {row['platform']:<14} #{row['rank']:<3} {row['hot'] or ''}")
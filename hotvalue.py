@@ -0,0 +1,117 @@
+# hotvalue.py
+import re
+from functools import lru_cache
+from typing import NamedTuple, Optional
+
+# 热度字符串的统一解析：1.2万、3.4M、12345 views、500 upvotes、1.2k回答、¥3744 已售253件、
+# 113分钟前、热门 ……
+# 整批字符串用换行拼接后由同一个正则一次扫描完成，每行对应一个匹配
+
+_MULTIPLIERS = {
+    "万": 1e4, "w": 1e4, "W": 1e4,
+    "亿": 1e8,
+    "千": 1e3, "k": 1e3, "K": 1e3,
+    "m": 1e6, "M": 1e6,
+    "b": 1e9, "B": 1e9,
+}
+
+# 数字后面只允许跟单位倍数和下面这些单位词；"热度3"、"Top 10 热搜"、"2024-01-01"、"3 months ago"
+# 之类数字只是标签的一部分，整体按标签处理，不把排名、年份当成热度
+_WORD_PATTERN = r"""(?i:
+    分钟前|小时前|天前
+  | [次人]?(?:观看|播放|阅读|回答|回复|评论|赞)
+  | views?|plays?|upvotes?|likes?|answers?|repl(?:y|ies)|comments?|reads?
+)"""
+
+_HOT_RE = re.compile(r"""
+    ^(?:
+        .*?已售[ \t]*(?P<sold>\d+).*                     # 闲鱼：¥价格 已售N件
+      | [ \t]*(?P<num>\d[\d,]*(?:\.\d+)?)                # 1,234 / 1.2
+        [ \t]*(?P<mult>[万亿千wWkKmMbB])?\+?             # 单位倍数，10万+
+        [ \t]*(?P<word>""" + _WORD_PATTERN + r""")?[ \t]* # views / 回答 / 播放 / 分钟前 ……
+      | .*?                                              # 其他：热门、Trending、热度3 等标签
+    )$
+""", re.M | re.X)
+
+# (关键词, 单位)，按顺序匹配数字前后的文字
+_UNIT_WORDS = [
+    ("分钟前", "age"), ("小时前", "age"), ("天前", "age"),
+    ("view", "views"), ("观看", "views"),
+    ("播放", "plays"), ("play", "plays"),
+    ("upvote", "likes"), ("like", "likes"), ("赞", "likes"),
+    ("回答", "answers"), ("answer", "answers"),
+    ("回复", "replies"), ("评论", "replies"), ("repl", "replies"), ("comment", "replies"),
+    ("阅读", "reads"), ("read", "reads"),
+]
+
+# age 统一换算为分钟
+_AGE_MINUTES = {"分钟前": 1, "小时前": 60, "天前": 1440}
+
+class HotValue(NamedTuple):
+    value: Optional[float]   # 解析出的数值；纯标签（热门、Trending）为 None
+    unit: str                # heat / views / plays / likes / answers / replies / reads / sold / age / label
+    display: str             # 原始显示字符串
+
+def _clean(raw):
+    if raw is None:
+        return ""
+    return str(raw).replace("\r", " ").replace("\n", " ").strip()
+
+@lru_cache(maxsize=1024)
+def _unit_for(text):
+    lowered = text.lower()
+    for word, unit in _UNIT_WORDS:
+        if word in lowered:
+            return unit, word
+    return "heat", None
+
+def _from_match(match, display):
+    sold, num, mult, word = match.groups()
+    if sold is not None:
+        return HotValue(float(sold), "sold", display)
+    if num is None:
+        return HotValue(None, "label" if display else "heat", display)
+
+    value = float(num.replace(",", "")) if "," in num else float(num)
+    if mult:
+        value *= _MULTIPLIERS[mult]
+    if not word:
+        return HotValue(value, "heat", display)
+    unit, unit_word = _unit_for(word)
+    if unit == "age":
+        value *= _AGE_MINUTES[unit_word]
+    return HotValue(value, unit, display)
+
+def normalize_batch(values):
+    """
+    Parses a batch of hot strings (or raw numbers) into HotValue tuples,
+    in the same order, with one regex scan over the whole batch.
+    """
+    displays = [_clean(raw) for raw in values]
+    if not displays:
+        return []
+    matches = _HOT_RE.finditer("\n".join(displays))
+    return [_from_match(match, display) for match, display in zip(matches, displays)]
+
+def normalize(raw):
+    """Parses a single hot string; see normalize_batch()."""
+    return normalize_batch([raw])[0]
+
+# 显示格式：(阈值, 单位) 从大到小
+_STYLES = {
+    "cn": [(1e4, "万")],
+    "en": [(1e6, "M"), (1e3, "K")],
+    "mixed": [(1e6, "M"), (1e4, "万")],
+    "k": [(1e3, "k")],
+}
+
+def format_count(count, suffix="", style="cn"):
+    """
+    Formats a raw count the way the fetchers display it, e.g.
+    format_count(23800, "播放") -> "2.4万播放",
+    format_count(1520000, " views", "en") -> "1.5M views".
+    """
+    for threshold, unit in _STYLES[style]:
+        if count >= threshold:
+            return f"{count / threshold:.1f}{unit}{suffix}"
+    return f"{count}{suffix}"
@@ -0,0 +1,128 @@
+# http_cache.py
+import hashlib
+import json
+import os
+import time
+from config import HTTP_CACHE_DIR, HTTP_CACHE_TTL, HTTP_CACHE_MAX_BYTES
+
+class HttpCache:
+    """
+    Persistent response cache keyed by URL.
+    Stores bodies together with their ETag / Last-Modified validators so
+    the next run can send a conditional request and reuse the body on
+    304 Not Modified. Entries expire after ttl seconds and the least
+    recently used ones are evicted once the cache exceeds max_bytes.
+    """
+    def __init__(self, directory=HTTP_CACHE_DIR, ttl=HTTP_CACHE_TTL, max_bytes=HTTP_CACHE_MAX_BYTES):
+        self.directory = directory
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.index_path = os.path.join(directory, "index.json")
+        self.index = self._load_index()
+
+    def _load_index(self):
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_index(self):
+        os.makedirs(self.directory, exist_ok=True)
+        tmp_path = self.index_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.index, f)
+        os.replace(tmp_path, self.index_path)
+
+    def _body_path(self, key):
+        return os.path.join(self.directory, key + ".body")
+
+    @staticmethod
+    def key_for(url):
+        return hashlib.sha1(url.encode("utf-8")).hexdigest()
+
+    def lookup(self, url):
+        """Returns the cached entry for url, or None if missing or expired."""
+        key = self.key_for(url)
+        entry = self.index.get(key)
+        if entry is None:
+            return None
+        if time.time() - entry["stored_at"] > self.ttl or not os.path.exists(self._body_path(key)):
+            self._remove(key)
+            self._save_index()
+            return None
+        return entry
+
+    def conditional_headers(self, entry):
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def read_body(self, url):
+        """Reads the cached body after a 304 and marks the entry as recently used."""
+        key = self.key_for(url)
+        with open(self._body_path(key), "rb") as f:
+            content = f.read()
+        entry = self.index[key]
+        entry["last_used"] = time.time()
+        # 304 说明内容仍有效，重新计算过期时间
+        entry["stored_at"] = entry["last_used"]
+        self._save_index()
+        return content
+
+    def store(self, url, headers, content, charset=None):
+        """Stores a 200 response if it carries a validator to revalidate with."""
+        etag = headers.get("ETag")
+        last_modified = headers.get("Last-Modified")
+        if not etag and not last_modified:
+            return
+        if len(content) > self.max_bytes:
+            return
+
+        key = self.key_for(url)
+        os.makedirs(self.directory, exist_ok=True)
+        with open(self._body_path(key), "wb") as f:
+            f.write(content)
+
+        now = time.time()
+        self.index[key] = {
+            "url": url,
+            "etag": etag,
+            "last_modified": last_modified,
+            "charset": charset,
+            "size": len(content),
+            "stored_at": now,
+            "last_used": now
+        }
+        self._evict()
+        self._save_index()
+
+    def _remove(self, key):
+        self.index.pop(key, None)
+        try:
+            os.remove(self._body_path(key))
+        except OSError:
+            pass
+
+    def _evict(self):
+        # 超出容量时按最近使用时间淘汰（LRU）
+        total = sum(entry["size"] for entry in self.index.values())
+        if total <= self.max_bytes:
+            return
+        for key, entry in sorted(self.index.items(), key=lambda kv: kv[1]["last_used"]):
+            self._remove(key)
+            total -= entry["size"]
+            if total <= self.max_bytes:
+                break
+
+_cache = None
+
+def get_cache():
+    """Returns the shared cache instance."""
+    global _cache
+    if _cache is None:
+        _cache = HttpCache()
+    return _cache
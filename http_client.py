@@ -0,0 +1,211 @@
+# http_client.py
+import asyncio
+import atexit
+import json
+import threading
+import time
+from urllib.parse import urlencode
+
+from config import HTTP_PER_HOST_LIMIT, HTTP_POOL_SIZE, HTTP_KEEPALIVE, HTTP_CACHE_ENABLED, BREAKER_ENABLED
+import breaker
+from http_cache import get_cache
+import metrics
+import replay
+
+# 所有抓取共用一个后台事件循环，同步调用方通过 run_sync() 提交协程
+# aiohttp / requests 在第一次建立会话时才导入，只导入本模块不产生额外启动开销
+_loop = None
+_loop_lock = threading.Lock()
+_session = None
+_sync_session = None
+_sync_session_lock = threading.Lock()
+
+class Response:
+    """
+    Minimal requests-like response so fetchers keep using
+    .status_code / .text / .json() unchanged.
+    """
+    def __init__(self, url, status_code, headers, content, charset=None, from_cache=False):
+        self.url = url
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+        self.charset = charset
+        self.from_cache = from_cache
+        self._text = None
+
+    @property
+    def text(self):
+        if self._text is None:
+            self._text = _decode(self.content, self.charset)
+        return self._text
+
+    def json(self):
+        with metrics.parse_timer():
+            return json.loads(self.text)
+
+def _decode(content, charset):
+    if charset:
+        try:
+            return content.decode(charset, errors='replace')
+        except LookupError:
+            pass
+    try:
+        return content.decode('utf-8')
+    except UnicodeDecodeError:
+        # 部分国内站点未声明编码，且使用 GBK
+        return content.decode('gb18030', errors='replace')
+
+def get_loop():
+    """Returns the shared event loop, starting its thread on first use."""
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            loop = asyncio.new_event_loop()
+            thread = threading.Thread(target=loop.run_forever, name="http-loop", daemon=True)
+            thread.start()
+            _loop = loop
+    return _loop
+
+def submit(coro):
+    """Schedules a coroutine on the shared loop and returns a concurrent.futures.Future."""
+    return asyncio.run_coroutine_threadsafe(coro, get_loop())
+
+def run_sync(coro, timeout=None):
+    """Runs a coroutine on the shared loop and blocks until it finishes."""
+    return submit(coro).result(timeout)
+
+def get_session():
+    """
+    Returns the shared aiohttp session used by all fetchers.
+    Connections are pooled per host and kept alive between requests,
+    so several requests to the same host reuse one TCP+TLS handshake.
+    Must be called on the shared loop.
+    """
+    global _session
+    if _session is None or _session.closed:
+        import ssl
+        import aiohttp
+        import certifi
+        ssl_context = ssl.create_default_context(cafile=certifi.where())
+        connector = aiohttp.TCPConnector(
+            ssl=ssl_context,
+            limit=HTTP_POOL_SIZE,
+            limit_per_host=HTTP_PER_HOST_LIMIT,
+            keepalive_timeout=HTTP_KEEPALIVE,
+            ttl_dns_cache=300
+        )
+        # 每个请求的 DNS / 建连 / 首字节耗时（见 metrics.py）
+        _session = aiohttp.ClientSession(connector=connector, trace_configs=[metrics.trace_config()])
+    return _session
+
+def get_sync_session():
+    """
+    Returns the shared requests.Session used by the notifiers,
+    with a keep-alive connection pool per host.
+    """
+    global _sync_session
+    with _sync_session_lock:
+        if _sync_session is None:
+            import requests
+            from requests.adapters import HTTPAdapter
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=HTTP_POOL_SIZE, pool_maxsize=HTTP_PER_HOST_LIMIT)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            _sync_session = session
+    return _sync_session
+
+async def get(url, headers=None, params=None, timeout=10, session=None, cache=False):
+    """
+    GET a URL on the shared session (or the given one).
+    The connection pool limits how many requests run per host at once.
+    With cache=True the request is revalidated against the on-disk cache
+    and a 304 Not Modified is answered with the stored body.
+    """
+    import aiohttp
+    session = session or get_session()
+    client_timeout = aiohttp.ClientTimeout(total=timeout)
+
+    # 录制/回放时不走本地响应缓存，回放请求改发到替身服务器（见 replay.py）
+    original_url, original_params = url, params
+    if replay.MODE:
+        cache = False
+        if replay.MODE == "replay":
+            url, params = replay.route(url, params), None
+
+    # 熔断中的接口直接抛出 CircuitOpenError，不发请求（回放时不启用）
+    breakers = breaker.get_registry() if BREAKER_ENABLED and not replay.MODE else None
+    endpoint = breakers.before_request(original_url) if breakers else None
+
+    http_cache = get_cache() if cache and HTTP_CACHE_ENABLED else None
+    cache_url = f"{url}?{urlencode(params)}" if params else url
+    entry = http_cache.lookup(cache_url) if http_cache else None
+    if entry:
+        headers = dict(headers or {})
+        headers.update(http_cache.conditional_headers(entry))
+
+    timings = {}
+    try:
+        async with session.get(url, headers=headers, params=params, timeout=client_timeout, trace_request_ctx=timings) as resp:
+            if resp.status == 304 and entry:
+                content = http_cache.read_body(cache_url)
+                metrics.METRICS.record_request(original_url, 304, timings, 0)
+                if breakers:
+                    breakers.record_success(endpoint)
+                return Response(str(resp.url), 200, resp.headers, content, entry.get("charset"), from_cache=True)
+            download_start = time.perf_counter()
+            content = await resp.read()
+            timings["download"] = time.perf_counter() - download_start
+            metrics.METRICS.record_request(original_url, resp.status, timings, len(content))
+            if breakers:
+                if breaker.is_failure(resp.status, len(content)):
+                    breakers.record_failure(endpoint)
+                else:
+                    breakers.record_success(endpoint)
+            if replay.MODE == "record":
+                replay.record(original_url, original_params, resp.status, resp.headers, content, resp.charset)
+            if http_cache and resp.status == 200:
+                http_cache.store(cache_url, resp.headers, content, resp.charset)
+            response_url = original_url if url is not original_url else str(resp.url)
+            return Response(response_url, resp.status, resp.headers, content, resp.charset)
+    except asyncio.CancelledError:
+        if breakers:
+            breakers.release(endpoint)
+        raise
+    except Exception:
+        metrics.METRICS.record_request(original_url, "error", timings, 0)
+        if breakers:
+            breakers.record_failure(endpoint)
+        raise
+
+async def get_many(urls, **kwargs):
+    """
+    GET several URLs at once. Returns responses in the same order;
+    failed requests are returned as the exception instead.
+    """
+    return await asyncio.gather(*(get(url, **kwargs) for url in urls), return_exceptions=True)
+
+def unwrap(result):
+    """Raises the exception from get_many(), or returns the response."""
+    if isinstance(result, BaseException):
+        raise result
+    return result
+
+async def close():
+    global _session
+    if _session is not None and not _session.closed:
+        await _session.close()
+    _session = None
+
+def shutdown():
+    """Closes the shared sessions before the interpreter exits."""
+    if _loop is not None and _session is not None:
+        try:
+            run_sync(close(), timeout=5)
+        except Exception:
+            pass
+    if _sync_session is not None:
+        _sync_session.close()
+
+atexit.register(shutdown)
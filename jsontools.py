@@ -0,0 +1,168 @@
+# jsontools.py
+import json
+import re
+from itertools import islice
+
+# 一个 JSON 字符串，或一个括号
+_TOKEN_RE = re.compile(rb'"(?:[^"\\]|\\.)*"|[{}\[\]]', re.S)
+# JS 中的 undefined（__INITIAL_STATE__ 常见），替换为 null 后再解析
+_UNDEFINED_RE = re.compile(r'(?<=[:\[,])\s*undefined(?=\s*[,}\]])')
+_assign_patterns = {}
+_key_patterns = {}
+
+def _assign_re(name):
+    pattern = _assign_patterns.get(name)
+    if pattern is None:
+        pattern = re.compile(re.escape(name.encode()) + rb'\s*=\s*(?=[\[{])')
+        _assign_patterns[name] = pattern
+    return pattern
+
+def _key_re(key):
+    pattern = _key_patterns.get(key)
+    if pattern is None:
+        pattern = re.compile(rb'"' + re.escape(key.encode()) + rb'"\s*:\s*')
+        _key_patterns[key] = pattern
+    return pattern
+
+def _as_bytes(raw):
+    return raw.encode('utf-8') if isinstance(raw, str) else raw
+
+def find_json_end(raw, start):
+    """
+    Brace-matches the object or array starting at raw[start] and returns
+    the index just past its end. Strings are skipped as whole tokens, so
+    braces, brackets and semicolons inside them are ignored.
+    """
+    depth = 0
+    for match in _TOKEN_RE.finditer(raw, start):
+        char = raw[match.start()]
+        if char == 0x22:  # "
+            continue
+        if char in (0x7b, 0x5b):  # { [
+            depth += 1
+        else:
+            depth -= 1
+            if depth == 0:
+                return match.end()
+    raise ValueError("Unterminated JSON value")
+
+def _loads(chunk, encoding):
+    text = chunk.decode(encoding, errors='replace')
+    try:
+        return json.loads(text)
+    except ValueError:
+        return json.loads(_UNDEFINED_RE.sub('null', text))
+
+def find_assignment(raw, name):
+    """
+    Finds `name = {...}` (e.g. window.__APOLLO_STATE__, ytInitialData) in
+    the raw page and returns the (start, end) span of the assigned value,
+    or None if it is not present.
+    Inside a <script> the span ends at the closing tag, which JSON can
+    never contain, so multi-megabyte payloads are not brace-matched.
+    """
+    raw = _as_bytes(raw)
+    match = _assign_re(name).search(raw)
+    if not match:
+        return None
+    start = match.end()
+    script_end = raw.find(b'</script', start)
+    if script_end != -1:
+        return start, script_end
+    return start, find_json_end(raw, start)
+
+def extract_embedded_json(raw, name, encoding='utf-8'):
+    """
+    Extracts and decodes the object assigned to `name` in a page's
+    scripts, scanning the raw bytes without building a DOM.
+    Returns None if the assignment is not present.
+    """
+    raw = _as_bytes(raw)
+    span = find_assignment(raw, name)
+    if span is None:
+        return None
+    start, end = span
+    text = raw[start:end].decode(encoding, errors='replace')
+    try:
+        # 解码器自己找到对象结尾，后面的 `;` 和其他语句被忽略
+        return json.JSONDecoder().raw_decode(text)[0]
+    except ValueError:
+        return _loads(raw[start:find_json_end(raw, start)], encoding)
+
+def extract_embedded_subtrees(raw, name, key, limit=None, encoding='utf-8'):
+    """
+    Like extract_embedded_json(), but decodes only the values stored under
+    `key` inside the assigned object, in document order. Nested matches
+    inside an already returned value are not returned again.
+    """
+    raw = _as_bytes(raw)
+    span = find_assignment(raw, name)
+    if span is None:
+        return []
+    pos, end = span
+    pattern = _key_re(key)
+    values = []
+    while limit is None or len(values) < limit:
+        match = pattern.search(raw, pos, end)
+        if not match:
+            break
+        value_start = match.end()
+        if raw[value_start] in (0x7b, 0x5b):
+            value_end = find_json_end(raw, value_start)
+            values.append(_loads(raw[value_start:value_end], encoding))
+        else:
+            # 标量值：直接从该位置解码
+            text = raw[value_start:end].decode(encoding, errors='replace')
+            value, length = json.JSONDecoder().raw_decode(text)
+            values.append(value)
+            value_end = value_start + len(text[:length].encode(encoding))
+        pos = value_end
+    return values
+
+def iter_values(obj, key, prune=()):
+    """
+    Yields every value stored under `key` in a decoded JSON tree, in
+    document order, using an explicit stack instead of recursion.
+    Subtrees under keys in `prune` are never visited, and a matched value
+    is not searched again. Stop iterating to stop the walk.
+    """
+    # 栈中元素为 (是否为匹配值, 节点)
+    stack = [(False, obj)]
+    while stack:
+        matched, node = stack.pop()
+        if matched:
+            yield node
+        elif isinstance(node, dict):
+            children = []
+            for k, v in node.items():
+                if k == key:
+                    children.append((True, v))
+                elif k not in prune and isinstance(v, (dict, list)):
+                    children.append((False, v))
+            stack.extend(reversed(children))
+        elif isinstance(node, list):
+            stack.extend(reversed([(False, v) for v in node if isinstance(v, (dict, list))]))
+
+def iter_nodes(obj, match, prune=()):
+    """
+    Yields every dict for which match(node) is true, in document order.
+    Matched dicts are not searched further; see iter_values() for prune.
+    """
+    stack = [obj]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, dict):
+            if match(node):
+                yield node
+                continue
+            stack.extend(reversed([v for k, v in node.items() if k not in prune and isinstance(v, (dict, list))]))
+        elif isinstance(node, list):
+            stack.extend(reversed([v for v in node if isinstance(v, (dict, list))]))
+
+def find_values(obj, key, limit=None, prune=()):
+    """Returns up to `limit` values stored under `key` (see iter_values)."""
+    return list(islice(iter_values(obj, key, prune), limit))
+
+def find_nodes(obj, match, limit=None, prune=()):
+    """Returns up to `limit` dicts matching `match` (see iter_nodes)."""
+    return list(islice(iter_nodes(obj, match, prune), limit))
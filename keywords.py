@@ -0,0 +1,129 @@
+# keywords.py
+import json
+import os
+import re
+from collections import deque
+from functools import lru_cache
+from config import KEYWORDS_FILE
+
+# 各抓取函数和报告过滤用的关键词，按分类组织；KEYWORDS_FILE 中同名分类会整体替换默认列表
+DEFAULT_KEYWORDS = {
+    # 东方财富快讯
+    "finance": ['央行', '货币政策', 'GDP', '经济', '财政', '税收', '银行', '保险', '证券', '基金', '投资', '消费', '通胀', '通缩', '汇率', '利率', '贷款', '存款', '准备金', '逆回购', 'MLF', 'LPR'],
+    # 新浪财经头条
+    "finance_headline": ['财经', '经济', '金融', '货币', '政策', '市场', '投资'],
+    # 网易民生经济
+    "livelihood": ['民生', '经济', '国内', '社会', '就业', '收入', '消费', '物价', '房价', '教育', '医疗', '养老', '社保', '医保', '工资', '补贴', '福利', '扶贫', '乡村振兴', '城乡', '居民', '百姓', '群众', '人民'],
+    "economy": ['国内经济', '经济增长', '经济政策', '经济形势', '经济数据', '经济指标', '经济复苏', '经济下行', '经济压力', '经济转型', '经济结构', '经济质量', '经济发展', '经济工作', '经济会议'],
+    # 推特趋势中的中文相关话题（不区分大小写）
+    "twitter_chinese": ['China', 'Chinese', 'Taiwan', 'Hong Kong', '疫情', '疫苗', '华为', '抖音', '微博', '微信'],
+    # 抓取失败时的占位条目（如 "Weibo Error"、"XHS Config Required"）
+    "placeholder": ['Error', '错误', '暂无数据', 'Config Required', 'Could not parse', 'Scraper', 'Timeout'],
+}
+
+class KeywordMatcher:
+    """
+    Aho-Corasick matcher over several keyword categories.
+    The automaton is built once as a DFA (one dict lookup per character,
+    no failure-link walks), so matching a title costs O(len(title))
+    however many keywords there are, and categories() reports every
+    category hit, including overlapping keywords, in a single pass.
+    """
+    def __init__(self, keywords, ignore_case=False):
+        self.ignore_case = ignore_case
+        goto = [{}]
+        outputs = [set()]
+        for category, words in keywords.items():
+            for word in words:
+                if ignore_case:
+                    word = word.lower()
+                if not word:
+                    continue
+                state = 0
+                for char in word:
+                    nxt = goto[state].get(char)
+                    if nxt is None:
+                        nxt = len(goto)
+                        goto.append({})
+                        outputs.append(set())
+                        goto[state][char] = nxt
+                    state = nxt
+                outputs[state].add(category)
+
+        # BFS 计算失败链接，并把失败状态的转移和输出并入当前状态，得到完整的 DFA
+        fail = [0] * len(goto)
+        delta = [None] * len(goto)
+        delta[0] = dict(goto[0])
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            transitions = dict(delta[fail[state]])
+            transitions.update(goto[state])
+            delta[state] = transitions
+            for char, nxt in goto[state].items():
+                fail[nxt] = delta[fail[state]].get(char, 0) if state else 0
+                outputs[nxt] |= outputs[fail[nxt]]
+                queue.append(nxt)
+
+        self._delta = delta
+        self._outputs = [frozenset(out) if out else None for out in outputs]
+        # 只有关键词首字符能让自动机离开初始状态：先用字符类跳到第一个可能的起点
+        first_chars = "".join(sorted(goto[0]))
+        self._start_re = re.compile("[%s]" % re.escape(first_chars)) if first_chars else None
+
+    def _scan(self, text, stop_at_first):
+        if self._start_re is None or not text:
+            return set()
+        if self.ignore_case:
+            text = text.lower()
+        start = self._start_re.search(text)
+        if start is None:
+            return set()
+        delta, outputs = self._delta, self._outputs
+        found = set()
+        state = 0
+        for char in text[start.start():]:
+            state = delta[state].get(char, 0)
+            out = outputs[state]
+            if out:
+                found |= out
+                if stop_at_first:
+                    break
+        return found
+
+    def categories(self, text):
+        """Set of categories with at least one keyword in text."""
+        return self._scan(text, False)
+
+    def matches(self, text):
+        """True if any keyword occurs in text (stops at the first hit)."""
+        return bool(self._scan(text, True))
+
+def load_keywords(path=KEYWORDS_FILE):
+    """Default keyword sets, with categories from the JSON file at path replacing them."""
+    keywords = {category: list(words) for category, words in DEFAULT_KEYWORDS.items()}
+    if path and os.path.exists(path):
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                overrides = json.load(f)
+            if not isinstance(overrides, dict) or not all(isinstance(words, list) for words in overrides.values()):
+                raise ValueError('expected {"category": ["keyword", ...]}')
+            for category, words in overrides.items():
+                keywords[category] = [str(word) for word in words]
+            print(f"Loaded keyword overrides from {path}: {', '.join(overrides)}")
+        except (OSError, ValueError) as e:
+            print(f"Keyword file {path} ignored: {e}")
+    return keywords
+
+@lru_cache(maxsize=None)
+def _keywords():
+    return load_keywords()
+
+@lru_cache(maxsize=None)
+def get_matcher(*categories, ignore_case=False):
+    """
+    Shared matcher for the given categories, built on first use, e.g.
+    get_matcher("livelihood", "economy").categories(title).
+    """
+    keywords = _keywords()
+    return KeywordMatcher({category: keywords.get(category, []) for category in categories}, ignore_case)
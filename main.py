@@ -1,248 +1,133 @@
 # main.py
 import datetime
-from scraper import fetch_weibo_hot, fetch_douyin_hot, fetch_xhs_hot, fetch_twitter_hot, fetch_baidu_hot, fetch_zhihu_hot, fetch_bilibili_hot, fetch_kuaishou_hot, fetch_xigua_hot, fetch_linuxdo_hot, fetch_52pojie_hot, fetch_youtube_hot, fetch_finance_news, fetch_reddit_hot, fetch_stackoverflow_hot, fetch_xianyu_hot, fetch_xmfish_hot, fetch_netease_hot
-from notifier import send_wechat
-from config import ENABLE_WEIBO, ENABLE_DOUYIN, ENABLE_XHS, ENABLE_TWITTER, ENABLE_BAIDU, ENABLE_ZHIHU, ENABLE_BILIBILI, ENABLE_KUAISHOU, ENABLE_XIGUA, ENABLE_LINUXDO, ENABLE_52POJIE, ENABLE_YOUTUBE, ENABLE_FINANCE, ENABLE_REDDIT, ENABLE_STACKOVERFLOW, ENABLE_XIANYU, ENABLE_XMFISH, ENABLE_NETEASE
+import sys
+from config import HISTORY_ENABLED, PUSH_MODE, CLUSTER_ENABLED, METRICS_SUMMARY_PATH, OUTBOX_ENABLED
 
-def generate_html(data_dict, time_period="morning_review"):
+# 推送时段 (起始小时, 结束小时, 时段标识, 标题)，北京时间
+REPORT_WINDOWS = [
+    (6, 9, "morning_7am", "⏰ 07:00·晨间热点回顾"),      # 7:00时段 (6:00-9:00)
+    (11, 14, "noon_12pm", "🕛 12:00·午间热点速递"),      # 12:00时段 (11:00-14:00)
+    (16, 19, "evening_5pm", "🌇 17:00·傍晚热点更新"),    # 17:00时段 (16:00-19:00)
+    (21, 25, "night_10pm", "🌙 22:00·全天热点盘点"),     # 22:00时段 (21:00-01:00)
+]
+
+def beijing_time():
+    # Fix: GitHub Actions runs in UTC, so we must explicitly convert to Beijing Time (UTC+8)
+    return datetime.datetime.utcnow() + datetime.timedelta(hours=8)
+
+def get_time_period(now):
+    """Returns (time_period, period_cn) for a Beijing time, or None outside the reporting windows."""
+    current_time = now.hour + now.minute / 60
+    if current_time < 1:
+        current_time += 24
+    for start, end, time_period, period_cn in REPORT_WINDOWS:
+        if start <= current_time < end:
+            return time_period, period_cn
+    return None
+
+def fetch_all(platforms):
+    """Fetches the given platforms (see platforms.py) in one batch; returns (data, status)."""
+    from engine import run_fetchers
+
+    print("Fetching hot trends...")
+    # 只导入启用平台的抓取模块；开销大的平台先提交
+    tasks = [platform.task() for platform in platforms]
+    heavy = [platform.name for platform in platforms if platform.cost == "heavy"]
+    data, fetch_status = run_fetchers(tasks, first=heavy)
+    timed_out = [platform for platform, state in fetch_status.items() if state == "timeout"]
+    if timed_out:
+        print(f"Timed out platforms: {', '.join(timed_out)}")
+    return data, fetch_status
+
+def write_run_summary(platforms):
+    """Prints per-platform fetch metrics and saves them, with the delivery receipts, as JSON (METRICS_SUMMARY_PATH)."""
+    from metrics import write_summary
+    print("Fetch summary:")
+    try:
+        write_summary(METRICS_SUMMARY_PATH, platforms)
+    except OSError as e:
+        print(f"Metrics Error: {e}")
+
+def publish(data, fetch_status, time_period, period_cn, now):
     """
-    Generates HTML report optimized for WeChat Official Account.
-    Each platform shows top 15 items only.
+    Builds the report from fetched data, diffs and records it in the
+    history store, and sends it. Returns False if nothing was sent.
     """
-    # Determine time period text (4 times a day)
-    period_texts = {
-        "morning_7am": "⏰ 07:00·晨间热点回顾",
-        "noon_12pm": "🕛 12:00·午间热点速递",
-        "evening_5pm": "🌇 17:00·傍晚热点更新",
-        "night_10pm": "🌙 22:00·全天热点盘点"
-    }
-    period_text = period_texts.get(time_period, "📊 热点速递")
-    period_text = period_texts.get(time_period, "📊 热点速递")
-    
-    # Fix: Ensure displayed time is also Beijing Time
-    utc_now = datetime.datetime.utcnow()
-    beijing_now = utc_now + datetime.timedelta(hours=8)
-    time_str = beijing_now.strftime("%Y年%m月%d日 %H:%M")
-    
-    # WeChat-friendly HTML with inline styles
-    html = f"""
-<div style="font-family: -apple-system, BlinkMacSystemFont, 'Helvetica Neue', sans-serif; line-height: 1.6; color: #333; max-width: 680px; margin: 0 auto;">
-    <div style="text-align: center; padding: 20px 0; border-bottom: 2px solid #e6e6e6;">
-        <h1 style="margin: 0; font-size: 24px; color: #2c3e50;">{period_text}</h1>
-        <p style="margin: 5px 0 0; font-size: 14px; color: #7f8c8d;">{time_str}</p>
-    </div>
-"""
-    
-    platform_emojis = {
-        "Weibo": "📱",
-        "Douyin": "🎵", 
-        "Xiaohongshu": "📕",
-        "Twitter": "🐦",
-        "Baidu": "🔍",
-        "Zhihu": "❓",
-        "Bilibili": "📺",
-        "Kuaishou": "⚡",
-        "Xigua": "🍉",
-        "Linux.do": "🐧",
-        "52pojie": "🔓",
-        "YouTube": "🎬",
-        "财经": "💰",
-        "Reddit": "👽",
-        "StackOverflow": "💻",
-        "Xianyu": "🛒",
-        "Xmfish": "🐟",
-        "Netease": "📰"
-    }
-    
-    for platform, items in data_dict.items():
-        emoji = platform_emojis.get(platform, "🔥")
-        
-        html += f"""
-    <div style="margin: 25px 0; padding: 15px; background: #f8f9fa; border-radius: 8px; border-left: 4px solid #3498db;">
-        <h2 style="margin: 0 0 12px 0; font-size: 18px; color: #2c3e50;">
-            {emoji} {platform}
-        </h2>
-"""
-        
-        if not items:
-            html += """
-        <p style="margin: 0; color: #95a5a6; font-size: 14px;">暂无数据</p>
-"""
+    from notifier import send_wechat
+    from report import build_report
+    from render import render_html
+
+    # Generate Report
+    print(f"Generating {time_period} report...")
+    report = build_report(data, time_period, period_cn, status=fetch_status, now=now)
+
+    # 与上一次运行对比，并保存本次榜单快照
+    diffed = False
+    if HISTORY_ENABLED:
+        try:
+            from history import get_store
+            from diff import apply_diff
+            store = get_store()
+            apply_diff(report, store)
+            diffed = True
+            store.record_run(report)
+        except Exception as e:
+            print(f"History Error: {e}")
+
+    if PUSH_MODE == "diff":
+        if diffed:
+            from diff import delta_report
+            report = delta_report(report)
+            if not report.sections:
+                print("No changes since last run. Skipping push.")
+                return False
         else:
-            # 根据不同平台调整显示数量
-            # 用户要求统一调整为12条
-            top_items = items[:12]
-            
-            html += """
-        <ul style="margin: 0; padding: 0; list-style: none;">
-"""
-            for i, item in enumerate(top_items):
-                title = item.get('title', 'N/A').strip()
-                url = item.get('url', '#')
-                hot = item.get('hot', '').strip()
-                
-                # Truncate long titles for WeChat
-                if len(title) > 30:
-                    title = title[:27] + "..."
-                
-                # Rank styling
-                rank_color = "#e74c3c" if i < 3 else "#3498db" if i < 6 else "#7f8c8d"
-                
-                # Hot value styling
-                hot_html = ""
-                if hot:
-                    hot_html = f'<span style="font-size: 12px; color: #e74c3c; margin-left: 8px;">{hot}</span>'
-                
-                html += f"""
-            <li style="margin: 8px 0; padding: 0;">
-                <span style="display: inline-block; width: 20px; height: 20px; line-height: 20px; text-align: center; background: {rank_color}; color: white; border-radius: 3px; font-size: 12px; margin-right: 8px;">{i+1}</span>
-                <a href="{url}" style="color: #2c3e50; text-decoration: none; font-size: 15px;">{title}</a>
-                {hot_html}
-            </li>
-"""
-            html += """
-        </ul>
-"""
-        
-        html += """
-    </div>
-"""
+            print("Diff mode needs the history store. Sending full report.")
+
+    # 同一话题在多个平台上榜时只在报告中第一次出现的位置显示，并标注其他平台
+    if CLUSTER_ENABLED:
+        from cluster import apply_clusters
+        print(f"Merged {apply_clusters(report)} cross-platform topics.")
     
-    html += """
-    <div style="text-align: center; padding: 20px 0; margin-top: 20px; border-top: 1px solid #e6e6e6; color: #95a5a6; font-size: 12px;">
-        <p style="margin: 0;">每日早晚推送 • 热点信息仅供参考</p>
-        <p style="margin: 5px 0 0;">数据来源：各平台公开榜单</p>
-    </div>
-</div>
-"""
+    # Send（经发件箱发送时，失败的推送会稍后重试）
+    print("Sending notification...")
+    if OUTBOX_ENABLED:
+        from outbox import send_report
+        succeeded = send_report(report)
+    else:
+        succeeded = send_wechat(report)
     
-    return html
+    if not succeeded:
+        print("\n=== DEBUG: Output Content (since send failed) ===")
+        print("Note: This failure is expected if no secrets are configured locally.")
+        # Print a snippet if send failed, so user can see it works locally
+        print(render_html(report)[:500] + "...")
+    return succeeded
 
 def main():
-    print("Fetching hot trends...")
-    data = {}
-    
-    if ENABLE_WEIBO:
-        print("Scraping Weibo...")
-        data["Weibo"] = fetch_weibo_hot()
-        
-    if ENABLE_DOUYIN:
-        print("Scraping Douyin...")
-        data["Douyin"] = fetch_douyin_hot()
-        
-    if ENABLE_XHS:
-        print("Scraping Xiaohongshu...")
-        # XHS is limited, currently returns a placeholder or empty
-        data["Xiaohongshu"] = fetch_xhs_hot()
-        
-    if ENABLE_TWITTER:
-        print("Scraping Twitter...")
-        data["Twitter"] = fetch_twitter_hot()
-        
-    if ENABLE_BAIDU:
-        print("Scraping Baidu...")
-        data["Baidu"] = fetch_baidu_hot()
-        
-    if ENABLE_ZHIHU:
-        print("Scraping Zhihu...")
-        data["Zhihu"] = fetch_zhihu_hot()
-        
-    if ENABLE_BILIBILI:
-        print("Scraping Bilibili...")
-        data["Bilibili"] = fetch_bilibili_hot()
-        
-    if ENABLE_KUAISHOU:
-        print("Scraping Kuaishou...")
-        data["Kuaishou"] = fetch_kuaishou_hot()
-        
-    if ENABLE_XIGUA:
-        print("Scraping Xigua...")
-        data["Xigua"] = fetch_xigua_hot()
-        
-    if ENABLE_LINUXDO:
-        print("Scraping Linux.do...")
-        data["Linux.do"] = fetch_linuxdo_hot()
-        
-    if ENABLE_52POJIE:
-        print("Scraping 52pojie...")
-        data["52pojie"] = fetch_52pojie_hot()
-        
-    if ENABLE_YOUTUBE:
-        print("Scraping YouTube...")
-        data["YouTube"] = fetch_youtube_hot()
-        
-    if ENABLE_FINANCE:
-        print("Scraping Finance News...")
-        data["财经"] = fetch_finance_news()
-        
-    if ENABLE_REDDIT:
-        print("Scraping Reddit...")
-        data["Reddit"] = fetch_reddit_hot()
-        
-    if ENABLE_STACKOVERFLOW:
-        print("Scraping StackOverflow...")
-        data["StackOverflow"] = fetch_stackoverflow_hot()
-        
-    if ENABLE_XIANYU:
-        print("Scraping Xianyu...")
-        data["Xianyu"] = fetch_xianyu_hot()
-        
-    if ENABLE_XMFISH:
-        print("Scraping Xmfish...")
-        data["Xmfish"] = fetch_xmfish_hot()
-        
-    if ENABLE_NETEASE:
-        print("Scraping Netease...")
-        data["Netease"] = fetch_netease_hot()
-        
     # Determine time period (4 times a day: 7:00, 12:00, 17:00, 22:00)
-    # Fix: GitHub Actions runs in UTC, so we must explicitly convert to Beijing Time (UTC+8)
-    utc_now = datetime.datetime.utcnow()
-    beijing_now = utc_now + datetime.timedelta(hours=8)
-    
-    current_hour = beijing_now.hour
-    current_minute = beijing_now.minute
-    current_time = current_hour + current_minute / 60
-    
-    # Logic to select time period
-    if 6 <= current_time < 9:  # 7:00时段 (6:00-9:00)
-        time_period = "morning_7am"
-        period_cn = "⏰ 07:00·晨间热点回顾"
-    elif 11 <= current_time < 14:  # 12:00时段 (11:00-14:00)
-        time_period = "noon_12pm"
-        period_cn = "🕛 12:00·午间热点速递"
-    elif 16 <= current_time < 19:  # 17:00时段 (16:00-19:00)
-        time_period = "evening_5pm"
-        period_cn = "🌇 17:00·傍晚热点更新"
-    elif 21 <= current_time <= 23.99 or 0 <= current_time < 1:  # 22:00时段 (21:00-01:00)
-        time_period = "night_10pm"
-        period_cn = "🌙 22:00·全天热点盘点"
-    else:
+    beijing_now = beijing_time()
+    period = get_time_period(beijing_now)
+    if period is None:
         # Check for force flag
-        import sys
         if "--force" in sys.argv or "--test" in sys.argv:
             print("Force mode enabled. Using default time period.")
-            time_period = "noon_12pm" # Default for testing
-            period_cn = "🧪 测试推送·热点速递"
+            period = ("noon_12pm", "🧪 测试推送·热点速递")  # Default for testing
         else:
-            print(f"Current time {current_hour}:{current_minute} is not in reporting hours. Skipping.")
+            print(f"Current time {beijing_now.hour}:{beijing_now.minute} is not in reporting hours. Skipping.")
             return
+    time_period, period_cn = period
 
-    # Generate Report
-    print(f"Generating {time_period} report...")
-    html_content = generate_html(data, time_period)
-    
-    # Send
-    print("Sending notification...")
-    date_str = beijing_now.strftime("%m月%d日")
-    subject = f"{period_cn} | {date_str}"
-    succeeded = send_wechat(subject, html_content)
-    
-    if not succeeded:
-        print("\n=== DEBUG: Output Content (since send failed) ===")
-        print("Note: This failure is expected if no secrets are configured locally.")
-        # Print a snippet if send failed, so user can see it works locally
-        print(html_content[:500] + "...")
+    # 只有在推送时段内才导入抓取、推送相关模块
+    from platforms import for_report
+    data, fetch_status = fetch_all(for_report(time_period))
+    publish(data, fetch_status, time_period, period_cn, beijing_now)
+    write_run_summary(list(data))
 
 if __name__ == "__main__":
-    main()
+    if "--daemon" in sys.argv:
+        # 常驻模式：各平台按各自间隔刷新，到推送时间直接用内存中的数据生成报告
+        from daemon import run_daemon
+        run_daemon()
+    else:
+        main()
@@ -0,0 +1,301 @@
+# metrics.py
+import contextvars
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from functools import wraps
+from urllib.parse import urlsplit
+import breaker
+
+# 抓取指标：每个平台每次抓取的耗时、结果、条数、解析 CPU 时间和最终由哪一级来源给出结果，
+# 以及每个 HTTP 请求的 DNS / 建连 / 首字节 / 下载耗时和字节数
+# 当前平台通过 contextvar 传递，asyncio 任务会继承，所以 race_sources 中的各来源也会记到同一平台下
+
+_current = contextvars.ContextVar("current_fetch", default=None)
+
+HTTP_PHASES = ("dns", "connect", "ttfb", "download")
+
+class FetchRecord:
+    """One fetch of one platform."""
+    def __init__(self, platform):
+        self.platform = platform
+        self.started = time.time()
+        self.duration = 0.0
+        self.result = None       # ok / error / timeout
+        self.items = 0
+        self.tier = "primary"    # primary / source2 / source3 ... / simulated
+        self.parse_cpu = 0.0
+        self.requests = 0
+        self.bytes = 0
+        self.http_errors = 0
+
+    def as_dict(self):
+        return {
+            "result": self.result,
+            "duration": round(self.duration, 3),
+            "items": self.items,
+            "tier": self.tier,
+            "parse_cpu": round(self.parse_cpu, 4),
+            "requests": self.requests,
+            "bytes": self.bytes,
+            "http_errors": self.http_errors,
+        }
+
+class Metrics:
+    """Process-wide counters, exported as Prometheus text or a JSON summary."""
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.last_fetch = {}                         # platform -> FetchRecord
+        self.fetch_total = defaultdict(int)          # (platform, result)
+        self.fetch_seconds = defaultdict(float)      # platform
+        self.tier_total = defaultdict(int)           # (platform, tier)
+        self.parse_cpu = defaultdict(float)          # platform
+        self.http_total = defaultdict(int)           # (platform, host, status)
+        self.http_bytes = defaultdict(int)           # (platform, host)
+        self.phase_sum = defaultdict(float)          # (platform, host, phase)
+        self.phase_count = defaultdict(int)          # (platform, host, phase)
+        self.push_total = defaultdict(int)           # (channel, result)
+        self.push_seconds = defaultdict(float)       # channel
+        self.push_recipients = defaultdict(int)      # (channel, delivered / failed)
+        self.deliveries = []                         # 最近一次推送的 DeliveryReceipt
+
+    def record_request(self, url, status, timings, size):
+        record = _current.get()
+        platform = record.platform if record else "other"
+        host = urlsplit(url).netloc
+        with self.lock:
+            self.http_total[(platform, host, str(status))] += 1
+            self.http_bytes[(platform, host)] += size
+            for phase in HTTP_PHASES:
+                if phase in timings:
+                    self.phase_sum[(platform, host, phase)] += timings[phase]
+                    self.phase_count[(platform, host, phase)] += 1
+        if record:
+            record.requests += 1
+            record.bytes += size
+            if status == "error" or (isinstance(status, int) and status >= 400):
+                record.http_errors += 1
+
+    def record_fetch(self, record):
+        with self.lock:
+            self.last_fetch[record.platform] = record
+            self.fetch_total[(record.platform, record.result)] += 1
+            self.fetch_seconds[record.platform] += record.duration
+            self.tier_total[(record.platform, record.tier)] += 1
+            self.parse_cpu[record.platform] += record.parse_cpu
+
+    def record_deliveries(self, receipts):
+        """Receipts of one report delivery (see dispatch.py); the summary keeps the latest round."""
+        with self.lock:
+            for receipt in receipts:
+                self.push_total[(receipt.channel, receipt.result)] += 1
+                self.push_seconds[receipt.channel] += receipt.latency
+                self.push_recipients[(receipt.channel, "delivered")] += receipt.delivered
+                self.push_recipients[(receipt.channel, "failed")] += receipt.count - receipt.delivered
+            self.deliveries = list(receipts)
+
+    def summary(self, order=None):
+        """Latest fetch of every platform (in the given order), for the one-shot JSON run summary."""
+        with self.lock:
+            names = [name for name in order if name in self.last_fetch] if order else list(self.last_fetch)
+            platforms = {name: self.last_fetch[name].as_dict() for name in names}
+            deliveries = [receipt.as_dict() for receipt in self.deliveries]
+        return {
+            "generated_at": int(time.time()),
+            "platforms": platforms,
+            "fallbacks": sorted(platform for platform, data in platforms.items() if data["tier"] != "primary"),
+            "breakers": breaker.get_registry().snapshot(),
+            "deliveries": deliveries,
+        }
+
+    def prometheus(self):
+        """All counters in the Prometheus text exposition format."""
+        lines = []
+
+        def metric(name, kind, help_text, samples):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, value in samples:
+                label_text = ",".join(f'{key}="{_escape(val)}"' for key, val in labels)
+                lines.append(f"{name}{{{label_text}}} {value}")
+
+        with self.lock:
+            metric("trending_fetch_total", "counter", "Platform fetches by result.",
+                   [((("platform", p), ("result", r)), n) for (p, r), n in sorted(self.fetch_total.items())])
+            metric("trending_fetch_seconds_total", "counter", "Wall time spent fetching each platform.",
+                   [((("platform", p),), round(s, 6)) for p, s in sorted(self.fetch_seconds.items())])
+            metric("trending_fetch_tier_total", "counter", "Which fallback tier answered a fetch.",
+                   [((("platform", p), ("tier", t)), n) for (p, t), n in sorted(self.tier_total.items())])
+            metric("trending_fetch_items", "gauge", "Items returned by the latest fetch.",
+                   [((("platform", p),), r.items) for p, r in sorted(self.last_fetch.items())])
+            metric("trending_fetch_last_timestamp_seconds", "gauge", "Start time of the latest fetch.",
+                   [((("platform", p),), round(r.started, 3)) for p, r in sorted(self.last_fetch.items())])
+            metric("trending_parse_cpu_seconds_total", "counter", "CPU time spent parsing HTML and JSON.",
+                   [((("platform", p),), round(s, 6)) for p, s in sorted(self.parse_cpu.items())])
+            metric("trending_http_requests_total", "counter", "HTTP requests by status (error = no response).",
+                   [((("platform", p), ("host", h), ("status", s)), n) for (p, h, s), n in sorted(self.http_total.items())])
+            metric("trending_http_response_bytes_total", "counter", "Response body bytes received.",
+                   [((("platform", p), ("host", h)), n) for (p, h), n in sorted(self.http_bytes.items())])
+            metric("trending_http_phase_seconds_sum", "counter", "Time spent in each request phase.",
+                   [((("platform", p), ("host", h), ("phase", ph)), round(s, 6)) for (p, h, ph), s in sorted(self.phase_sum.items())])
+            metric("trending_http_phase_seconds_count", "counter", "Requests that went through each phase.",
+                   [((("platform", p), ("host", h), ("phase", ph)), n) for (p, h, ph), n in sorted(self.phase_count.items())])
+            metric("trending_push_total", "counter", "Delivery requests by channel and result.",
+                   [((("channel", c), ("result", r)), n) for (c, r), n in sorted(self.push_total.items())])
+            metric("trending_push_seconds_total", "counter", "Time spent delivering to each channel.",
+                   [((("channel", c),), round(s, 6)) for c, s in sorted(self.push_seconds.items())])
+            metric("trending_push_recipients_total", "counter", "Recipients reached or missed (batched channels count each member).",
+                   [((("channel", c), ("result", r)), n) for (c, r), n in sorted(self.push_recipients.items())])
+        breakers = breaker.get_registry().snapshot()
+        states = {breaker.CLOSED: 0, breaker.HALF_OPEN: 1, breaker.OPEN: 2}
+        metric("trending_breaker_state", "gauge", "Circuit breaker state (0 closed, 1 half-open, 2 open).",
+               [((("endpoint", e),), states[b["state"]]) for e, b in sorted(breakers.items())])
+        metric("trending_breaker_failures", "gauge", "Consecutive failures of an endpoint.",
+               [((("endpoint", e),), b["failures"]) for e, b in sorted(breakers.items())])
+        metric("trending_breaker_rejected_total", "counter", "Requests skipped because the circuit was open.",
+               [((("endpoint", e),), b["rejected"]) for e, b in sorted(breakers.items())])
+        return "\n".join(lines) + "\n"
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+METRICS = Metrics()
+
+@contextmanager
+def track_fetch(platform):
+    """
+    Wraps one platform fetch; requests, parse time and fallback tier
+    recorded inside the block are attributed to it. Set record.items
+    to the number of items returned.
+    """
+    record = FetchRecord(platform)
+    token = _current.set(record)
+    start = time.perf_counter()
+    try:
+        yield record
+        record.result = "ok"
+    except BaseException as e:
+        # 超时的抓取会被取消（CancelledError / asyncio.TimeoutError）
+        record.result = "timeout" if type(e).__name__ in ("CancelledError", "TimeoutError") else "error"
+        raise
+    finally:
+        record.duration = time.perf_counter() - start
+        _current.reset(token)
+        METRICS.record_fetch(record)
+
+def current_platform():
+    """Platform whose fetch is running in this context, or None."""
+    record = _current.get()
+    return record.platform if record else None
+
+def set_tier(tier):
+    """Marks which fallback tier answered the current fetch."""
+    record = _current.get()
+    if record is not None:
+        record.tier = tier
+
+def simulated(func):
+    """Decorator for _get_*_simulated_data(): marks the fetch as answered by simulated data."""
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        set_tier("simulated")
+        return func(*args, **kwargs)
+    return wrapper
+
+@contextmanager
+def parse_timer():
+    """Adds the CPU time of the block (this thread only) to the current fetch."""
+    record = _current.get()
+    if record is None:
+        yield
+        return
+    start = time.thread_time()
+    try:
+        yield
+    finally:
+        record.parse_cpu += time.thread_time() - start
+
+def trace_config():
+    """
+    aiohttp TraceConfig filling the timings dict passed as
+    trace_request_ctx: dns, connect and ttfb (request sent -> headers).
+    http_client.get() adds download and records the request.
+    """
+    import aiohttp
+
+    async def on_request_start(session, ctx, params):
+        ctx.start = time.perf_counter()
+        ctx.timings = ctx.trace_request_ctx if isinstance(ctx.trace_request_ctx, dict) else {}
+
+    async def on_dns_start(session, ctx, params):
+        ctx.dns_start = time.perf_counter()
+
+    async def on_dns_end(session, ctx, params):
+        ctx.timings["dns"] = time.perf_counter() - ctx.dns_start
+
+    async def on_connect_start(session, ctx, params):
+        ctx.connect_start = time.perf_counter()
+
+    async def on_connect_end(session, ctx, params):
+        # 包含 DNS 之后的 TCP + TLS 握手；复用长连接时没有这一阶段
+        ctx.timings["connect"] = time.perf_counter() - ctx.connect_start - ctx.timings.get("dns", 0)
+
+    async def on_request_end(session, ctx, params):
+        ctx.timings["ttfb"] = time.perf_counter() - ctx.start - ctx.timings.get("dns", 0) - ctx.timings.get("connect", 0)
+
+    config = aiohttp.TraceConfig()
+    config.on_request_start.append(on_request_start)
+    config.on_dns_resolvehost_start.append(on_dns_start)
+    config.on_dns_resolvehost_end.append(on_dns_end)
+    config.on_connection_create_start.append(on_connect_start)
+    config.on_connection_create_end.append(on_connect_end)
+    config.on_request_end.append(on_request_end)
+    return config
+
+def write_summary(path, order=None):
+    """Writes the JSON run summary (one-shot mode) and prints one line per platform."""
+    summary = METRICS.summary(order)
+    for platform, data in summary["platforms"].items():
+        print(f"  {platform:<14} {data['result'] or '-':<8} {data['duration']:>6.2f}s  {data['items']:>3} items  "
+              f"{data['requests']} req  {data['bytes'] / 1024:.0f}KB  parse {data['parse_cpu'] * 1000:.0f}ms  {data['tier']}")
+    for endpoint, state in summary["breakers"].items():
+        if state["state"] != breaker.CLOSED:
+            print(f"  circuit {state['state']}: {endpoint} ({state['rejected']} skipped)")
+    if not path:
+        return summary
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(summary, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+    return summary
+
+def serve(port, host="127.0.0.1"):
+    """Serves /metrics in Prometheus text format from a background thread (daemon mode)."""
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = METRICS.prometheus().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    thread = threading.Thread(target=server.serve_forever, name="metrics", daemon=True)
+    thread.start()
+    print(f"Metrics endpoint: http://{host}:{port}/metrics")
+    return server
@@ -1,349 +1,291 @@
 # notifier.py
-import requests
-import json
-import time
-import html
+from dispatch import Batch, Channel, PartialDelivery, dispatch, mask
+from render import render_html, render_markdown
 from config import PUSHPLUS_TOKEN, SERVERCHAN_KEY, WECHAT_APPID, WECHAT_APPSECRET, WECHAT_TEMPLATE_ID, WECHAT_USER_OPENID, WXPUSHER_APP_TOKEN, WXPUSHER_USER_UID
+from config import PUSH_CHANNELS, PUSH_TIMEOUT, WXPUSHER_TOPIC_IDS, WXPUSHER_BATCH_SIZE
+from subscribers import get_registry, merge
+from wechat_token import get_manager, INVALID_TOKEN_ERRCODES
 
-def send_pushplus(subject, content):
+# 每个渠道拆成 prepare（整份报告只执行一次）和 deliver（每个接收人一次，失败时抛出 DeliveryError），
+# 由 dispatch.py 并发发送。接收人配置支持逗号分隔多个：
+# WXPUSHER_USER_UID、WXPUSHER_TOPIC_IDS、WECHAT_USER_OPENID、PUSHPLUS_TOKEN、SERVERCHAN_KEY，
+# 并与订阅者名单（subscribers.py）合并；WxPusher 按 WXPUSHER_BATCH_SIZE 把多个 uid/topicId 合并到一个请求
+
+class DeliveryError(Exception):
+    """The provider answered but did not accept the message."""
+
+def recipients(value):
+    return [part.strip() for part in value.split(",") if part.strip()]
+
+def _pushplus_prepare(report, session):
+    return {
+        "title": report.subject,
+        "content": render_html(report),
+        "template": "html"
+    }
+
+def _pushplus_deliver(payload, token, session):
     """
-    Send via PushPlus
+    Send via PushPlus (HTML)
     """
-    if not PUSHPLUS_TOKEN:
-        print("PushPlus Token not configured. Skipping.")
-        return False
-        
     url = "http://www.pushplus.plus/send"
-    data = {
-        "token": PUSHPLUS_TOKEN,
-        "title": subject,
-        "content": content,
-        "template": "html"
+    response = session.post(url, json=dict(payload, token=token), timeout=PUSH_TIMEOUT)
+    result = response.json()
+    if result.get("code") != 200:
+        raise DeliveryError(f"PushPlus failed: {result}")
+
+def _serverchan_prepare(report, session):
+    return {
+        "title": report.subject,
+        "desp": render_markdown(report)
     }
-    
-    try:
-        response = requests.post(url, json=data)
-        result = response.json()
-        if result.get("code") == 200:
-            print("PushPlus send success")
-            return True
-        else:
-            print(f"PushPlus failed: {result}")
-            return False
-    except Exception as e:
-        print(f"PushPlus Error: {e}")
-        return False
 
-def send_serverchan(subject, content):
+def _serverchan_deliver(payload, key, session):
     """
-    Send via ServerChan (Turbo)
+    Send via ServerChan (Turbo), desp 为 Markdown
     """
-    if not SERVERCHAN_KEY:
-        print("ServerChan Key not configured. Skipping.")
-        return False
-        
-    url = f"https://sctapi.ftqq.com/{SERVERCHAN_KEY}.send"
-    data = {
-        "title": subject,
-        "desp": content
-    }
-    
-    try:
-        response = requests.post(url, data=data)
-        result = response.json()
-        if result.get("code") == 0:
-            print("ServerChan send success")
-            return True
-        else:
-            print(f"ServerChan failed: {result}")
-            return False
-    except Exception as e:
-        print(f"ServerChan Error: {e}")
-        return False
+    url = f"https://sctapi.ftqq.com/{key}.send"
+    response = session.post(url, data=payload, timeout=PUSH_TIMEOUT)
+    result = response.json()
+    if result.get("code") != 0:
+        raise DeliveryError(f"ServerChan failed: {result}")
 
-def send_wechat_test(subject, content):
+def _wechat_test_prepare(report, session):
     """
-    Send via WeChat Test Account using template message.
+    WeChat Test Account: builds the template message once; only touser
+    differs between recipients. The access token is added when sending.
     """
-    if not all([WECHAT_APPID, WECHAT_APPSECRET, WECHAT_TEMPLATE_ID, WECHAT_USER_OPENID]):
-        print("WeChat Test Account not fully configured. Skipping.")
-        return False
+    # 1. Prepare template data with more detailed information
+    platform_count = len(report.sections)
     
-    try:
-        # 1. Get access token
-        token_url = f"https://api.weixin.qq.com/cgi-bin/token?grant_type=client_credential&appid={WECHAT_APPID}&secret={WECHAT_APPSECRET}"
-        token_response = requests.get(token_url, timeout=10)
-        token_data = token_response.json()
-        
-        if 'access_token' not in token_data:
-            print(f"WeChat token error: {token_data}")
-            return False
-        
-        access_token = token_data['access_token']
-        
-        # 2. Prepare template data with more detailed information
-        import re
-        from bs4 import BeautifulSoup
-        
-        # 解析HTML获取详细信息
-        soup = BeautifulSoup(content, 'html.parser')
-        platform_divs = soup.find_all('div', style=re.compile(r'background: #f8f9fa'))
-        platform_count = len(platform_divs)
-        
-        # 提取各平台热点，提供更详细的信息
-        hot_items = []
-        successful_platforms = 0
-        platform_details = []
-        
-        for div in platform_divs:
-            h2 = div.find('h2')
-            if not h2:
-                continue
-                
-            platform_name = h2.get_text(strip=True).replace('🔥', '').strip()
-            items = div.find_all('li')
-            
-            # 检查是否有真实数据
-            has_real_data = False
-            platform_hot_items = []
-            
-            for item in items[:5]:  # 每个平台最多检查5条
-                text = item.get_text(strip=True)
-                if not text or len(text) < 4:
-                    continue
-                    
-                # 过滤错误信息
-                error_keywords = ['Error', '错误', '暂无数据', 'Config Required', 'Could not parse', 'Scraper']
-                if any(keyword in text for keyword in error_keywords):
-                    continue
-                
-                # 提取排名、标题和热度
-                match = re.match(r'(\d+)\s*(.+?)(?:\s+(\d+[万MkK]?))?$', text)
-                if match:
-                    rank = match.group(1)
-                    title = match.group(2).strip()
-                    hot_value = match.group(3) if match.group(3) else ""
-                    
-                    if title and len(title) > 2:
-                        has_real_data = True
-                        # 格式化：排名. 标题 (热度)
-                        formatted = f"{rank}. {title}"
-                        if hot_value:
-                            formatted += f" ({hot_value})"
-                        platform_hot_items.append(formatted)
-            
-            # 记录有数据的平台
-            if has_real_data and platform_hot_items:
-                successful_platforms += 1
-                platform_details.append({
-                    'name': platform_name,
-                    'items': platform_hot_items[:3]  # 每个平台最多3条
-                })
-                
-                # 为模板摘要准备数据（前3个平台，每个平台前2条）
-                if successful_platforms <= 3:
-                    for item in platform_hot_items[:2]:
-                        # 简化显示
-                        simple_item = re.sub(r'^\d+\.\s*', '', item)
-                        if len(simple_item) > 25:
-                            simple_item = simple_item[:22] + "..."
-                        hot_items.append(f"• {platform_name}: {simple_item}")
-        
-        # 生成详细的热点摘要
-        if hot_items:
-            hot_summary = "\n".join(hot_items[:6])  # 最多6条
-            if len(hot_items) > 6:
-                hot_summary += f"\n...查看更多"
-        else:
-            hot_summary = "暂无热点数据"
-        
-        # 生成平台统计信息
-        if successful_platforms > 0:
-            platform_names = [p['name'] for p in platform_details[:3]]
-            platform_info = f"{successful_platforms}个平台有数据"
-            if platform_names:
-                platform_info += f" ({'、'.join(platform_names)})"
-        else:
-            platform_info = f"{platform_count}个平台均无数据"
-        
-        # 3. 生成详细报告并上传到临时服务（这里简化，实际可以上传到服务器或使用云存储）
-        # 由于微信模板限制，我们只能提供摘要，详细报告需要其他方式
+    # 提取各平台热点，提供更详细的信息
+    hot_items = []
+    platform_details = []
+    
+    for section in report.platforms_with_data:
+        # 每个平台最多检查5条
+        platform_hot_items = [item for item in section.items[:5] if not item.placeholder]
+        if not platform_hot_items:
+            continue
         
-        # 4. Send template message with improved content
-        send_url = f"https://api.weixin.qq.com/cgi-bin/message/template/send?access_token={access_token}"
+        # 记录有数据的平台
+        platform_details.append({
+            'name': section.label,
+            'items': platform_hot_items[:3]  # 每个平台最多3条
+        })
         
-        # 改进的模板数据 - 更友好的排版
-        template_data = {
-            "touser": WECHAT_USER_OPENID,
-            "template_id": WECHAT_TEMPLATE_ID,
-            "url": "https://mp.weixin.qq.com/debug/cgi-bin/sandbox?t=sandbox/login",  # 如果有公众号文章链接可以替换
-            "data": {
-                "first": {
-                    "value": f"🔥 {subject} 🔥\n────────────",
-                    "color": "#e74c3c"
-                },
-                "keyword1": {
-                    "value": time.strftime("%m月%d日 %H:%M"),
-                    "color": "#3498db"
-                },
-                "keyword2": {
-                    "value": platform_info,
-                    "color": "#2ecc71"
-                },
-                "keyword3": {
-                    "value": hot_summary,
-                    "color": "#34495e"
-                },
-                "remark": {
-                    "value": "📱 点击查看完整热点榜单\n🔍 数据来源：各平台公开榜单",
-                    "color": "#7f8c8d"
-                }
+        # 为模板摘要准备数据（前3个平台，每个平台前2条）
+        if len(platform_details) <= 3:
+            for item in platform_hot_items[:2]:
+                # 简化显示
+                text = f"{item.title} ({item.hot})" if item.hot else item.title
+                if len(text) > 25:
+                    text = text[:22] + "..."
+                hot_items.append(f"• {section.label}: {text}")
+    successful_platforms = len(platform_details)
+    
+    # 生成详细的热点摘要
+    if hot_items:
+        hot_summary = "\n".join(hot_items[:6])  # 最多6条
+        if len(hot_items) > 6:
+            hot_summary += f"\n...查看更多"
+    else:
+        hot_summary = "暂无热点数据"
+    
+    # 生成平台统计信息
+    if successful_platforms > 0:
+        platform_names = [p['name'] for p in platform_details[:3]]
+        platform_info = f"{successful_platforms}个平台有数据"
+        if platform_names:
+            platform_info += f" ({'、'.join(platform_names)})"
+    else:
+        platform_info = f"{platform_count}个平台均无数据"
+    
+    # 2. 生成详细报告并上传到临时服务（这里简化，实际可以上传到服务器或使用云存储）
+    # 由于微信模板限制，我们只能提供摘要，详细报告需要其他方式
+    
+    # 3. Template message with improved content
+    # 改进的模板数据 - 更友好的排版
+    template_data = {
+        "template_id": WECHAT_TEMPLATE_ID,
+        "url": "https://mp.weixin.qq.com/debug/cgi-bin/sandbox?t=sandbox/login",  # 如果有公众号文章链接可以替换
+        "data": {
+            "first": {
+                "value": f"🔥 {report.subject} 🔥\n────────────",
+                "color": "#e74c3c"
+            },
+            "keyword1": {
+                "value": report.generated_at.strftime("%m月%d日 %H:%M"),
+                "color": "#3498db"
+            },
+            "keyword2": {
+                "value": platform_info,
+                "color": "#2ecc71"
+            },
+            "keyword3": {
+                "value": hot_summary,
+                "color": "#34495e"
+            },
+            "remark": {
+                "value": "📱 点击查看完整热点榜单\n🔍 数据来源：各平台公开榜单",
+                "color": "#7f8c8d"
             }
         }
-        
-        response = requests.post(send_url, json=template_data, timeout=10)
+    }
+    return template_data
+
+def _wechat_test_deliver(template_data, openid, session):
+    """
+    Send via WeChat Test Account using template message.
+    """
+    manager = get_manager()
+    send_url = "https://api.weixin.qq.com/cgi-bin/message/template/send"
+    for attempt in range(2):
+        access_token = manager.get(session)
+        response = session.post(send_url, params={"access_token": access_token},
+                                json=dict(template_data, touser=openid), timeout=PUSH_TIMEOUT)
         result = response.json()
-        
         if result.get('errcode') == 0:
-            print("WeChat Test Account send success")
-            
-            # 同时输出详细数据到控制台，方便查看
-            print("\n=== 详细热点数据 ===")
-            for platform in platform_details:
-                print(f"\n{platform['name']}:")
-                for item in platform['items']:
-                    print(f"  {item}")
-            print(f"\n总计: {successful_platforms}/{platform_count}个平台有数据")
-            
-            return True
-        else:
-            print(f"WeChat Test Account failed: {result}")
-            return False
-            
-    except Exception as e:
-        print(f"WeChat Test Account Error: {e}")
-        return False
+            return
+        # token 已失效（过期或在别处被刷新）：作废后重新获取，重试一次
+        if result.get('errcode') not in INVALID_TOKEN_ERRCODES:
+            break
+        manager.invalidate(access_token)
+    raise DeliveryError(f"WeChat Test Account failed: {result}")
 
-def send_wxpusher(subject, content):
+def _wxpusher_prepare(report, session):
+    # WxPusher 使用 Markdown，直接由报告对象生成
+    # appToken 在发送时加入，prepare 的结果会保存在发件箱中
+    return {
+        "content": render_markdown(report)[:5000],  # WxPusher支持更长内容
+        "summary": report.subject[:100],
+        "contentType": 3,  # 3表示Markdown
+        "url": ""
+    }
+
+def _wxpusher_post(payload, members, session):
     """
-    Send via WxPusher (支持长文本和Markdown)
+    One WxPusher request to uids (str) and topic ids (int).
+    Returns {member: error} for recipients the response marks as failed.
     """
-    if not all([WXPUSHER_APP_TOKEN, WXPUSHER_USER_UID]):
-        print("WxPusher not configured. Skipping.")
-        return False
-    
-    try:
-        # 将HTML转换为Markdown格式，更适合WxPusher
-        import re
-        from bs4 import BeautifulSoup
-        
-        soup = BeautifulSoup(content, 'html.parser')
-        
-        # 提取主要信息生成Markdown
-        markdown_content = f"# {subject}\n\n"
-        markdown_content += f"**时间**: {time.strftime('%Y-%m-%d %H:%M')}\n\n"
-        
-        # 提取各平台数据，增加显示数量
-        platform_divs = soup.find_all('div', style=re.compile(r'background: #f8f9fa'))
-        
-        for div in platform_divs[:12]:  # 最多12个平台
-            h2 = div.find('h2')
-            if not h2:
-                continue
-                
-            platform_name = h2.get_text(strip=True).replace('🔥', '').strip()
-            
-            # 根据不同平台调整显示数量
-            if platform_name in ["Weibo", "微博", "Douyin", "抖音"]:
-                items = div.find_all('li')[:15]  # 微博抖音显示15条
-            elif platform_name in ["Twitter", "推特"]:
-                items = div.find_all('li')[:20]  # 推特显示20条（中文区优先）
-            else:
-                items = div.find_all('li')[:8]   # 其他平台显示8条
-            
-            valid_items = []
-            for item in items:
-                text = item.get_text(strip=True)
-                if text and len(text) > 3:
-                    # 过滤错误信息
-                    if any(keyword in text for keyword in ['Error', '错误', '暂无数据', 'Config Required', 'Could not parse', 'Scraper']):
-                        continue
-                    valid_items.append(text)
-            
-            if valid_items:
-                # 添加平台emoji
-                platform_emojis = {
-                    "Weibo": "📱", "微博": "📱",
-                    "Douyin": "🎵", "抖音": "🎵", 
-                    "Twitter": "🐦", "推特": "🐦",
-                    "Baidu": "🔍", "百度": "🔍",
-                    "Zhihu": "❓", "知乎": "❓",
-                    "Bilibili": "📺", "B站": "📺",
-                    "Xiaohongshu": "📕", "小红书": "📕",
-                    "Kuaishou": "⚡", "快手": "⚡",
-                    "Xigua": "🍉", "西瓜视频": "🍉",
-                    "Xueqiu": "📈", "雪球": "📈",
-                    "Reddit": "👽",
-                    "YouTube": "🎬",
-                    "StackOverflow": "💻"
-                }
-                
-                emoji = platform_emojis.get(platform_name, "🔥")
-                markdown_content += f"## {emoji} {platform_name}\n"
-                
-                # 显示有效条目
-                for item in valid_items:
-                    markdown_content += f"- {item}\n"
-                
-                # 如果实际条数少于显示条数，添加统计
-                if len(valid_items) < len(items):
-                    markdown_content += f"*（共 {len(valid_items)} 条有效数据）*\n"
-                
-                markdown_content += "\n"
-        
-        # 发送到WxPusher
-        url = "https://wxpusher.zjiecode.com/api/send/message"
-        data = {
-            "appToken": WXPUSHER_APP_TOKEN,
-            "content": markdown_content[:5000],  # WxPusher支持更长内容
-            "summary": subject[:100],
-            "contentType": 3,  # 3表示Markdown
-            "topicIds": [],
-            "uids": [WXPUSHER_USER_UID],
-            "url": ""
-        }
-        
-        response = requests.post(url, json=data, timeout=10)
-        result = response.json()
-        
-        if result.get('code') == 1000:
-            print("WxPusher send success")
-            return True
-        else:
-            print(f"WxPusher failed: {result}")
-            return False
-            
-    except Exception as e:
-        print(f"WxPusher Error: {e}")
+    url = "https://wxpusher.zjiecode.com/api/send/message"
+    uids = [member for member in members if isinstance(member, str)]
+    topic_ids = [member for member in members if isinstance(member, int)]
+    response = session.post(url, json=dict(payload, appToken=WXPUSHER_APP_TOKEN, uids=uids, topicIds=topic_ids),
+                            timeout=PUSH_TIMEOUT)
+    result = response.json()
+    if result.get('code') != 1000:
+        raise DeliveryError(f"WxPusher failed: {result}")
+    # data 中每个 uid / topicId 一条发送结果
+    failed = {}
+    for entry in result.get('data') or []:
+        if entry.get('code', 1000) != 1000:
+            member = entry.get('uid') or entry.get('topicId')
+            failed[member] = entry.get('status') or f"code {entry.get('code')}"
+    return failed
+
+def _wxpusher_deliver(payload, batch, session):
+    """
+    Send via WxPusher (支持长文本和Markdown), up to WXPUSHER_BATCH_SIZE
+    recipients per request.
+    """
+    # 第一次请求整体失败才算整批失败
+    failed = _wxpusher_post(payload, batch.members, session)
+    if failed:
+        # 失败的接收人单独组成一个更小的批次再发一次；这次请求出错时，
+        # 其余接收人已经收到，只把仍失败的报告为部分失败，避免整批重发
+        try:
+            failed = _wxpusher_post(payload, list(failed), session)
+        except Exception as e:
+            failed = {member: str(e) for member in failed}
+    if failed and len(failed) == len(batch.members):
+        raise DeliveryError(f"WxPusher failed for all recipients: {next(iter(failed.values()))}")
+    if failed:
+        raise PartialDelivery(failed)
+
+def _wxpusher_batches(uids, topic_ids, size=WXPUSHER_BATCH_SIZE):
+    members = list(uids) + list(topic_ids)
+    if len(members) == 1:
+        return [Batch(mask(members[0]), members)]
+    chunks = [members[i:i + size] for i in range(0, len(members), max(1, size))]
+    return [Batch(f"batch{n + 1}/{len(chunks)}", chunk) for n, chunk in enumerate(chunks)]
+
+# 渠道名 -> deliver，outbox 补发时使用已保存的 prepare 结果
+DELIVERERS = {
+    "wxpusher": _wxpusher_deliver,
+    "wechat_test": _wechat_test_deliver,
+    "pushplus": _pushplus_deliver,
+    "serverchan": _serverchan_deliver,
+}
+
+def configured_channels():
+    """
+    All channels with at least one recipient, in priority order:
+    WxPusher > WeChat Test Account > PushPlus > ServerChan
+    """
+    registry = get_registry()
+
+    def merged(channel, configured):
+        return merge(channel, recipients(configured), registry.recipients(channel))
+
+    channels = []
+    if WXPUSHER_APP_TOKEN:
+        batches = _wxpusher_batches(merged("wxpusher", WXPUSHER_USER_UID), merged("wxpusher_topics", WXPUSHER_TOPIC_IDS))
+        channels.append(Channel("wxpusher", batches, _wxpusher_prepare, _wxpusher_deliver))
+    if all([WECHAT_APPID, WECHAT_APPSECRET, WECHAT_TEMPLATE_ID]):
+        channels.append(Channel("wechat_test", merged("wechat_test", WECHAT_USER_OPENID), _wechat_test_prepare, _wechat_test_deliver))
+    channels.append(Channel("pushplus", merged("pushplus", PUSHPLUS_TOKEN), _pushplus_prepare, _pushplus_deliver))
+    channels.append(Channel("serverchan", merged("serverchan", SERVERCHAN_KEY), _serverchan_prepare, _serverchan_deliver))
+    return [channel for channel in channels if channel.recipients]
+
+def select_channels(mode=PUSH_CHANNELS):
+    """Channels to send to: all, first (highest priority only) or a comma-separated list of names."""
+    channels = configured_channels()
+    mode = mode.strip().lower()
+    if mode == "all":
+        return channels
+    if mode == "first":
+        return channels[:1]
+    names = recipients(mode)
+    return [channel for channel in channels if channel.name in names]
+
+def _send_channel(name, report, session=None):
+    channels = [channel for channel in configured_channels() if channel.name == name]
+    if not channels:
+        print(f"{name} not configured. Skipping.")
         return False
+    return any(receipt.delivered for receipt in dispatch(report, channels, session=session))
 
-def send_wechat(subject, content):
+def send_pushplus(report, session=None):
+    return _send_channel("pushplus", report, session=session)
+
+def send_serverchan(report, session=None):
+    return _send_channel("serverchan", report, session=session)
+
+def send_wechat_test(report, session=None):
+    return _send_channel("wechat_test", report, session=session)
+
+def send_wxpusher(report, session=None):
+    return _send_channel("wxpusher", report, session=session)
+
+def _count(recipients):
+    return sum(len(recipient.members) if isinstance(recipient, Batch) else 1 for recipient in recipients)
+
+def send_all(report, session=None):
     """
-    Try sending with configured providers.
-    Priority: WxPusher > WeChat Test Account > PushPlus > ServerChan
+    Sends the report to the channels selected by PUSH_CHANNELS, all
+    recipients in parallel. Returns the list of DeliveryReceipt.
     """
-    # First try WxPusher (支持长文本)
-    if all([WXPUSHER_APP_TOKEN, WXPUSHER_USER_UID]):
-        return send_wxpusher(subject, content)
-    # Then try WeChat Test Account
-    elif all([WECHAT_APPID, WECHAT_APPSECRET, WECHAT_TEMPLATE_ID, WECHAT_USER_OPENID]):
-        return send_wechat_test(subject, content)
-    # Then try PushPlus
-    elif PUSHPLUS_TOKEN:
-        return send_pushplus(subject, content)
-    # Finally try ServerChan
-    elif SERVERCHAN_KEY:
-        return send_serverchan(subject, content)
-    else:
+    channels = select_channels()
+    if not channels:
         print("No Push notification service configured.")
-        return False
+        return []
+    print(f"Sending to {', '.join(f'{channel.name} ({_count(channel.recipients)})' for channel in channels)}")
+    return dispatch(report, channels, session=session)
+
+def send_wechat(report, session=None):
+    """
+    Sends with the configured providers (see send_all).
+    Returns True if at least one recipient received the report.
+    """
+    return any(receipt.delivered for receipt in send_all(report, session=session))
@@ -0,0 +1,394 @@
+# outbox.py
+import hashlib
+import json
+import os
+import random
+import sqlite3
+import sys
+import threading
+import time
+from config import (OUTBOX_DB_PATH, OUTBOX_MAX_ATTEMPTS, OUTBOX_RETRY_BASE, OUTBOX_RETRY_MAX, OUTBOX_MAX_AGE,
+                    OUTBOX_RUN_RETRY_WINDOW, PUSH_DEADLINE, PUSH_TIMEOUT)
+from dispatch import Batch, Channel, dispatch
+
+# 推送发件箱：报告先写入本地 SQLite，再由 drain() 发送，失败的按指数退避（带随机抖动）重试
+#   messages    每份报告每个渠道一条，保存 prepare 的结果（渲染好的正文），补发时不需要原始报告
+#   deliveries  每个接收人（或 WxPusher 批次）一条，idempotency_key 唯一：同一份报告重复入队不会重复发送
+# 状态: pending 待发 -> sending 发送中（租约到期前其他进程不会再取） -> sent 已发送 / dead 放弃（死信）
+#       / unknown 请求已发出但到截止时间仍没有结果（可能已送达），不自动重发，可用 python outbox.py retry 重发
+# 进程在发送中崩溃时，租约到期后会重新发送（至少一次）
+# 库中不保存密钥：PushPlus token、Server酱 SendKey 等接收人只保存引用（哈希），发送时从当前配置中找回，
+# 已不在配置中的接收人直接转为死信；WxPusher appToken 也在发送时才加入请求。数据库文件权限为 0600
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS messages (
+    id INTEGER PRIMARY KEY,
+    created_at REAL NOT NULL,
+    channel TEXT NOT NULL,
+    subject TEXT,
+    payload TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS deliveries (
+    id INTEGER PRIMARY KEY,
+    message_id INTEGER NOT NULL REFERENCES messages(id),
+    idempotency_key TEXT NOT NULL UNIQUE,
+    recipient TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at REAL NOT NULL,
+    last_error TEXT,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_deliveries_due ON deliveries(status, next_attempt_at);
+"""
+
+# 已发送记录保留多久（秒），之后清理
+SENT_RETENTION = 7 * 24 * 3600
+
+def recipient_ref(channel, recipient):
+    """Stable reference to a recipient that does not reveal it (tokens / SendKeys are secrets)."""
+    return hashlib.sha256(f"{channel}|{recipient}".encode("utf-8")).hexdigest()[:24]
+
+def _dump_recipient(channel, recipient):
+    if isinstance(recipient, Batch):
+        # WxPusher uid / topicId 不是密钥，原样保存，部分失败时只补发失败的成员
+        return json.dumps({"label": recipient.label, "members": recipient.members}, ensure_ascii=False)
+    return json.dumps({"ref": recipient_ref(channel, recipient)})
+
+def _load_recipient(text, refs):
+    """Batch, the configured recipient of a reference, or None if it is no longer configured."""
+    value = json.loads(text)
+    if "ref" in value:
+        return refs.get(value["ref"])
+    return Batch(value["label"], value["members"])
+
+def configured_refs():
+    """{reference: recipient} of every recipient in the current configuration."""
+    from notifier import configured_channels
+
+    return {recipient_ref(channel.name, recipient): recipient
+            for channel in configured_channels() for recipient in channel.recipients
+            if not isinstance(recipient, Batch)}
+
+def report_key(report):
+    """Identifies a report: the same period at the same minute is the same report."""
+    return f"{report.time_period}|{report.generated_at:%Y-%m-%d %H:%M}|{report.subject}"
+
+def backoff(attempts, base=OUTBOX_RETRY_BASE, cap=OUTBOX_RETRY_MAX):
+    """Delay before the next attempt: base * 2^(attempts-1), capped, with jitter in [50%, 100%]."""
+    delay = min(cap, base * 2 ** max(0, attempts - 1))
+    return delay * random.uniform(0.5, 1.0)
+
+class Outbox:
+    """Durable queue of report deliveries in SQLite."""
+    def __init__(self, path=OUTBOX_DB_PATH):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # 库中有推送正文和接收人，只允许本用户读写（-wal / -shm 文件由 SQLite 按数据库文件的权限创建）
+        os.close(os.open(path, os.O_WRONLY | os.O_CREAT, 0o600))
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(path + suffix):
+                os.chmod(path + suffix, 0o600)
+        self.conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self.conn.row_factory = sqlite3.Row
+        self.lock = threading.Lock()
+        with self.lock:
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute("PRAGMA synchronous=NORMAL")
+            self.conn.executescript(SCHEMA)
+            self.conn.commit()
+
+    def enqueue(self, report, channels, session=None):
+        """
+        Stores the report for every recipient of the given channels
+        (see notifier.select_channels). Deliveries already queued for
+        the same report are skipped. Returns the delivery ids.
+        """
+        now = time.time()
+        key = report_key(report)
+        ids = []
+        with self.lock:
+            for channel in channels:
+                payload = json.dumps(channel.prepare(report, session), ensure_ascii=False)
+                cursor = self.conn.execute(
+                    "INSERT INTO messages (created_at, channel, subject, payload) VALUES (?, ?, ?, ?)",
+                    (now, channel.name, report.subject, payload))
+                message_id = cursor.lastrowid
+                added = 0
+                for recipient in channel.recipients:
+                    recipient_text = _dump_recipient(channel.name, recipient)
+                    idempotency_key = hashlib.sha1(f"{key}|{channel.name}|{recipient_text}".encode("utf-8")).hexdigest()
+                    cursor = self.conn.execute(
+                        "INSERT OR IGNORE INTO deliveries (message_id, idempotency_key, recipient, next_attempt_at, updated_at) "
+                        "VALUES (?, ?, ?, ?, ?)", (message_id, idempotency_key, recipient_text, now, now))
+                    if cursor.rowcount:
+                        ids.append(cursor.lastrowid)
+                        added += 1
+                if not added:
+                    # 整份报告已入队过
+                    self.conn.execute("DELETE FROM messages WHERE id = ?", (message_id,))
+            self.conn.execute("DELETE FROM deliveries WHERE status IN ('sent', 'unknown') AND updated_at < ?", (now - SENT_RETENTION,))
+            self.conn.execute("DELETE FROM messages WHERE id NOT IN (SELECT message_id FROM deliveries)")
+            self.conn.commit()
+        return ids
+
+    def _claim(self, limit=None):
+        """
+        Marks due deliveries as sending (lease until the push deadline
+        has passed) and returns them. BEGIN IMMEDIATE makes the claim
+        atomic across processes.
+        """
+        now = time.time()
+        lease = now + PUSH_DEADLINE + PUSH_TIMEOUT
+        with self.lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                # 太旧的报告不再发送
+                self.conn.execute(
+                    "UPDATE deliveries SET status = 'dead', last_error = 'expired', updated_at = ? "
+                    "WHERE status IN ('pending', 'sending') AND message_id IN (SELECT id FROM messages WHERE created_at < ?)",
+                    (now, now - OUTBOX_MAX_AGE))
+                rows = self.conn.execute(
+                    "SELECT d.id, d.message_id, d.recipient, d.attempts, m.channel, m.payload "
+                    "FROM deliveries d JOIN messages m ON m.id = d.message_id "
+                    "WHERE d.status IN ('pending', 'sending') AND d.next_attempt_at <= ? "
+                    "ORDER BY d.message_id, d.id" + (f" LIMIT {int(limit)}" if limit else ""), (now,)).fetchall()
+                self.conn.executemany(
+                    "UPDATE deliveries SET status = 'sending', next_attempt_at = ?, updated_at = ? WHERE id = ?",
+                    [(lease, now, row["id"]) for row in rows])
+                self.conn.commit()
+            except Exception:
+                self.conn.rollback()
+                raise
+        return rows
+
+    def drain(self, session=None, deadline=None):
+        """
+        Sends every due delivery once (all channels in parallel, see
+        dispatch.py) and records the outcome. Returns the receipts.
+        """
+        from notifier import DELIVERERS
+
+        rows = self._claim()
+        if not rows:
+            return []
+        refs = configured_refs()
+        now = time.time()
+        updates = []
+        # 每条消息一个 Channel，prepare 直接返回保存的正文
+        groups = {}
+        for row in rows:
+            recipient = _load_recipient(row["recipient"], refs)
+            if recipient is None:
+                print(f"Dead letter: {row['channel']} recipient is no longer configured")
+                updates.append(("dead", row["attempts"], now, "recipient no longer configured", row["recipient"], row["id"]))
+                continue
+            groups.setdefault(row["message_id"], []).append((row, recipient))
+        channels = []
+        for message_rows in groups.values():
+            first = message_rows[0][0]
+            payload = json.loads(first["payload"])
+            channels.append(Channel(
+                first["channel"],
+                [recipient for _, recipient in message_rows],
+                lambda report, session, payload=payload: payload,
+                DELIVERERS[first["channel"]],
+            ))
+        receipts = dispatch(None, channels, session=session, deadline=deadline) if channels else []
+
+        # 回执与 rows 顺序一致：按消息分组、组内按接收人顺序
+        ordered_rows = [row for message_rows in groups.values() for row, _ in message_rows]
+        now = time.time()
+        for row, receipt in zip(ordered_rows, receipts):
+            attempts = row["attempts"] + 1
+            recipient = row["recipient"]
+            if receipt.result == "ok":
+                updates.append(("sent", attempts, now, None, recipient, row["id"]))
+                continue
+            if receipt.result == "unknown":
+                # 接收人可能已经收到，重发会收到两份
+                updates.append(("unknown", attempts, now, receipt.error, recipient, row["id"]))
+                continue
+            if receipt.result == "partial":
+                # 只补发失败的接收人
+                batch = _load_recipient(recipient, refs)
+                recipient = _dump_recipient(row["channel"], Batch(batch.label, receipt.failed_members))
+            if attempts >= OUTBOX_MAX_ATTEMPTS:
+                print(f"Dead letter: {receipt.channel} {receipt.recipient} after {attempts} attempts: {receipt.error}")
+                updates.append(("dead", attempts, now, receipt.error, recipient, row["id"]))
+            else:
+                updates.append(("pending", attempts, now + backoff(attempts), receipt.error, recipient, row["id"]))
+        with self.lock:
+            self.conn.executemany(
+                "UPDATE deliveries SET status = ?, attempts = ?, next_attempt_at = ?, last_error = ?, recipient = ?, "
+                "updated_at = ? WHERE id = ?", [update[:5] + (now,) + update[5:] for update in updates])
+            self.conn.commit()
+        return receipts
+
+    def statuses(self, ids):
+        """{status: count} of the given deliveries."""
+        if not ids:
+            return {}
+        with self.lock:
+            rows = self.conn.execute(
+                f"SELECT status, COUNT(*) FROM deliveries WHERE id IN ({','.join('?' * len(ids))}) GROUP BY status",
+                list(ids)).fetchall()
+        return {status: count for status, count in rows}
+
+    def next_due(self):
+        """Time of the earliest pending delivery, or None."""
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT MIN(next_attempt_at) FROM deliveries WHERE status IN ('pending', 'sending')").fetchone()
+        return row[0]
+
+    def counts(self):
+        with self.lock:
+            rows = self.conn.execute("SELECT status, COUNT(*) FROM deliveries GROUP BY status").fetchall()
+        return {status: count for status, count in rows}
+
+    def dead_letters(self, limit=50):
+        """Dead letters and deliveries with an unknown outcome, latest first."""
+        with self.lock:
+            return self.conn.execute(
+                "SELECT d.id, d.status, m.channel, m.subject, d.attempts, d.last_error, d.updated_at "
+                "FROM deliveries d JOIN messages m ON m.id = d.message_id WHERE d.status IN ('dead', 'unknown') "
+                "ORDER BY d.updated_at DESC LIMIT ?", (limit,)).fetchall()
+
+    def retry_dead(self):
+        """Moves dead letters and unknown deliveries back to pending; returns how many."""
+        with self.lock:
+            cursor = self.conn.execute(
+                "UPDATE deliveries SET status = 'pending', attempts = 0, next_attempt_at = ?, updated_at = ? "
+                "WHERE status IN ('dead', 'unknown')", (time.time(), time.time()))
+            # 过期的报告重新入队时从现在起算
+            self.conn.execute(
+                "UPDATE messages SET created_at = ? WHERE id IN (SELECT message_id FROM deliveries WHERE status = 'pending')",
+                (time.time(),))
+            self.conn.commit()
+        return cursor.rowcount
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+class OutboxWorker:
+    """
+    Background thread draining the outbox (daemon mode): sends whenever
+    a report is enqueued (wake()) or a retry becomes due, so the push
+    never blocks the next refresh.
+    """
+    def __init__(self, outbox, poll=60):
+        self.outbox = outbox
+        self.poll = poll
+        self.wake_event = threading.Event()
+        self.stop_event = threading.Event()
+        self.thread = threading.Thread(target=self._run, name="outbox", daemon=True)
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def wake(self):
+        self.wake_event.set()
+
+    def stop(self, timeout=None):
+        self.stop_event.set()
+        self.wake_event.set()
+        self.thread.join(timeout)
+
+    def _run(self):
+        while not self.stop_event.is_set():
+            self.wake_event.clear()
+            try:
+                self.outbox.drain()
+            except Exception as e:
+                print(f"Outbox Error: {e}")
+            next_due = self.outbox.next_due()
+            timeout = self.poll if next_due is None else min(self.poll, max(1.0, next_due - time.time()))
+            self.wake_event.wait(timeout)
+
+_outbox = None
+_worker = None
+_lock = threading.Lock()
+
+def get_outbox():
+    global _outbox
+    with _lock:
+        if _outbox is None:
+            _outbox = Outbox()
+    return _outbox
+
+def start_worker():
+    """Starts the background drain thread (once per process)."""
+    global _worker
+    outbox = get_outbox()
+    with _lock:
+        if _worker is None:
+            _worker = OutboxWorker(outbox).start()
+    return _worker
+
+def get_worker():
+    return _worker
+
+def send_report(report, session=None):
+    """
+    Queues the report for the channels selected by PUSH_CHANNELS. With
+    the background worker running (daemon mode) it only wakes it up;
+    otherwise the outbox is drained right away, including retries due
+    from earlier runs, and failed deliveries are retried until
+    OUTBOX_RUN_RETRY_WINDOW runs out. Returns False if nothing was sent
+    or queued.
+    """
+    from notifier import select_channels
+
+    channels = select_channels()
+    if not channels:
+        print("No Push notification service configured.")
+        return False
+    outbox = get_outbox()
+    ids = outbox.enqueue(report, channels, session=session)
+    if not ids:
+        print("Report already queued, not sending it again.")
+        return True
+    if _worker is not None:
+        print(f"Queued {len(ids)} deliveries.")
+        _worker.wake()
+        return True
+    # 单次运行：进程退出前在 OUTBOX_RUN_RETRY_WINDOW 秒内按退避时间继续重试
+    give_up_at = time.monotonic() + OUTBOX_RUN_RETRY_WINDOW
+    receipts = outbox.drain(session=session)
+    statuses = outbox.statuses(ids)
+    while statuses.get("pending"):
+        next_due = outbox.next_due()
+        delay = max(0.0, (next_due or 0.0) - time.time())
+        if next_due is None or delay >= give_up_at - time.monotonic():
+            break
+        print(f"Retrying {statuses['pending']} deliveries in {delay:.0f}s...")
+        time.sleep(delay)
+        receipts += outbox.drain(session=session, deadline=min(PUSH_DEADLINE, give_up_at - time.monotonic()))
+        statuses = outbox.statuses(ids)
+    if statuses.get("pending"):
+        print(f"{statuses['pending']} deliveries will be retried on the next run (see python outbox.py).")
+    if statuses.get("unknown"):
+        print(f"{statuses['unknown']} deliveries got no answer and may have arrived; not resending them (python outbox.py retry to resend).")
+    return bool(statuses.get("sent")) or any(receipt.delivered for receipt in receipts)
+
+if __name__ == "__main__":
+    # 用法: python outbox.py           各状态数量和最近的死信
+    #       python outbox.py drain     立即发送所有到期的推送
+    #       python outbox.py retry     把死信和结果未知的推送重新放回队列
+    outbox = get_outbox()
+    command = sys.argv[1] if len(sys.argv) > 1 else ""
+    if command == "drain":
+        outbox.drain()
+    elif command == "retry":
+        print(f"Requeued {outbox.retry_dead()} dead or unknown deliveries.")
+    elif command:
+        print("Usage: python outbox.py [drain|retry]")
+        sys.exit(1)
+    print(", ".join(f"{status}: {count}" for status, count in sorted(outbox.counts().items())) or "Outbox is empty.")
+    for row in outbox.dead_letters(10):
+        print(f"  {row['status']} #{row['id']} {row['channel']} {row['subject']} ({row['attempts']} attempts): {row['last_error']}")
@@ -0,0 +1,119 @@
+# platforms.py
+import asyncio
+import importlib
+from dataclasses import dataclass
+from config import PLATFORMS_ENABLE, PLATFORMS_DISABLE, REPORT_PLATFORMS, DAEMON_DEFAULT_INTERVAL
+
+# 平台注册表：新增或调整平台只需要改这里。列表顺序即报告中的显示顺序。
+#   fetcher   "模块:协程函数"，只有启用的平台才会导入
+#   interval  常驻模式下的刷新间隔（秒），可用 DAEMON_INTERVALS 覆盖
+#   limit     抓取结果最多保留的条数；markdown_items 为 Markdown 推送中显示的条数
+#   cost      抓取开销：light 单个 JSON 接口；medium 解析整页 HTML 或两个来源；heavy 多个来源/多次请求
+#   timeout   单次抓取的时间预算（秒），默认按 cost 取 COST_TIMEOUTS；超时的平台标记为超时，不影响其他平台
+#   enabled   默认开关，可用 PLATFORMS_ENABLE / PLATFORMS_DISABLE 覆盖
+
+COST_TIMEOUTS = {"light": 20, "medium": 30, "heavy": 45}
+
+@dataclass(frozen=True)
+class Platform:
+    name: str
+    fetcher: str
+    emoji: str = "🔥"
+    display_name: str = ""     # 报告中显示的名称，默认与 name 相同
+    interval: int = DAEMON_DEFAULT_INTERVAL
+    limit: int = 20
+    markdown_items: int = 8
+    cost: str = "light"
+    timeout: float = None
+    enabled: bool = True
+
+    @property
+    def label(self):
+        return self.display_name or self.name
+
+    @property
+    def timeout_budget(self):
+        return self.timeout or COST_TIMEOUTS[self.cost]
+
+    def load(self):
+        """Imports the fetcher module and returns the fetch coroutine function."""
+        module, _, function = self.fetcher.partition(":")
+        return getattr(importlib.import_module(module), function)
+
+    def task(self):
+        """(name, fetch) for engine.run_fetchers / daemon, with the timeout budget and item limit applied."""
+        fetcher = self.load()
+
+        async def fetch():
+            items = await asyncio.wait_for(fetcher(), self.timeout_budget)
+            return (items or [])[:self.limit]
+
+        return self.name, fetch
+
+PLATFORMS = [
+    Platform("Weibo", "scraper:afetch_weibo_hot", "📱", interval=300, markdown_items=15, cost="medium"),
+    Platform("Douyin", "scraper:afetch_douyin_hot", "🎵", interval=300, markdown_items=15),
+    Platform("Xiaohongshu", "scraper:afetch_xhs_hot", "📕", interval=900, cost="medium"),
+    # 暂时隐藏，以后完善
+    Platform("Twitter", "scraper:afetch_twitter_hot", "🐦", interval=600, limit=30, markdown_items=20, cost="heavy", enabled=False),
+    Platform("Baidu", "scraper:afetch_baidu_hot", "🔍", interval=300, cost="medium"),
+    Platform("Zhihu", "scraper:afetch_zhihu_hot", "❓", interval=600, cost="heavy"),
+    Platform("Bilibili", "scraper:afetch_bilibili_hot", "📺", interval=600),
+    Platform("Kuaishou", "scraper:afetch_kuaishou_hot", "⚡", interval=600, cost="medium"),
+    Platform("Xigua", "scraper:afetch_xigua_hot", "🍉", interval=900, cost="medium"),
+    # 暂时隐藏，以后完善
+    Platform("Linux.do", "scraper:afetch_linuxdo_hot", "🐧", interval=1800, enabled=False),
+    Platform("52pojie", "scraper:afetch_52pojie_hot", "🔓", interval=3600, limit=15, cost="medium", enabled=False),
+    Platform("YouTube", "scraper:afetch_youtube_hot", "🎬", interval=1800, limit=15, cost="heavy", enabled=False),
+    Platform("财经", "scraper:afetch_finance_news", "💰", interval=600, limit=15, cost="medium"),
+    Platform("Reddit", "scraper:afetch_reddit_hot", "👽", interval=1800, limit=15, enabled=False),
+    Platform("StackOverflow", "scraper:afetch_stackoverflow_hot", "💻", interval=3600, limit=15, enabled=False),
+    Platform("Xianyu", "scraper:afetch_xianyu_hot", "🛒", interval=3600, limit=15, cost="heavy"),
+    Platform("Xmfish", "scraper:afetch_xmfish_hot", "🐟", interval=3600, limit=15, cost="medium"),
+    Platform("Netease", "scraper:afetch_netease_hot", "📰", interval=1800, limit=15, cost="medium"),
+]
+
+BY_NAME = {platform.name: platform for platform in PLATFORMS}
+
+_warned = set()
+
+def _names(spec):
+    names = [name.strip() for name in spec.split(",") if name.strip()]
+    unknown = [name for name in names if name not in BY_NAME and name != "all" and name not in _warned]
+    if unknown:
+        _warned.update(unknown)
+        print(f"Unknown platforms ignored: {', '.join(unknown)}")
+    return names
+
+def enabled_platforms():
+    """Enabled platforms in report order (defaults above, PLATFORMS_ENABLE / PLATFORMS_DISABLE applied)."""
+    enable, disable = set(_names(PLATFORMS_ENABLE)), set(_names(PLATFORMS_DISABLE))
+    return [platform for platform in PLATFORMS
+            if platform.name not in disable and (platform.enabled or platform.name in enable)]
+
+def parse_report_platforms(spec):
+    """Parses "morning_7am=Weibo,Baidu;night_10pm=all" into {time_period: [names] or None (all)}."""
+    sets = {}
+    for part in spec.split(";"):
+        if "=" not in part:
+            continue
+        period, _, names = part.partition("=")
+        names = _names(names)
+        sets[period.strip()] = None if "all" in names or not names else names
+    return sets
+
+def for_report(time_period):
+    """Enabled platforms that go into the report of a time period (REPORT_PLATFORMS)."""
+    platforms = enabled_platforms()
+    names = parse_report_platforms(REPORT_PLATFORMS).get(time_period)
+    if names is None:
+        return platforms
+    return [platform for platform in platforms if platform.name in names]
+
+def get(name):
+    """Registry entry of a platform name, or None."""
+    return BY_NAME.get(name)
+
+def emoji(name, default="🔥"):
+    platform = BY_NAME.get(name)
+    return platform.emoji if platform else default
@@ -0,0 +1,208 @@
+# render.py
+import io
+from config import REPORT_ITEM_LIMIT
+import platforms
+
+# 布局片段在模块加载时生成一次；渲染时只把片段和标题、链接、排名、热度依次追加到列表，
+# 最后一次 join（或按平台分块写入文件对象），整体耗时与条目数成线性关系
+
+_HEADER = """
+<div style="font-family: -apple-system, BlinkMacSystemFont, 'Helvetica Neue', sans-serif; line-height: 1.6; color: #333; max-width: 680px; margin: 0 auto;">
+    <div style="text-align: center; padding: 20px 0; border-bottom: 2px solid #e6e6e6;">
+        <h1 style="margin: 0; font-size: 24px; color: #2c3e50;">{period_text}</h1>
+        <p style="margin: 5px 0 0; font-size: 14px; color: #7f8c8d;">{time_str}</p>
+    </div>
+""".format
+
+_SECTION_OPEN = """
+    <div style="margin: 25px 0; padding: 15px; background: #f8f9fa; border-radius: 8px; border-left: 4px solid #3498db;">
+        <h2 style="margin: 0 0 12px 0; font-size: 18px; color: #2c3e50;">
+            {emoji} {name}
+        </h2>
+""".format
+
+_SECTION_EMPTY = """
+        <p style="margin: 0; color: #95a5a6; font-size: 14px;">暂无数据</p>
+"""
+
+_LIST_OPEN = """
+        <ul style="margin: 0; padding: 0; list-style: none;">
+"""
+
+# 每条的静态片段，按顺序与排名、链接、标题、热度交替写出
+_ITEM_OPEN = """
+            <li style="margin: 8px 0; padding: 0;">
+                <span style="display: inline-block; width: 20px; height: 20px; line-height: 20px; text-align: center; background: %s; color: white; border-radius: 3px; font-size: 12px; margin-right: 8px;">"""
+# Rank styling: 前3名红色，4-6名蓝色，其余灰色
+_ITEM_OPEN_TOP3 = _ITEM_OPEN % "#e74c3c"
+_ITEM_OPEN_TOP6 = _ITEM_OPEN % "#3498db"
+_ITEM_OPEN_REST = _ITEM_OPEN % "#7f8c8d"
+_ITEM_LINK = '</span>\n                <a href="'
+_ITEM_TITLE = '" style="color: #2c3e50; text-decoration: none; font-size: 15px;">'
+_ITEM_HOT = """</a>
+                """
+_HOT_OPEN = '<span style="font-size: 12px; color: #e74c3c; margin-left: 8px;">'
+_HOT_CLOSE = '</span>'
+# 与上一次运行相比的变化标记（🆕 / ↑3 / ↓2）
+_CHANGE_OPEN = '<span style="font-size: 12px; color: #27ae60; margin-left: 6px;">'
+# 跨平台同一话题（见 cluster.py）：也在 📱Weibo 🔍Baidu
+_ALSO_ON_OPEN = '<span style="font-size: 12px; color: #8e44ad; margin-left: 6px;">也在：'
+_ITEM_CLOSE = """
+            </li>
+"""
+
+_LIST_CLOSE = """
+        </ul>
+"""
+
+_DROPPED = """
+        <p style="margin: 8px 0 0; color: #95a5a6; font-size: 13px;">已下榜：{}</p>
+""".format
+
+# 下榜条目最多列出的条数
+DROPPED_LIMIT = 5
+
+_SECTION_CLOSE = """
+    </div>
+"""
+
+_FOOTER = """
+    <div style="text-align: center; padding: 20px 0; margin-top: 20px; border-top: 1px solid #e6e6e6; color: #95a5a6; font-size: 12px;">
+        <p style="margin: 0;">每日早晚推送 • 热点信息仅供参考</p>
+        <p style="margin: 5px 0 0;">数据来源：各平台公开榜单</p>
+    </div>
+</div>
+"""
+
+def also_on_label(item):
+    """Other platforms carrying the same topic, e.g. "📱Weibo 🔍Baidu"."""
+    return " ".join(platforms.emoji(name, "📌") + name for name in item.also_on)
+
+def _section_html(section, item_limit, parts):
+    """Appends one platform block to parts, without building per-item strings."""
+    append = parts.append
+    append(_SECTION_OPEN(emoji=section.emoji, name=section.label))
+
+    if not section.items:
+        if not section.dropped:
+            append(_SECTION_EMPTY)
+    else:
+        append(_LIST_OPEN)
+        for item in section.items[:item_limit]:
+            rank = item.rank
+            append(_ITEM_OPEN_TOP3 if rank <= 3 else _ITEM_OPEN_TOP6 if rank <= 6 else _ITEM_OPEN_REST)
+            append(str(rank))
+            append(_ITEM_LINK)
+            append(item.url)
+            append(_ITEM_TITLE)
+            append(item.short_title())
+            append(_ITEM_HOT)
+            if item.hot:
+                append(_HOT_OPEN)
+                append(item.hot)
+                append(_HOT_CLOSE)
+            label = item.change_label
+            if label:
+                append(_CHANGE_OPEN)
+                append(label)
+                append(_HOT_CLOSE)
+            if item.also_on:
+                append(_ALSO_ON_OPEN)
+                append(also_on_label(item))
+                append(_HOT_CLOSE)
+            append(_ITEM_CLOSE)
+        append(_LIST_CLOSE)
+
+    if section.dropped:
+        append(_DROPPED("、".join(item.short_title() for item in section.dropped[:DROPPED_LIMIT])))
+
+    append(_SECTION_CLOSE)
+
+def iter_html(report, item_limit=None):
+    """
+    Yields the HTML report (optimized for WeChat Official Account) one
+    platform block at a time, for streaming with write_report().
+    Each platform shows the top item_limit items (REPORT_ITEM_LIMIT by default).
+    """
+    item_limit = item_limit or REPORT_ITEM_LIMIT
+    yield _HEADER(period_text=report.period_text, time_str=report.time_str)
+    for section in report.sections:
+        parts = []
+        _section_html(section, item_limit, parts)
+        yield "".join(parts)
+    yield _FOOTER
+
+def render_html(report, item_limit=None):
+    """Returns the whole HTML report as one string."""
+    item_limit = item_limit or REPORT_ITEM_LIMIT
+    parts = [_HEADER(period_text=report.period_text, time_str=report.time_str)]
+    for section in report.sections:
+        _section_html(section, item_limit, parts)
+    parts.append(_FOOTER)
+    return "".join(parts)
+
+def markdown_limit(platform):
+    # 各平台显示的条数见 platforms.py（markdown_items），未登记的平台显示8条
+    entry = platforms.get(platform)
+    return entry.markdown_items if entry else 8
+
+def iter_markdown(report, max_platforms=12, limit=None):
+    """
+    Yields the Markdown report (WxPusher / ServerChan) line by line.
+    limit overrides the per-platform item counts from markdown_limit().
+    """
+    yield f"# {report.subject}\n\n"
+    yield f"**时间**: {report.generated_at.strftime('%Y-%m-%d %H:%M')}\n\n"
+
+    for section in report.sections[:max_platforms]:  # 最多12个平台
+        items = section.items[:limit or markdown_limit(section.name)]
+        valid_items = [item for item in items if not item.placeholder]
+        if not valid_items and not section.dropped:
+            continue
+
+        yield f"## {section.emoji} {section.label}\n"
+        for item in valid_items:
+            line = f"- {item.rank}. {item.short_title()}"
+            if item.hot:
+                line += f" ({item.hot})"
+            label = item.change_label
+            if label:
+                line += f" {label}"
+            if item.also_on:
+                line += f" *也在：{also_on_label(item)}*"
+            yield line + "\n"
+
+        # 如果实际条数少于显示条数，添加统计
+        if len(valid_items) < len(items):
+            yield f"*（共 {len(valid_items)} 条有效数据）*\n"
+        if section.dropped:
+            yield f"*已下榜：{'、'.join(item.short_title() for item in section.dropped[:DROPPED_LIMIT])}*\n"
+        yield "\n"
+
+def render_markdown(report, max_platforms=12, limit=None):
+    """Returns the whole Markdown report as one string."""
+    return "".join(iter_markdown(report, max_platforms, limit))
+
+def write_report(chunks, out, buffer_size=64 * 1024):
+    """
+    Streams rendered chunks to a file-like object (file, sys.stdout,
+    socket.makefile('w')), batching small chunks into writes of about
+    buffer_size characters. Returns the number of characters written.
+    e.g. write_report(iter_html(report), f)
+    """
+    buffer = io.StringIO()
+    written = 0
+    for chunk in chunks:
+        buffer.write(chunk)
+        if buffer.tell() >= buffer_size:
+            data = buffer.getvalue()
+            out.write(data)
+            written += len(data)
+            buffer.seek(0)
+            buffer.truncate()
+    data = buffer.getvalue()
+    if data:
+        out.write(data)
+        written += len(data)
+    out.flush()
+    return written
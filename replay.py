@@ -0,0 +1,264 @@
+# replay.py
+import argparse
+import atexit
+import hashlib
+import json
+import os
+import sys
+import threading
+from urllib.parse import urlencode
+from config import REPLAY_MODE, REPLAY_DIR
+from metrics import current_platform
+
+# 录制 / 回放抓取请求：
+#   record  每个 GET 的真实响应（状态码、Content-Type、编码、正文）按平台保存到 REPLAY_DIR
+#   replay  http_client.get() 把请求改发到本地替身服务器，由它按原始 URL 返回录制的响应，
+#           aiohttp 连接池、解析和回退逻辑都照常运行；没有录制的 URL 返回 404，与断网时一样走回退
+# fixtures 目录结构: index.json（URL -> 元数据）、<平台>/<key>.body、expected.json（录制时各平台的抓取结果）
+
+MODE = REPLAY_MODE if REPLAY_MODE in ("record", "replay") else None
+
+class FixtureStore:
+    """Recorded responses on disk, keyed by the full request URL."""
+    def __init__(self, directory=REPLAY_DIR):
+        self.directory = directory
+        self.index_path = os.path.join(directory, "index.json")
+        self.expected_path = os.path.join(directory, "expected.json")
+        self.lock = threading.Lock()
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                self.index = json.load(f)
+        except (OSError, ValueError):
+            self.index = {}
+
+    @staticmethod
+    def key_for(url, params=None):
+        full_url = f"{url}?{urlencode(params)}" if params else url
+        return hashlib.sha1(full_url.encode("utf-8")).hexdigest()[:20], full_url
+
+    def save(self, url, params, status, content_type, charset, content):
+        key, full_url = self.key_for(url, params)
+        platform = current_platform() or "other"
+        relative = os.path.join(_safe_name(platform), key + ".body")
+        path = os.path.join(self.directory, relative)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(content)
+        with self.lock:
+            self.index[key] = {
+                "url": full_url,
+                "platform": platform,
+                "status": status,
+                "content_type": content_type,
+                "charset": charset,
+                "file": relative,
+                "bytes": len(content),
+            }
+
+    def load(self, key):
+        """(metadata, body) of a recorded response, or (None, None)."""
+        entry = self.index.get(key)
+        if entry is None:
+            return None, None
+        try:
+            with open(os.path.join(self.directory, entry["file"]), "rb") as f:
+                return entry, f.read()
+        except OSError:
+            return None, None
+
+    def save_index(self):
+        os.makedirs(self.directory, exist_ok=True)
+        with self.lock:
+            _write_json(self.index_path, self.index)
+
+    def bytes_by_platform(self):
+        totals = {}
+        for entry in self.index.values():
+            totals[entry["platform"]] = totals.get(entry["platform"], 0) + entry["bytes"]
+        return totals
+
+    def save_expected(self, expected):
+        _write_json(self.expected_path, expected)
+
+    def load_expected(self):
+        try:
+            with open(self.expected_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+def _safe_name(name):
+    return "".join(char if char.isalnum() or char in "-_." else "_" for char in name)
+
+def _write_json(path, data):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=1)
+    os.replace(tmp_path, path)
+
+class ReplayServer:
+    """
+    Local stand-in for every upstream site: GET /<key> answers with the
+    recorded status, Content-Type and body. HTTP/1.1 keep-alive, so the
+    client's connection pool behaves as it does against real hosts.
+    """
+    def __init__(self, store, host="127.0.0.1", port=0):
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                entry, body = store.load(self.path.lstrip("/").split("?")[0])
+                if entry is None:
+                    body = b"not recorded"
+                    self.send_response(404)
+                    self.send_header("Content-Type", "text/plain")
+                else:
+                    self.send_response(entry["status"])
+                    content_type = entry.get("content_type") or "application/octet-stream"
+                    if entry.get("charset") and "charset" not in content_type:
+                        content_type += f"; charset={entry['charset']}"
+                    self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.store = store
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.server.daemon_threads = True
+        self.base_url = f"http://{host}:{self.server.server_address[1]}"
+        self.thread = threading.Thread(target=self.server.serve_forever, name="replay-server", daemon=True)
+        self.thread.start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+_store = None
+_server = None
+_lock = threading.Lock()
+
+def get_store():
+    global _store
+    with _lock:
+        if _store is None:
+            _store = FixtureStore()
+    return _store
+
+def start(mode, directory=None):
+    """Switches recording or replay on for this process (also used by bench_replay.py)."""
+    global MODE, _store, _server
+    with _lock:
+        MODE = mode
+        if directory:
+            _store = FixtureStore(directory)
+    if mode == "replay":
+        _ensure_server()
+
+def _save_recording():
+    if MODE == "record" and _store is not None and _store.index:
+        _store.save_index()
+
+# REPLAY_MODE=record python main.py 这类直接录制的运行，在退出时写入索引
+atexit.register(_save_recording)
+
+def _ensure_server():
+    global _server
+    store = get_store()
+    with _lock:
+        if _server is None:
+            _server = ReplayServer(store)
+    return _server
+
+def route(url, params=None):
+    """URL on the stand-in server that serves the recording of url + params."""
+    key, _ = FixtureStore.key_for(url, params)
+    return f"{_ensure_server().base_url}/{key}"
+
+def record(url, params, status, headers, content, charset):
+    content_type = (headers.get("Content-Type") or "").split(";")[0].strip()
+    get_store().save(url, params, status, content_type, charset, content)
+
+def _run_fetchers():
+    from main import fetch_all
+    from metrics import METRICS
+    from platforms import enabled_platforms
+    data, status = fetch_all(enabled_platforms())
+    tiers = {platform: summary["tier"] for platform, summary in METRICS.summary().get("platforms", {}).items()}
+    return data, status, tiers
+
+def record_all(directory):
+    """Runs every enabled fetcher against the live sites and saves the responses."""
+    start("record", directory)
+    data, status, tiers = _run_fetchers()
+    store = get_store()
+    store.save_index()
+    store.save_expected({
+        platform: {"status": status.get(platform), "tier": tiers.get(platform), "titles": [item.get("title") for item in items]}
+        for platform, items in data.items()
+    })
+    print(f"Recorded {len(store.index)} responses to {directory}")
+
+def check_all(directory):
+    """
+    Replays the fixtures and compares each fetcher's output with what it
+    returned when recorded. Returns the list of platforms that changed.
+    """
+    store = FixtureStore(directory)
+    expected = store.load_expected()
+    if not expected:
+        print(f"No fixtures in {directory}. Record them first: python replay.py record")
+        return None
+    start("replay", directory)
+    data, status, tiers = _run_fetchers()
+
+    changed = []
+    for platform, want in expected.items():
+        if platform not in data:
+            continue
+        titles = [item.get("title") for item in data[platform]]
+        problems = []
+        if tiers.get(platform) != want["tier"]:
+            problems.append(f"answered by {tiers.get(platform)} instead of {want['tier']}")
+        # 模拟数据带随机热度和时间，只比较回退层级
+        if want["tier"] != "simulated" and titles != want["titles"]:
+            missing = len([title for title in want["titles"] if title not in titles])
+            problems.append(f"{len(titles)} items ({len(want['titles'])} recorded, {missing} missing)")
+        if problems:
+            changed.append(platform)
+            print(f"  ✗ {platform}: {'; '.join(problems)}")
+        else:
+            print(f"  ✓ {platform}: {len(titles)} items, {tiers.get(platform)}")
+    return changed
+
+def main():
+    parser = argparse.ArgumentParser(description="Record fetcher responses as fixtures, replay them, or check parsers against them.")
+    parser.add_argument("command", choices=["record", "check", "serve"])
+    parser.add_argument("--dir", default=REPLAY_DIR)
+    parser.add_argument("--port", type=int, default=8710)
+    args = parser.parse_args()
+
+    if args.command == "record":
+        record_all(args.dir)
+    elif args.command == "check":
+        changed = check_all(args.dir)
+        if changed is None or changed:
+            sys.exit(1)
+        print("All parsers match the recorded fixtures.")
+    else:
+        # 前台运行替身服务器，方便手动查看录制的响应: GET /<key>，key 见 index.json
+        server = ReplayServer(FixtureStore(args.dir), port=args.port)
+        print(f"Serving {args.dir} at {server.base_url}")
+        try:
+            server.thread.join()
+        except KeyboardInterrupt:
+            server.close()
+
+if __name__ == "__main__":
+    # 通过 import 调用，让 http_client 与命令行看到同一个模块的 MODE（而不是 __main__ 的副本）
+    import replay
+    replay.main()
@@ -0,0 +1,144 @@
+# report.py
+import datetime
+from dataclasses import dataclass, field
+from hotvalue import normalize_batch
+from keywords import get_matcher
+import platforms
+
+PERIOD_TEXTS = {
+    "morning_7am": "⏰ 07:00·晨间热点回顾",
+    "noon_12pm": "🕛 12:00·午间热点速递",
+    "evening_5pm": "🌇 17:00·傍晚热点更新",
+    "night_10pm": "🌙 22:00·全天热点盘点"
+}
+
+@dataclass
+class ReportItem:
+    rank: int
+    title: str
+    url: str = ""
+    hot: str = ""
+    placeholder: bool = False
+    # hot 解析后的数值和单位（见 hotvalue.py），如 "1.2万播放" -> 12000.0, "plays"
+    hot_value: float = None
+    hot_unit: str = None
+    # 与上一次运行相比的变化（见 diff.py）：new / rising / falling / same / dropped，未比较时为 None
+    change: str = None
+    prev_rank: int = None
+    # 同一话题也出现在其他平台时，这些平台的名称（见 cluster.py）
+    also_on: list = field(default_factory=list)
+
+    def short_title(self, max_len=30):
+        """Title truncated for narrow WeChat layouts."""
+        if len(self.title) > max_len:
+            return self.title[:max_len - 3] + "..."
+        return self.title
+
+    @property
+    def change_label(self):
+        """Short marker for the change since the last run, e.g. 🆕 / ↑3 / ↓2."""
+        if self.change == "new":
+            return "🆕"
+        if self.change == "rising":
+            return f"↑{self.prev_rank - self.rank}"
+        if self.change == "falling":
+            return f"↓{self.rank - self.prev_rank}"
+        return ""
+
+@dataclass
+class PlatformSection:
+    name: str
+    emoji: str
+    items: list = field(default_factory=list)
+    status: str = "ok"
+    # 上一次在榜、本次已下榜的条目（rank 为上一次的排名）
+    dropped: list = field(default_factory=list)
+    # 报告中显示的名称（platforms.py 中的 display_name），为空时显示 name
+    display_name: str = ""
+
+    @property
+    def label(self):
+        return self.display_name or self.name
+
+    @property
+    def valid_items(self):
+        """Items with real data, without error/config placeholders."""
+        return [item for item in self.items if not item.placeholder]
+
+@dataclass
+class Report:
+    time_period: str
+    period_text: str
+    subject: str
+    generated_at: datetime.datetime
+    sections: list = field(default_factory=list)
+
+    @property
+    def time_str(self):
+        return self.generated_at.strftime("%Y年%m月%d日 %H:%M")
+
+    @property
+    def platforms_with_data(self):
+        return [section for section in self.sections if section.valid_items]
+
+    def top_by_hot(self, limit=10, unit=None, min_value=None):
+        """
+        Ranks real items across all platforms by their numeric hot value.
+        unit restricts to one kind (e.g. "views"); min_value works as an
+        alert threshold.
+        """
+        items = [
+            (section.name, item)
+            for section in self.sections for item in section.valid_items
+            if item.hot_value is not None and item.hot_unit not in ("age", "label")
+            and (unit is None or item.hot_unit == unit)
+            and (min_value is None or item.hot_value >= min_value)
+        ]
+        items.sort(key=lambda pair: pair[1].hot_value, reverse=True)
+        return items[:limit]
+
+def is_placeholder(title, hot):
+    # 抓取失败时的占位条目包含 "placeholder" 分类的关键词（见 keywords.py）
+    return get_matcher("placeholder").matches(f"{title}{hot}")
+
+def build_section(platform, items, status="ok"):
+    """Converts a fetcher's list of {"title", "url", "hot"} dicts into a PlatformSection."""
+    section_items = []
+    for i, item in enumerate(items):
+        title = (item.get('title') or 'N/A').strip()
+        hot = str(item.get('hot') or '').strip()
+        section_items.append(ReportItem(
+            rank=i + 1,
+            title=title,
+            url=item.get('url') or '#',
+            hot=hot,
+            placeholder=is_placeholder(title, hot)
+        ))
+    entry = platforms.get(platform)
+    return PlatformSection(platform, entry.emoji if entry else "🔥", section_items, status,
+                           display_name=entry.display_name if entry else "")
+
+def build_report(data_dict, time_period, period_cn, status=None, now=None):
+    """
+    Builds the report passed to every notifier.
+    data_dict: platform -> items, in display order (see engine.run_fetchers).
+    now: Beijing time; defaults to the current time.
+    """
+    if now is None:
+        now = datetime.datetime.utcnow() + datetime.timedelta(hours=8)
+    status = status or {}
+    subject = f"{period_cn} | {now.strftime('%m月%d日')}"
+    sections = [build_section(platform, items, status.get(platform, "ok")) for platform, items in data_dict.items()]
+
+    # 所有平台的热度字符串一次性解析
+    all_items = [item for section in sections for item in section.items]
+    for item, hot in zip(all_items, normalize_batch([item.hot for item in all_items])):
+        item.hot_value = hot.value
+        item.hot_unit = hot.unit
+    return Report(
+        time_period=time_period,
+        period_text=PERIOD_TEXTS.get(time_period, "📊 热点速递"),
+        subject=subject,
+        generated_at=now,
+        sections=sections
+    )
@@ -0,0 +1,128 @@
+# subscribers.py
+import json
+import os
+import sys
+import threading
+from config import SUBSCRIBERS_FILE
+
+# 订阅者名单：每个渠道一个接收人列表，与环境变量中配置的接收人合并后推送（见 notifier.configured_channels）
+#   wxpusher         WxPusher uid（UID_xxx）
+#   wxpusher_topics  WxPusher 主题 id（整数），订阅了该主题的用户都会收到
+#   wechat_test      微信测试号 openid
+#   pushplus         PushPlus token
+#   serverchan       Server酱 SendKey
+# 文件格式: {"wxpusher": ["UID_a", "UID_b"], "wxpusher_topics": [123]}；包含 token，不要提交到仓库（默认放在 data/ 下）
+
+CHANNELS = ("wxpusher", "wxpusher_topics", "wechat_test", "pushplus", "serverchan")
+
+class SubscriberRegistry:
+    """Recipients per channel, kept in a JSON file."""
+    def __init__(self, path=SUBSCRIBERS_FILE):
+        self.path = path
+        self.lock = threading.Lock()
+        self.subscribers = self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            print(f"Subscribers file {self.path} ignored: {e}")
+            return {}
+        if not isinstance(data, dict):
+            print(f"Subscribers file {self.path} ignored: expected {{channel: [recipients]}}")
+            return {}
+        unknown = [channel for channel in data if channel not in CHANNELS]
+        if unknown:
+            print(f"Unknown channels in {self.path} ignored: {', '.join(unknown)}")
+        return {channel: _normalize(channel, data[channel]) for channel in CHANNELS if isinstance(data.get(channel), list)}
+
+    def recipients(self, channel):
+        with self.lock:
+            return list(self.subscribers.get(channel, []))
+
+    def add(self, channel, recipients):
+        """Adds recipients (duplicates are skipped); returns how many were new."""
+        with self.lock:
+            current = self.subscribers.setdefault(channel, [])
+            known = set(current)
+            new = [recipient for recipient in _normalize(channel, recipients) if recipient not in known]
+            current.extend(new)
+            return len(new)
+
+    def remove(self, channel, recipients):
+        """Removes recipients; returns how many were removed."""
+        with self.lock:
+            current = self.subscribers.get(channel, [])
+            removed = set(_normalize(channel, recipients))
+            self.subscribers[channel] = [recipient for recipient in current if recipient not in removed]
+            return len(current) - len(self.subscribers[channel])
+
+    def save(self):
+        with self.lock:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            tmp_path = self.path + ".tmp"
+            fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump({channel: items for channel, items in self.subscribers.items() if items}, f, ensure_ascii=False, indent=1)
+            os.replace(tmp_path, self.path)
+
+def _normalize(channel, recipients):
+    """Strips and dedupes recipients, keeping order; topic ids become ints."""
+    seen = set()
+    result = []
+    for recipient in recipients:
+        if channel == "wxpusher_topics":
+            try:
+                recipient = int(recipient)
+            except (TypeError, ValueError):
+                print(f"Invalid WxPusher topic id ignored: {recipient}")
+                continue
+        else:
+            recipient = str(recipient).strip()
+            if not recipient:
+                continue
+        if recipient not in seen:
+            seen.add(recipient)
+            result.append(recipient)
+    return result
+
+def merge(channel, *lists):
+    """Recipients from several sources (env config, registry) without duplicates."""
+    return _normalize(channel, [recipient for recipients in lists for recipient in recipients])
+
+_registry = None
+_registry_lock = threading.Lock()
+
+def get_registry():
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = SubscriberRegistry()
+    return _registry
+
+if __name__ == "__main__":
+    # 用法: python subscribers.py                        各渠道订阅人数
+    #       python subscribers.py add <渠道> <接收人>...    如 add wxpusher UID_xxx UID_yyy
+    #       python subscribers.py remove <渠道> <接收人>...
+    registry = get_registry()
+    if len(sys.argv) >= 4 and sys.argv[1] in ("add", "remove"):
+        command, channel, recipients = sys.argv[1], sys.argv[2], sys.argv[3:]
+        if channel not in CHANNELS:
+            print(f"Unknown channel {channel}, expected one of: {', '.join(CHANNELS)}")
+            sys.exit(1)
+        if command == "add":
+            print(f"Added {registry.add(channel, recipients)} to {channel}")
+        else:
+            print(f"Removed {registry.remove(channel, recipients)} from {channel}")
+        registry.save()
+    elif len(sys.argv) == 1:
+        for channel in CHANNELS:
+            print(f"{channel:<16} {len(registry.recipients(channel))}")
+    else:
+        print("Usage: python subscribers.py [add|remove <channel> <recipient>...]")
+        sys.exit(1)
@@ -0,0 +1,28 @@
+# conftest.py
+import os
+import sys
+import pytest
+
+# 模块都在仓库根目录（没有包），测试直接按模块名导入
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+# 录制格式的响应（index.json + <平台>/<key>.body + expected.json），见 replay.py
+REPLAY_FIXTURES = os.path.join(FIXTURES, "replay")
+
+@pytest.fixture
+def isolated(monkeypatch):
+    # replay.start() 修改模块级状态（模式、录制目录、替身服务器），测试结束后恢复
+    import replay
+    for name in ("MODE", "_store", "_server"):
+        monkeypatch.setattr(replay, name, None)
+    yield
+    if replay._server is not None:
+        replay._server.close()
+
+@pytest.fixture
+def replaying(isolated):
+    import replay
+    replay.start("replay", REPLAY_FIXTURES)
@@ -0,0 +1,91 @@
+# test_benchmarks.py
+import contextlib
+import io
+import json
+import tracemalloc
+import pytest
+from conftest import REPLAY_FIXTURES
+
+# 性能基准（需要 pytest-benchmark），全部使用录制的响应，不访问网络：
+#   python -m pytest tests/test_benchmarks.py --benchmark-only
+# 没有安装 pytest-benchmark 时整个文件跳过
+pytest.importorskip("pytest_benchmark")
+
+import http_client
+import replay
+import scraper
+from hotvalue import format_count, normalize_batch
+from jsontools import extract_embedded_subtrees
+
+# 整轮抓取的内存峰值上限（tracemalloc 统计，MB）
+PEAK_MEMORY_BUDGET_MB = 64
+
+def quiet(fn):
+    # 抓取函数的 print 输出会干扰计时
+    def run(*args):
+        with contextlib.redirect_stdout(io.StringIO()):
+            return fn(*args)
+    return run
+
+def enabled_tasks():
+    from platforms import enabled_platforms
+    return [platform.task() for platform in enabled_platforms()]
+
+@quiet
+def end_to_end(tasks):
+    from engine import run_fetchers
+    from render import render_html
+    from report import build_report
+    data, status = run_fetchers(tasks)
+    report = build_report(data, "noon_12pm", "午间热点", status=status)
+    return data, render_html(report)
+
+def test_end_to_end_run(benchmark, replaying):
+    tasks = enabled_tasks()
+    end_to_end(tasks)  # 预热：启动替身服务器、建立会话、导入解析库
+    data, html = benchmark.pedantic(end_to_end, args=(tasks,), rounds=5, iterations=1)
+    assert data["Bilibili"] and data["Weibo"]
+    assert "高考作文题目公布" in html
+
+def test_end_to_end_peak_memory(benchmark, replaying):
+    tasks = enabled_tasks()
+    end_to_end(tasks)
+
+    def measured():
+        tracemalloc.start()
+        try:
+            end_to_end(tasks)
+            return tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+    peak = benchmark.pedantic(measured, rounds=1, iterations=1)
+    benchmark.extra_info["peak_mb"] = round(peak / 1024 / 1024, 2)
+    assert peak < PEAK_MEMORY_BUDGET_MB * 1024 * 1024
+
+@pytest.mark.parametrize("platform, fetcher", [
+    ("Bilibili", scraper.afetch_bilibili_hot),
+    ("Weibo", scraper.afetch_weibo_hot),
+])
+def test_parser_throughput(benchmark, replaying, platform, fetcher):
+    # 单个平台：从替身服务器取回录制的响应并解析
+    recorded = replay.get_store().bytes_by_platform()[platform]
+    items = benchmark.pedantic(quiet(lambda: http_client.run_sync(fetcher())), rounds=20, warmup_rounds=1)
+    assert items
+    benchmark.extra_info["bytes"] = recorded
+    benchmark.extra_info["items"] = len(items)
+
+def test_embedded_json_throughput(benchmark):
+    # 大页面中只解码 title 子树
+    state = {"feeds": [{"title": f"标题{i}", "body": "x" * 200, "meta": {"tags": ["a", "b"], "n": i}} for i in range(1000)]}
+    page = ("<html><script>window.__INITIAL_STATE__ = " + json.dumps(state, ensure_ascii=False) + ";</script></html>").encode()
+    titles = benchmark.pedantic(extract_embedded_subtrees, args=(page, "window.__INITIAL_STATE__", "title"), rounds=5)
+    assert len(titles) == 1000
+    benchmark.extra_info["bytes"] = len(page)
+
+def test_hot_value_batch_throughput(benchmark):
+    values = [format_count(i * 137, suffix, style)
+              for i in range(4000) for suffix, style in (("播放", "cn"), (" views", "en"), ("回答", "k"), ("", "mixed"))]
+    values += ["热门", "¥3744 已售253件", "113分钟前"] * 1000
+    parsed = benchmark.pedantic(normalize_batch, args=(values,), rounds=10)
+    assert len(parsed) == len(values)
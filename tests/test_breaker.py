@@ -0,0 +1,99 @@
+# test_breaker.py
+import pytest
+import breaker
+from breaker import CLOSED, HALF_OPEN, OPEN, BreakerRegistry, CircuitOpenError, endpoint_for, is_failure
+
+URL = "https://s.2.taobao.com/list/list.htm?q=1"
+
+class Clock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def __call__(self):
+        return self.now
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(breaker.time, "time", clock)
+    return clock
+
+@pytest.fixture
+def registry(tmp_path, clock):
+    return BreakerRegistry(path=str(tmp_path / "breakers.json"), threshold=3, cooldown=100, max_cooldown=1000, window=1800)
+
+def fail(registry, url=URL):
+    registry.record_failure(registry.before_request(url))
+
+def test_endpoint_ignores_query():
+    assert endpoint_for(URL) == endpoint_for("https://s.2.taobao.com/list/list.htm?q=2") == "s.2.taobao.com/list/list.htm"
+
+def test_is_failure():
+    assert is_failure(503, 10) and is_failure(429, 10) and is_failure(200, 0)
+    assert not is_failure(200, 10) and not is_failure(404, 10)
+
+def test_failures_within_window_count_once(registry):
+    # 同一次运行中对同一接口的多个并发请求失败
+    for _ in range(4):
+        fail(registry)
+    state = registry.snapshot()["s.2.taobao.com/list/list.htm"]
+    assert (state["state"], state["failures"]) == (CLOSED, 1)
+    registry.before_request(URL)
+
+def test_opens_after_consecutive_failing_windows(registry, clock):
+    for _ in range(3):
+        fail(registry)
+        clock.now += 1800
+    clock.now -= 1800
+    assert registry.snapshot()["s.2.taobao.com/list/list.htm"]["state"] == OPEN
+    with pytest.raises(CircuitOpenError):
+        registry.before_request(URL)
+    assert registry.snapshot()["s.2.taobao.com/list/list.htm"]["rejected"] == 1
+
+def test_success_resets_count(registry, clock):
+    fail(registry)
+    clock.now += 1800
+    registry.record_success(registry.before_request(URL))
+    assert registry.snapshot() == {}
+
+def open_breaker(registry, clock):
+    for _ in range(3):
+        fail(registry)
+        clock.now += 1800
+    clock.now -= 1800
+
+def test_half_open_probe_success_closes(registry, clock):
+    open_breaker(registry, clock)
+    clock.now += 101
+    endpoint = registry.before_request(URL)
+    assert registry.snapshot()[endpoint]["state"] == HALF_OPEN
+    # 试探进行中，其他请求仍被拒绝
+    with pytest.raises(CircuitOpenError):
+        registry.before_request(URL)
+    registry.record_success(endpoint)
+    assert registry.snapshot() == {}
+
+def test_failed_probe_reopens_with_doubled_cooldown(registry, clock):
+    open_breaker(registry, clock)
+    clock.now += 101
+    registry.record_failure(registry.before_request(URL))
+    state = registry.snapshot()["s.2.taobao.com/list/list.htm"]
+    assert (state["state"], state["trips"]) == (OPEN, 2)
+    assert state["open_until"] == pytest.approx(clock.now + 200)
+
+def test_in_flight_failures_do_not_retrip(registry, clock):
+    endpoints = [registry.before_request(URL) for _ in range(2)]
+    open_breaker(registry, clock)
+    open_until = registry.snapshot()[endpoints[0]]["open_until"]
+    clock.now += 1800
+    # 熔断前已发出的请求此时才失败
+    registry.record_failure(endpoints[1])
+    assert registry.snapshot()[endpoints[0]]["trips"] == 1
+    assert registry.snapshot()[endpoints[0]]["open_until"] == open_until
+
+def test_state_survives_restart(registry, tmp_path, clock):
+    open_breaker(registry, clock)
+    registry.save()
+    reloaded = BreakerRegistry(path=str(tmp_path / "breakers.json"), threshold=3, cooldown=100)
+    with pytest.raises(CircuitOpenError):
+        reloaded.before_request(URL)
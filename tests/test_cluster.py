@@ -0,0 +1,41 @@
+# test_cluster.py
+import datetime
+from cluster import apply_clusters, cluster_titles, jaccard, shingles, tokenize
+from report import PlatformSection, Report, ReportItem
+
+def test_tokenize_drops_prefixes_and_dates():
+    assert tokenize("💰 6月1日央行降准") == ["央", "行", "降", "准"]
+    assert tokenize("[r/python] Python 3.13 released") == ["python", "3", "13", "released"]
+
+def test_rewordings_are_grouped():
+    titles = ["苹果iPhone 16发布会定档9月10日", "无关的另一条新闻标题", "#iPhone16发布会定档9月10日#"]
+    assert cluster_titles(titles) == [[0, 2], [1]]
+
+def test_short_titles_differing_in_one_word_stay_apart():
+    # 只差一两个字的短标题相似度很高，但不是同一话题
+    for a, b in [("北京今日天气", "上海今日天气"), ("国际形势分析", "经济形势分析"), ("A股收盘上涨", "港股收盘上涨")]:
+        assert cluster_titles([a, b]) == [[0], [1]], (a, b)
+
+def test_clusters_do_not_chain():
+    # A~B、B~C 都达到阈值，但 A 与 C 不相似：C 不能因为 B 并入 A 的组
+    a, b, c = "一二三四五六七八九十甲乙", "二三四五六七八九十甲乙丙", "三四五六七八九十甲乙丙丁"
+    assert jaccard(shingles(a), shingles(b)) >= 0.7
+    assert jaccard(shingles(b), shingles(c)) >= 0.7
+    assert jaccard(shingles(a), shingles(c)) < 0.7
+    assert cluster_titles([a, b, c], 0.7) == [[0, 1], [2]]
+
+def test_apply_clusters_shows_each_topic_once():
+    weibo = PlatformSection("Weibo", "📱", items=[ReportItem(1, "苹果iPhone 16发布会定档9月10日"), ReportItem(2, "微博独有")])
+    baidu = PlatformSection("Baidu", "🔍", items=[ReportItem(1, "百度独有"), ReportItem(2, "iPhone16发布会定档9月10日")])
+    report = Report("noon_12pm", "", "subject", datetime.datetime(2024, 6, 1, 12), [weibo, baidu])
+    assert apply_clusters(report) == 1
+    # 报告中第一次出现的位置保留并标注其他平台，其他平台上的重复条目移除
+    assert weibo.items[0].also_on == ["Baidu"]
+    assert [item.title for item in baidu.items] == ["百度独有"]
+    assert weibo.items[1].also_on == []
+
+def test_apply_clusters_ignores_duplicates_within_one_platform():
+    weibo = PlatformSection("Weibo", "📱", items=[ReportItem(1, "苹果iPhone 16发布会定档9月10日"), ReportItem(2, "#iPhone16发布会定档9月10日#")])
+    report = Report("noon_12pm", "", "subject", datetime.datetime(2024, 6, 1, 12), [weibo])
+    assert apply_clusters(report) == 0
+    assert len(weibo.items) == 2
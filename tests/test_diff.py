@@ -0,0 +1,50 @@
+# test_diff.py
+import datetime
+from diff import DROPPED, FALLING, NEW, RISING, SAME, delta_report, diff_section
+from report import PlatformSection, Report, ReportItem
+
+def section(*titles, name="Weibo"):
+    return PlatformSection(name, "📱", items=[ReportItem(rank, title) for rank, title in enumerate(titles, 1)])
+
+def snapshot(*titles):
+    return [{"rank": rank, "title": title, "url": "", "hot": ""} for rank, title in enumerate(titles, 1)]
+
+def test_diff_section_classifies_items():
+    current = section("A", "B", "C", "D")
+    diff_section(current, snapshot("B", "E", "C", "A"))
+    assert [(item.title, item.change, item.prev_rank) for item in current.items] == [
+        ("A", RISING, 4), ("B", FALLING, 1), ("C", SAME, 3), ("D", NEW, None)]
+    assert [(item.title, item.change, item.rank) for item in current.dropped] == [("E", DROPPED, 2)]
+    assert current.items[0].change_label == "↑3"
+    assert current.items[1].change_label == "↓1"
+
+def test_diff_section_without_history_marks_everything_new():
+    current = section("A", "B")
+    diff_section(current, [])
+    assert {item.change for item in current.items} == {NEW}
+    assert current.dropped == []
+
+def test_placeholders_are_not_compared():
+    current = section("Weibo Error")
+    current.items[0].placeholder = True
+    diff_section(current, snapshot("A"))
+    assert current.items[0].change is None
+    assert [item.title for item in current.dropped] == ["A"]
+
+def test_delta_report_keeps_only_changes():
+    changed, unchanged = section("A", "B"), section("X", name="Baidu")
+    diff_section(changed, snapshot("B", "A"))
+    diff_section(unchanged, snapshot("X"))
+    report = Report("noon_12pm", "", "subject", datetime.datetime(2024, 6, 1, 12), [changed, unchanged])
+    delta = delta_report(report)
+    assert [s.name for s in delta.sections] == ["Weibo"]
+    assert [item.title for item in delta.sections[0].items] == ["A", "B"]
+    # 原报告不受影响
+    assert len(report.sections) == 2
+
+def test_only_the_shown_items_are_compared():
+    # 第 3 名以后不显示：C 掉出前 2 名算下榜，D 升进前 2 名算新上榜，E 在范围外的变化不计
+    current = section("A", "D", "C", "E")
+    diff_section(current, snapshot("A", "C", "E", "D"), limit=2)
+    assert [(item.title, item.change) for item in current.items] == [("A", SAME), ("D", NEW), ("C", None), ("E", None)]
+    assert [item.title for item in current.dropped] == ["C"]
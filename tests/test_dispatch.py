@@ -0,0 +1,136 @@
+# test_dispatch.py
+import threading
+import time
+import pytest
+import notifier
+from dispatch import Batch, Channel, PartialDelivery, dispatch, mask
+
+SESSION = object()
+
+def prepare_once(calls):
+    def prepare(report, session):
+        calls.append(report)
+        return {"body": report}
+    return prepare
+
+def test_every_recipient_gets_a_receipt_in_configured_order():
+    calls = []
+
+    def deliver(prepared, recipient, session):
+        assert prepared == {"body": "report"} and session is SESSION
+        # 先配置的接收人最后完成
+        time.sleep({"a": 0.05, "b": 0.02, "c": 0.0}[recipient])
+        if recipient == "b":
+            raise RuntimeError("rejected")
+
+    channels = [Channel("one", ["a", "b", "c"], prepare_once(calls), deliver),
+                Channel("two", ["c"], prepare_once(calls), deliver)]
+    receipts = dispatch("report", channels, session=SESSION, max_workers=4, per_channel=4, deadline=5)
+    assert [(r.channel, r.recipient, r.result) for r in receipts] == [
+        ("one", "a", "ok"), ("one", "b", "error"), ("one", "c", "ok"), ("two", "c", "ok")]
+    assert receipts[1].error == "rejected"
+    assert calls == ["report", "report"]
+
+def test_per_channel_limit():
+    lock = threading.Lock()
+    running, peak = [0], [0]
+
+    def deliver(prepared, recipient, session):
+        with lock:
+            running[0] += 1
+            peak[0] = max(peak[0], running[0])
+        time.sleep(0.02)
+        with lock:
+            running[0] -= 1
+
+    channels = [Channel("slow", list("abcdefgh"), prepare_once([]), deliver)]
+    receipts = dispatch(None, channels, session=SESSION, max_workers=8, per_channel=2, deadline=5)
+    assert all(receipt.ok for receipt in receipts)
+    assert peak[0] == 2
+
+def test_partial_delivery_receipt():
+    def deliver(prepared, batch, session):
+        raise PartialDelivery({"UID_failed_member": "blocked"})
+
+    batch = Batch("batch1/1", ["UID_ok_member", "UID_failed_member", "UID_other"])
+    receipt, = dispatch(None, [Channel("wxpusher", [batch], prepare_once([]), deliver)], session=SESSION, deadline=5)
+    assert (receipt.result, receipt.count, receipt.delivered) == ("partial", 3, 2)
+    assert receipt.failed == [mask("UID_failed_member")]
+    assert receipt.failed_members == ["UID_failed_member"]
+    assert "failed_members" not in receipt.as_dict()
+
+def test_deadline_waits_grace_for_requests_already_sent():
+    def deliver(prepared, recipient, session):
+        time.sleep(0.3)
+
+    # a 在截止时间前已经发出，宽限期内完成；b、c 还在排队，不再发送
+    channels = [Channel("slow", ["a", "b", "c"], prepare_once([]), deliver)]
+    receipts = dispatch(None, channels, session=SESSION, max_workers=1, per_channel=1, deadline=0.1, grace=2)
+    assert [receipt.result for receipt in receipts] == ["ok", "timeout", "timeout"]
+
+def test_requests_without_answer_after_grace_are_unknown():
+    release = threading.Event()
+
+    def deliver(prepared, recipient, session):
+        release.wait(2)
+
+    channels = [Channel("stuck", ["a", "b"], prepare_once([]), deliver)]
+    try:
+        receipts = dispatch(None, channels, session=SESSION, max_workers=1, per_channel=1, deadline=0.1, grace=0.1)
+    finally:
+        release.set()
+    # a 可能已经送达，不能当作失败
+    assert [(receipt.recipient, receipt.result) for receipt in receipts] == [("a", "unknown"), ("b", "timeout")]
+    assert not receipts[0].ok
+
+def test_prepare_failure_fails_the_channel_only():
+    def broken(report, session):
+        raise ValueError("render failed")
+
+    channels = [Channel("broken", ["a", "b"], broken, lambda *args: None),
+                Channel("fine", ["c"], prepare_once([]), lambda *args: None)]
+    receipts = dispatch(None, channels, session=SESSION, deadline=5)
+    assert [(r.channel, r.result) for r in receipts] == [("broken", "error"), ("broken", "error"), ("fine", "ok")]
+
+class FakeResponse:
+    def __init__(self, data):
+        self.data = data
+
+    def json(self):
+        return self.data
+
+class WxPusherSession:
+    """Answers WxPusher requests from a list of responses (dicts) or exceptions."""
+    def __init__(self, *answers):
+        self.answers = list(answers)
+        self.requests = []
+
+    def post(self, url, json, timeout):
+        self.requests.append(json)
+        answer = self.answers.pop(0)
+        if isinstance(answer, Exception):
+            raise answer
+        return FakeResponse(answer)
+
+def per_member(members, failed):
+    return {"code": 1000, "data": [{"uid": m, "code": 1001 if m in failed else 1000, "status": "blocked"} for m in members]}
+
+def test_wxpusher_retries_only_failed_members():
+    members = ["UID_a", "UID_b", "UID_c"]
+    session = WxPusherSession(per_member(members, {"UID_b"}), per_member(["UID_b"], set()))
+    notifier._wxpusher_deliver({"content": "x"}, Batch("b", members), session)
+    assert [request["uids"] for request in session.requests] == [members, ["UID_b"]]
+    # appToken 只在发送时加入（prepare 的结果会保存在发件箱中）
+    assert "appToken" in session.requests[0]
+
+def test_wxpusher_failed_retry_request_reports_only_still_failing():
+    members = ["UID_a", "UID_b", "UID_c"]
+    session = WxPusherSession(per_member(members, {"UID_b", "UID_c"}), ConnectionError("reset"))
+    with pytest.raises(PartialDelivery) as error:
+        notifier._wxpusher_deliver({"content": "x"}, Batch("b", members), session)
+    assert set(error.value.failed) == {"UID_b", "UID_c"}
+
+def test_wxpusher_first_request_failure_fails_the_batch():
+    session = WxPusherSession({"code": 1001, "msg": "appToken error"})
+    with pytest.raises(notifier.DeliveryError):
+        notifier._wxpusher_deliver({"content": "x"}, Batch("b", ["UID_a", "UID_b"]), session)
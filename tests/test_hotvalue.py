@@ -0,0 +1,57 @@
+# test_hotvalue.py
+import pytest
+from hotvalue import HotValue, format_count, normalize, normalize_batch
+
+@pytest.mark.parametrize("raw, value, unit", [
+    ("1.2万", 12000.0, "heat"),
+    ("3.4M", 3400000.0, "heat"),
+    ("10万+", 100000.0, "heat"),
+    ("12,345 views", 12345.0, "views"),
+    ("500 upvotes", 500.0, "likes"),
+    ("1.2k回答", 1200.0, "answers"),
+    ("¥3744 已售253件", 253.0, "sold"),
+    ("113分钟前", 113.0, "age"),
+    ("2小时前", 120.0, "age"),
+    ("2.4万播放", 24000.0, "plays"),
+    ("1.2万次播放", 12000.0, "plays"),
+    (12345, 12345.0, "heat"),
+    ("热门", None, "label"),
+    ("", None, "heat"),
+    (None, None, "heat"),
+])
+def test_normalize(raw, value, unit):
+    parsed = normalize(raw)
+    assert (parsed.value, parsed.unit) == (value, unit)
+
+@pytest.mark.parametrize("raw", [
+    "热度3",           # 模拟数据的排名
+    "Top 10 热搜",
+    "2024-01-01",
+    "12:30",
+    "3 months ago",    # months 的 m 不是百万
+    "手机热卖",
+])
+def test_numbers_inside_labels_are_not_heat(raw):
+    assert normalize(raw) == HotValue(None, "label", raw)
+
+def test_batch_keeps_order_and_survives_newlines():
+    values = normalize_batch(["1万", "2万\n播放", "热门"])
+    assert [value.value for value in values] == [10000.0, 20000.0, None]
+    assert values[1] == HotValue(20000.0, "plays", "2万 播放")
+    assert normalize_batch([]) == []
+
+@pytest.mark.parametrize("count, suffix, style, expected", [
+    (23800, "播放", "cn", "2.4万播放"),
+    (1520000, " views", "en", "1.5M views"),
+    (999, "", "cn", "999"),
+    (1500, "", "k", "1.5k"),
+    (25000, "", "mixed", "2.5万"),
+])
+def test_format_count(count, suffix, style, expected):
+    assert format_count(count, suffix, style) == expected
+
+@pytest.mark.parametrize("count, suffix, style", [
+    (23800, "播放", "cn"), (1520000, " views", "en"), (3300, "回答", "k"), (25000, "阅读", "mixed"),
+])
+def test_formatted_counts_parse_back(count, suffix, style):
+    assert normalize(format_count(count, suffix, style)).value == pytest.approx(count, rel=0.05)
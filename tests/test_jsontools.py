@@ -0,0 +1,36 @@
+# test_jsontools.py
+import os
+from conftest import FIXTURES
+from jsontools import extract_embedded_json, extract_embedded_subtrees, find_json_end, find_values, find_nodes
+
+def read_fixture(name):
+    with open(os.path.join(FIXTURES, name), "rb") as f:
+        return f.read()
+
+def test_find_json_end_skips_brackets_inside_strings():
+    raw = b'x = {"a": "}]{[", "b": [1, {"c": "\\"}"}]};rest'
+    start = raw.index(b"{")
+    assert raw[start:find_json_end(raw, start)] == b'{"a": "}]{[", "b": [1, {"c": "\\"}"}]}'
+
+def test_extract_embedded_json_from_page():
+    data = extract_embedded_json(read_fixture("initial_state.html"), "window.__INITIAL_STATE__")
+    assert [item["title"] for item in data["hot"]["list"]] == ["第一条；含分号", "第二条 </div> 标签", "第三条"]
+    # JS 的 undefined 按 null 处理
+    assert data["hot"]["extra"] is None
+
+def test_extract_embedded_json_missing_assignment():
+    assert extract_embedded_json(b"<script>var a = 1;</script>", "window.__INITIAL_STATE__") is None
+
+def test_extract_embedded_subtrees_in_document_order():
+    raw = read_fixture("initial_state.html")
+    assert extract_embedded_subtrees(raw, "window.__INITIAL_STATE__", "title") == ["第一条；含分号", "第二条 </div> 标签", "第三条"]
+    assert extract_embedded_subtrees(raw, "window.__INITIAL_STATE__", "title", limit=1) == ["第一条；含分号"]
+
+def test_find_values_prunes_and_does_not_descend_into_matches():
+    tree = {"a": {"title": {"title": "nested"}}, "skip": {"title": "pruned"}, "b": [{"title": "x"}]}
+    assert find_values(tree, "title", prune=("skip",)) == [{"title": "nested"}, "x"]
+    assert find_values(tree, "title", limit=1) == [{"title": "nested"}]
+
+def test_find_nodes():
+    tree = {"items": [{"type": "video", "id": 1}, {"type": "ad", "id": 2}, {"wrap": {"type": "video", "id": 3}}]}
+    assert [node["id"] for node in find_nodes(tree, lambda node: node.get("type") == "video")] == [1, 3]
@@ -0,0 +1,37 @@
+# test_keywords.py
+import json
+from keywords import KeywordMatcher, load_keywords
+
+def test_categories_reports_every_hit_including_overlaps():
+    matcher = KeywordMatcher({"economy": ["经济形势"], "livelihood": ["经济", "就业"], "other": ["形势"]})
+    assert matcher.categories("今年经济形势与就业") == {"economy", "livelihood", "other"}
+    assert matcher.categories("天气") == set()
+
+def test_suffix_keyword_found_through_failure_links():
+    # "abcd" 不匹配，但扫描经过的 "bc" 应当命中
+    matcher = KeywordMatcher({"long": ["abcd"], "short": ["bc"]})
+    assert matcher.categories("xabcx") == {"short"}
+
+def test_matches_and_ignore_case():
+    matcher = KeywordMatcher({"twitter": ["China", "Hong Kong"]}, ignore_case=True)
+    assert matcher.matches("news from HONG KONG")
+    assert not matcher.matches("Hong-Kong")
+    assert not KeywordMatcher({"twitter": ["China"]}).matches("china")
+
+def test_empty_keywords():
+    matcher = KeywordMatcher({"empty": ["", ]})
+    assert matcher.categories("anything") == set()
+    assert not matcher.matches("")
+
+def test_load_keywords_overrides_whole_category(tmp_path):
+    path = tmp_path / "keywords.json"
+    path.write_text(json.dumps({"finance": ["A股"], "custom": ["新"]}), encoding="utf-8")
+    keywords = load_keywords(str(path))
+    assert keywords["finance"] == ["A股"]
+    assert keywords["custom"] == ["新"]
+    assert "民生" in keywords["livelihood"]
+
+def test_load_keywords_ignores_invalid_file(tmp_path):
+    path = tmp_path / "keywords.json"
+    path.write_text('{"finance": "A股"}', encoding="utf-8")
+    assert load_keywords(str(path))["finance"] == load_keywords(None)["finance"]
@@ -0,0 +1,148 @@
+# test_outbox.py
+import datetime
+import json
+import os
+import stat
+from types import SimpleNamespace
+import pytest
+import notifier
+import outbox
+from dispatch import Batch, Channel, PartialDelivery
+from outbox import Outbox, backoff, recipient_ref
+
+SESSION = object()
+TOKEN = "pushplus-secret-token-0123456789"
+
+def make_report(minute=0):
+    return SimpleNamespace(time_period="noon_12pm", generated_at=datetime.datetime(2024, 6, 1, 12, minute), subject="午间热点")
+
+def channel(name, recipients):
+    return Channel(name, recipients, lambda report, session: {"title": report.subject}, None)
+
+class Deliverer:
+    """Fake deliver function: fails the first `failures` calls, records every call."""
+    def __init__(self, failures=0, error=RuntimeError("provider down")):
+        self.failures = failures
+        self.error = error
+        self.calls = []
+
+    def __call__(self, payload, recipient, session):
+        self.calls.append(recipient)
+        if len(self.calls) <= self.failures:
+            raise self.error
+
+@pytest.fixture
+def box(tmp_path, monkeypatch):
+    # 当前配置中的接收人只有 TOKEN
+    monkeypatch.setattr(outbox, "configured_refs", lambda: {recipient_ref("pushplus", TOKEN): TOKEN})
+    box = Outbox(str(tmp_path / "outbox.db"))
+    yield box
+    box.close()
+
+def execute(box, sql, *params):
+    box.conn.execute(sql, params)
+    box.conn.commit()
+
+def deliveries(box):
+    return box.conn.execute("SELECT status, attempts, recipient, last_error, next_attempt_at FROM deliveries").fetchall()
+
+def test_backoff_grows_and_is_capped():
+    for attempts, low, high in [(1, 15, 30), (2, 30, 60), (3, 60, 120), (20, 900, 1800)]:
+        assert low <= backoff(attempts, base=30, cap=1800) <= high
+
+def test_enqueue_is_idempotent(box):
+    assert len(box.enqueue(make_report(), [channel("pushplus", [TOKEN])])) == 1
+    assert box.enqueue(make_report(), [channel("pushplus", [TOKEN])]) == []
+    assert len(box.enqueue(make_report(minute=1), [channel("pushplus", [TOKEN])])) == 1
+    assert box.conn.execute("SELECT COUNT(*) FROM messages").fetchone()[0] == 2
+
+def test_secrets_are_not_stored(box, tmp_path):
+    box.enqueue(make_report(), [channel("pushplus", [TOKEN])])
+    box.conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    assert TOKEN.encode() not in (tmp_path / "outbox.db").read_bytes()
+    assert json.loads(deliveries(box)[0]["recipient"]) == {"ref": recipient_ref("pushplus", TOKEN)}
+    assert stat.S_IMODE(os.stat(tmp_path / "outbox.db").st_mode) == 0o600
+
+def test_drain_sends_with_resolved_recipient(box, monkeypatch):
+    deliver = Deliverer()
+    monkeypatch.setitem(notifier.DELIVERERS, "pushplus", deliver)
+    box.enqueue(make_report(), [channel("pushplus", [TOKEN])])
+    receipts = box.drain(session=SESSION)
+    assert [receipt.result for receipt in receipts] == ["ok"]
+    assert deliver.calls == [TOKEN]
+    assert box.counts() == {"sent": 1}
+    # 已发送的不会再发
+    assert box.drain(session=SESSION) == []
+
+def test_failure_is_retried_after_backoff(box, monkeypatch):
+    monkeypatch.setitem(notifier.DELIVERERS, "pushplus", Deliverer(failures=1))
+    box.enqueue(make_report(), [channel("pushplus", [TOKEN])])
+    box.drain(session=SESSION)
+    row, = deliveries(box)
+    assert (row["status"], row["attempts"], row["last_error"]) == ("pending", 1, "provider down")
+    # 退避时间未到，不会再取出
+    assert box.drain(session=SESSION) == []
+    execute(box, "UPDATE deliveries SET next_attempt_at = 0")
+    assert [receipt.result for receipt in box.drain(session=SESSION)] == ["ok"]
+    assert box.counts() == {"sent": 1}
+
+def test_dead_letter_after_max_attempts(box, monkeypatch):
+    monkeypatch.setattr(outbox, "OUTBOX_MAX_ATTEMPTS", 2)
+    monkeypatch.setitem(notifier.DELIVERERS, "pushplus", Deliverer(failures=10))
+    box.enqueue(make_report(), [channel("pushplus", [TOKEN])])
+    box.drain(session=SESSION)
+    execute(box, "UPDATE deliveries SET next_attempt_at = 0")
+    box.drain(session=SESSION)
+    assert box.counts() == {"dead": 1}
+    assert box.retry_dead() == 1
+    assert box.counts() == {"pending": 1}
+
+def test_old_reports_expire(box, monkeypatch):
+    deliver = Deliverer()
+    monkeypatch.setitem(notifier.DELIVERERS, "pushplus", deliver)
+    box.enqueue(make_report(), [channel("pushplus", [TOKEN])])
+    execute(box, "UPDATE messages SET created_at = created_at - ?", outbox.OUTBOX_MAX_AGE + 1)
+    assert box.drain(session=SESSION) == []
+    assert deliver.calls == []
+    assert deliveries(box)[0]["last_error"] == "expired"
+
+def test_default_max_age_outlives_the_longest_cron_gap():
+    # 定时运行（见 .github/workflows）之间最长间隔9小时
+    assert outbox.OUTBOX_MAX_AGE > 9 * 3600
+
+def test_recipient_no_longer_configured_becomes_dead(box, monkeypatch):
+    deliver = Deliverer()
+    monkeypatch.setitem(notifier.DELIVERERS, "pushplus", deliver)
+    box.enqueue(make_report(), [channel("pushplus", ["removed-token-abcdef"])])
+    box.drain(session=SESSION)
+    assert deliver.calls == []
+    assert deliveries(box)[0]["last_error"] == "recipient no longer configured"
+
+def test_partial_delivery_keeps_only_failed_members(box, monkeypatch):
+    monkeypatch.setitem(notifier.DELIVERERS, "wxpusher", Deliverer(failures=1, error=PartialDelivery({"UID_b": "blocked"})))
+    box.enqueue(make_report(), [channel("wxpusher", [Batch("batch1/1", ["UID_a", "UID_b"])])])
+    box.drain(session=SESSION)
+    row, = deliveries(box)
+    assert row["status"] == "pending"
+    assert json.loads(row["recipient"])["members"] == ["UID_b"]
+
+def test_claim_leases_deliveries(box):
+    box.enqueue(make_report(), [channel("pushplus", [TOKEN])])
+    assert len(box._claim()) == 1
+    # 另一个进程在租约到期前取不到
+    assert box._claim() == []
+
+def test_unknown_outcome_is_not_resent(box, monkeypatch):
+    # 截止时间后仍没有结果的请求可能已经送达
+    monkeypatch.setattr(outbox, "dispatch", lambda report, channels, **kwargs: [
+        SimpleNamespace(result="unknown", error="no answer", channel="pushplus", recipient="pushp…89", delivered=0)])
+    monkeypatch.setitem(notifier.DELIVERERS, "pushplus", Deliverer())
+    box.enqueue(make_report(), [channel("pushplus", [TOKEN])])
+    box.drain(session=SESSION)
+    assert box.counts() == {"unknown": 1}
+    assert box.next_due() is None
+    execute(box, "UPDATE deliveries SET next_attempt_at = 0")
+    assert box.drain(session=SESSION) == []
+    # 需要时手动重发
+    assert box.retry_dead() == 1
+    assert box.counts() == {"pending": 1}
@@ -0,0 +1,28 @@
+# test_replay.py
+import urllib.error
+import urllib.request
+import pytest
+from conftest import REPLAY_FIXTURES
+import http_client
+import replay
+import scraper
+
+def test_bilibili_parser(replaying):
+    items = http_client.run_sync(scraper.afetch_bilibili_hot())
+    assert items[0] == {"title": "【年度盘点】2024 最受欢迎的 10 部国产动画",
+                        "url": "https://www.bilibili.com/video/BV1xx411c7mD", "hot": "1.5M"}
+    assert [item["hot"] for item in items[1:]] == ["8.8万", "9321"]
+
+def test_weibo_parser_skips_pinned_topic(replaying):
+    items = http_client.run_sync(scraper.afetch_weibo_hot())
+    assert [item["title"] for item in items] == ["高考作文题目公布", "端午假期出行人次创新高", "新能源汽车下乡活动启动"]
+    assert items[0]["hot"] == "热"
+
+def test_unrecorded_url_is_404(replaying):
+    with pytest.raises(urllib.error.HTTPError) as error:
+        urllib.request.urlopen(replay.route("https://example.com/not-recorded"))
+    assert error.value.code == 404
+
+def test_check_all_matches_expected(isolated):
+    # 与 python replay.py check --dir tests/fixtures/replay 相同：所有启用的平台都回放，没有录制的走回退
+    assert replay.check_all(REPLAY_FIXTURES) == []
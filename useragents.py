@@ -0,0 +1,64 @@
+# useragents.py
+import json
+import os
+import random
+import threading
+import time
+from config import USER_AGENT, UA_POOL_SIZE, UA_CACHE_PATH, UA_CACHE_TTL
+
+# 只在第一次需要请求头时加载；fake_useragent 的浏览器数据库较大，
+# 抽取一小组 UA 缓存到本地，之后的运行直接读取缓存文件
+_pool = None
+_pool_lock = threading.Lock()
+
+def _load_cached():
+    try:
+        with open(UA_CACHE_PATH, "r", encoding="utf-8") as f:
+            cached = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if time.time() - cached.get("created_at", 0) > UA_CACHE_TTL:
+        return None
+    return cached.get("agents") or None
+
+def _save_cached(agents):
+    directory = os.path.dirname(UA_CACHE_PATH)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = UA_CACHE_PATH + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({"created_at": time.time(), "agents": agents}, f, ensure_ascii=False)
+    os.replace(tmp_path, UA_CACHE_PATH)
+
+def _build_pool():
+    """Samples a compact pool from fake_useragent and caches it on disk."""
+    try:
+        from fake_useragent import UserAgent
+        ua = UserAgent()
+        agents = []
+        for _ in range(UA_POOL_SIZE * 4):
+            agent = ua.random
+            if agent not in agents:
+                agents.append(agent)
+            if len(agents) >= UA_POOL_SIZE:
+                break
+    except Exception as e:
+        print(f"fake_useragent unavailable, using default User-Agent: {e}")
+        return [USER_AGENT]
+
+    try:
+        _save_cached(agents)
+    except OSError as e:
+        print(f"Could not cache User-Agent pool: {e}")
+    return agents
+
+def get_pool():
+    """Returns the User-Agent pool, loading or building it on first use."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = _load_cached() or _build_pool()
+    return _pool
+
+def random_user_agent():
+    return random.choice(get_pool())
@@ -0,0 +1,136 @@
+# wechat_token.py
+import json
+import os
+import threading
+import time
+from config import WECHAT_APPID, WECHAT_APPSECRET, WECHAT_TOKEN_CACHE_PATH, WECHAT_TOKEN_REFRESH_MARGIN, PUSH_TIMEOUT
+
+try:
+    import fcntl
+except ImportError:  # Windows：只做进程内去重
+    fcntl = None
+
+# 微信 access_token 有效期2小时，cgi-bin/token 接口有每日调用次数限制。
+# token 和过期时间缓存在内存和磁盘（WECHAT_TOKEN_CACHE_PATH）上，过期前 WECHAT_TOKEN_REFRESH_MARGIN 秒才重新获取：
+#   同一进程内多个推送线程同时需要刷新时，只有一个线程请求接口，其余等待并使用它的结果
+#   多个进程（如常驻进程和手动运行）通过文件锁协调，拿到锁后先重新读取磁盘缓存，已被其他进程刷新则直接使用
+#   WECHAT_TOKEN_CACHE_PATH 为空时（GitHub Actions 中默认如此）只缓存在内存，token 不会写进 Actions 缓存
+
+TOKEN_URL = "https://api.weixin.qq.com/cgi-bin/token"
+
+# token 失效（过期、被其他地方刷新）时接口返回的错误码
+INVALID_TOKEN_ERRCODES = {40001, 40014, 42001}
+
+class TokenError(Exception):
+    """cgi-bin/token did not return an access_token."""
+
+class TokenManager:
+    """Cached access_token of one WeChat app (appid)."""
+    def __init__(self, appid=WECHAT_APPID, secret=WECHAT_APPSECRET, path=WECHAT_TOKEN_CACHE_PATH,
+                 margin=WECHAT_TOKEN_REFRESH_MARGIN):
+        self.appid = appid
+        self.secret = secret
+        self.path = path
+        self.margin = margin
+        self.lock = threading.Lock()
+        self.token = None
+        self.expires_at = 0.0
+        self.refreshes = 0   # 本进程实际请求接口的次数
+
+    def _fresh(self, expires_at):
+        return time.time() < expires_at - self.margin
+
+    def _read_cache(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                entry = json.load(f).get(self.appid)
+        except (OSError, ValueError, AttributeError):
+            return None, 0.0
+        if not entry:
+            return None, 0.0
+        return entry.get("access_token"), entry.get("expires_at", 0.0)
+
+    def _write_cache(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                cache = json.load(f)
+        except (OSError, ValueError):
+            cache = {}
+        cache[self.appid] = {"access_token": self.token, "expires_at": self.expires_at}
+        tmp_path = self.path + ".tmp"
+        # token 等同于密码，只允许本用户读写
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(cache, f)
+        os.replace(tmp_path, self.path)
+
+    def get(self, session):
+        """Returns a valid access_token, requesting a new one only when the cached one is about to expire."""
+        if self.token and self._fresh(self.expires_at):
+            return self.token
+        with self.lock:
+            # 等锁期间可能已被其他线程刷新
+            if self.token and self._fresh(self.expires_at):
+                return self.token
+            if not self.path:
+                self._refresh(session)
+                return self.token
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(self.path + ".lock", "a") as lock_file:
+                if fcntl:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    token, expires_at = self._read_cache()
+                    if token and self._fresh(expires_at):
+                        self.token, self.expires_at = token, expires_at
+                        return token
+                    self._refresh(session)
+                    return self.token
+                finally:
+                    if fcntl:
+                        fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _refresh(self, session):
+        params = {"grant_type": "client_credential", "appid": self.appid, "secret": self.secret}
+        requested_at = time.time()
+        response = session.get(TOKEN_URL, params=params, timeout=PUSH_TIMEOUT)
+        data = response.json()
+        if "access_token" not in data:
+            raise TokenError(f"WeChat token error: {data}")
+        self.token = data["access_token"]
+        # 以发出请求的时间计算过期时间，偏保守
+        self.expires_at = requested_at + data.get("expires_in", 7200)
+        self.refreshes += 1
+        try:
+            if self.path:
+                self._write_cache()
+        except OSError as e:
+            print(f"WeChat token cache error: {e}")
+        print(f"WeChat access_token refreshed, valid for {data.get('expires_in', 7200)}s")
+
+    def invalidate(self, token):
+        """Drops a token the API rejected, unless it was already replaced."""
+        with self.lock:
+            if self.token == token:
+                self.token, self.expires_at = None, 0.0
+            if not self.path:
+                return
+            # 磁盘上的同一个 token 也作废，其他进程下次会重新获取
+            cached, _ = self._read_cache()
+            if cached == token:
+                try:
+                    self._write_cache()
+                except OSError:
+                    pass
+
+_managers = {}
+_managers_lock = threading.Lock()
+
+def get_manager(appid=WECHAT_APPID, secret=WECHAT_APPSECRET):
+    """Shared TokenManager of an app."""
+    with _managers_lock:
+        if appid not in _managers:
+            _managers[appid] = TokenManager(appid, secret)
+        return _managers[appid]